@@ -15,7 +15,7 @@ from flask_jwt_extended import (
     JWTManager, jwt_required, create_access_token,
     get_jwt_identity
 )
-from threading import Thread
+from threading import Thread, Lock
 
 # استيراد الوحدات الداخلية
 from modules.analyzer import SEOAnalyzer
@@ -23,7 +23,7 @@ from modules.crawler import WebCrawler
 from modules.page_speed import PageSpeedAnalyzer
 from modules.content_analyzer import ContentAnalyzer
 from modules.image_optimizer import ImageOptimizer
-from modules.link_checker import LinkChecker
+from modules.link_checker import LinkChecker, LinkStatusCache
 from modules.seo_fixer import SEOFixer
 from modules.report_generator import ReportGenerator
 from modules.wp_integration import WordPressIntegration
@@ -33,7 +33,18 @@ from modules.ai_content_generator import AIContentGenerator
 from modules.core_web_vitals import CoreWebVitalsAnalyzer
 from modules.eeat_analyzer import EEATAnalyzer
 from modules.schema_analyzer import SchemaAnalyzer
-from modules.parallel_crawler import AsyncWebCrawler
+from modules.parallel_crawler import AsyncWebCrawler, CrawlSession
+from modules.analysis_executor import AnalysisExecutor
+from modules.analysis_cache import AnalysisCache
+from modules.duplicate_detector import DuplicateDetector
+from modules.link_graph import LinkGraph
+from modules.results_table import ResultsTable
+from modules.http_cache import HTTPCache
+from modules.crawl_scheduler import CrawlScheduler
+from modules.crawl_checkpoint import CrawlCheckpoint, CheckpointNotFound
+from modules.parsed_page import configure_parser
+from modules.url_registry import URLRegistry
+from modules.distributed_crawl import DistributedCrawler
 
 # استيراد الأدوات المساعدة
 from utils.helpers import validate_url, create_directory, format_time
@@ -49,10 +60,17 @@ logger = get_logger("rseo_api")
 # تحميل ملف الإعدادات
 config_loader = ConfigLoader()
 config = config_loader.get_all()
+configure_parser(config)
 
 # المتغيرات العالمية
 running_jobs = {}
 results_directory = 'results'
+crawl_session = None  # جلسة الزحف المتوازي المشتركة بين المهام
+crawl_session_lock = Lock()
+http_cache = None  # ذاكرة HTTP على القرص المشتركة بين المهام
+http_cache_lock = Lock()
+crawl_scheduler = None  # مجدول التهذيب المشترك: المهام المتزامنة على الموقع نفسه تتقاسم معدله
+crawl_scheduler_lock = Lock()
 
 # ==================
 # وظائف مساعدة
@@ -62,6 +80,30 @@ def generate_job_id():
     """توليد معرّف فريد للمهمة"""
     return str(uuid.uuid4())
 
+def get_crawl_session():
+    """الحصول على جلسة الزحف المشتركة (تُنشأ مرة واحدة وتعاد استخدامها بين المهام)"""
+    global crawl_session
+    with crawl_session_lock:
+        if crawl_session is None:
+            crawl_session = CrawlSession.from_config(config)
+        return crawl_session
+
+def get_http_cache():
+    """الحصول على ذاكرة HTTP المشتركة (None إذا كانت معطلة في الإعدادات)"""
+    global http_cache
+    with http_cache_lock:
+        if http_cache is None:
+            http_cache = HTTPCache.from_config(config)
+        return http_cache
+
+def get_crawl_scheduler():
+    """الحصول على مجدول التهذيب المشترك بين مهام الزحف"""
+    global crawl_scheduler
+    with crawl_scheduler_lock:
+        if crawl_scheduler is None:
+            crawl_scheduler = CrawlScheduler.from_config(config)
+        return crawl_scheduler
+
 def analyze_website_job(job_id, url, options):
     """وظيفة تحليل موقع الويب (تعمل في خلفية)"""
     try:
@@ -86,10 +128,48 @@ def analyze_website_job(job_id, url, options):
         depth = options.get('depth', 3)
         delay = config.get('crawling', {}).get('delay_seconds', 1)
         respect_robots = config.get('crawling', {}).get('respect_robots_txt', True)
-        
-        # استخدام الزاحف المتوازي إذا تم تفعيله
+        seed_from_sitemaps = options.get('seed_from_sitemaps')
+        if seed_from_sitemaps is None:
+            seed_from_sitemaps = config.get('crawling', {}).get('seed_from_sitemaps', False)
+        
+        # نقطة حفظ دورية لاستئناف الزحف بعد الانقطاع
+        resume_id = options.get('resume')
+        try:
+            checkpoint = CrawlCheckpoint.from_config(config, crawl_id=resume_id)
+        except CheckpointNotFound as e:
+            running_jobs[job_id]['status'] = 'error'
+            running_jobs[job_id]['message'] = str(e)
+            return
+        if checkpoint is not None:
+            if checkpoint.resumed and checkpoint.start_url != url:
+                checkpoint.close()
+                running_jobs[job_id]['status'] = 'error'
+                running_jobs[job_id]['message'] = f'عملية الزحف {resume_id} خاصة بالموقع {checkpoint.start_url}'
+                return
+            running_jobs[job_id]['crawl_id'] = checkpoint.crawl_id
+        
+        # الزحف الموزع على عدة عمليات عاملة للمواقع الكبيرة (يستأنف بمعرف نقطة الحفظ نفسه)
+        # وإلا استخدام الزاحف المتوازي إذا تم تفعيله
+        distributed = options.get('distributed', False) and not single_page
         use_parallel = options.get('use_parallel', False)
-        if use_parallel:
+        
+        # رسم الروابط الداخلية يحتاج روابط جميع الصفحات، فلا يُبنى عند استئناف زحف سابق أو في الزحف الموزع
+        url_registry = URLRegistry.from_config(config)
+        link_graph = None
+        if not distributed and not (checkpoint is not None and checkpoint.resumed):
+            link_graph = LinkGraph.from_config(config, url, url_registry=url_registry)
+        
+        if distributed:
+            crawler = DistributedCrawler.from_config(
+                config,
+                start_url=url,
+                max_pages=max_pages,
+                max_depth=depth,
+                workers=options.get('workers'),
+                crawl_id=checkpoint.crawl_id if checkpoint is not None else None
+            )
+            running_jobs[job_id]['crawl_id'] = crawler.crawl_id
+        elif use_parallel:
             crawler = AsyncWebCrawler(
                 start_url=url,
                 max_pages=max_pages,
@@ -97,7 +177,15 @@ def analyze_website_job(job_id, url, options):
                 delay=delay,
                 respect_robots_txt=respect_robots,
                 max_concurrent=options.get('max_concurrent', 10),
-                verbose=True
+                session=get_crawl_session(),
+                http_cache=get_http_cache(),
+                scheduler=get_crawl_scheduler(),
+                seed_from_sitemaps=seed_from_sitemaps,
+                checkpoint=checkpoint,
+                url_registry=url_registry,
+                max_body_bytes=config.get('crawling', {}).get('max_body_bytes', 10 * 1024 * 1024),
+                verbose=True,
+                link_graph=link_graph
             )
         else:
             crawler = WebCrawler(
@@ -106,111 +194,105 @@ def analyze_website_job(job_id, url, options):
                 max_depth=depth,
                 delay=delay,
                 respect_robots_txt=respect_robots,
-                verbose=True
+                verbose=True,
+                frontier_priority=config.get('crawling', {}).get('frontier_priority'),
+                http_cache=get_http_cache(),
+                scheduler=get_crawl_scheduler(),
+                seed_from_sitemaps=seed_from_sitemaps,
+                checkpoint=checkpoint,
+                url_registry=url_registry,
+                max_body_bytes=config.get('crawling', {}).get('max_body_bytes', 10 * 1024 * 1024),
+                link_graph=link_graph
             )
         
-        # بدء الزحف
-        pages = crawler.crawl()
-        
-        if not pages:
-            running_jobs[job_id]['status'] = 'error'
-            running_jobs[job_id]['message'] = 'لم يتم العثور على أي صفحات للتحليل.'
-            return
-        
-        # تحديث الحالة
-        running_jobs[job_id]['progress'] = 30
-        running_jobs[job_id]['message'] = f'جاري تحليل {len(pages)} صفحة...'
-        
         # تهيئة المحللات
-        seo_analyzer = SEOAnalyzer(config=config)
-        page_speed_analyzer = PageSpeedAnalyzer()
-        content_analyzer = ContentAnalyzer()
-        image_optimizer = ImageOptimizer()
-        link_checker = LinkChecker()
+        # ذاكرة حالات الروابط مشتركة طوال الزحف حتى لا تُفحص روابط القائمة والتذييل مع كل صفحة
+        link_settings = config.get('link_checking', {})
+        link_cache = LinkStatusCache(
+            max_size=link_settings.get('cache_size', 10000),
+            ttl=link_settings.get('cache_ttl', 3600)
+        )
+        link_checker = LinkChecker(
+            max_workers=link_settings.get('max_workers', 5),
+            cache=link_cache,
+            engine=link_settings.get('engine', 'async'),
+            max_concurrent=link_settings.get('max_concurrent', 100),
+            max_per_host=link_settings.get('max_per_host', 8),
+            session=get_crawl_session()
+        )
         
-        # المحللات الجديدة
-        core_web_vitals_analyzer = CoreWebVitalsAnalyzer(config=config)
-        eeat_analyzer = EEATAnalyzer(config=config)
-        schema_analyzer = SchemaAnalyzer(config=config)
+        # خطوات التحليل لكل صفحة
+        steps = ['basic_seo', 'page_speed', 'content', 'images', 'links', 'keywords']
+        if options.get('analyze_core_web_vitals', True):
+            steps.append('core_web_vitals')
+        if options.get('analyze_eeat', True):
+            steps.append('eeat')
+        if options.get('analyze_schema', True):
+            steps.append('schema')
         
         # ميزات متقدمة
-        keyword_analyzer = KeywordAnalyzer()
         competitor_domains = options.get('competitor_domains', [])
         competitor_analyzer = None
         if competitor_domains:
             competitor_analyzer = CompetitorAnalyzer(config=config)
         
-        # تحليل كل صفحة
-        results = {}
-        page_count = len(pages)
+        def report_progress(done, total, page_url):
+            # العدد الإجمالي غير معروف أثناء الزحف، لذلك يُقدر بالحد الأقصى للصفحات
+            running_jobs[job_id]['progress'] = 10 + int(70 * min(done / max_pages, 1))
+            running_jobs[job_id]['message'] = f'تم تحليل {done} صفحة: {page_url}'
         
-        for i, (page_url, page_data) in enumerate(pages.items()):
-            progress_percent = 30 + int(50 * ((i + 1) / page_count))
-            running_jobs[job_id]['progress'] = progress_percent
-            running_jobs[job_id]['message'] = f'تحليل صفحة {i+1} من {page_count}: {page_url}'
-            
-            page_result = {}
-            
+        running_jobs[job_id]['message'] = 'جاري زحف الموقع وتحليل الصفحات...'
+        
+        # الزحف والتحليل معًا: تُحلل كل صفحة فور جلبها ثم يُحرر محتواها
+        # عند الاستئناف تُستعاد نتائج الصفحات المكتملة دون إعادة جلبها
+        results = dict(checkpoint.results) if checkpoint is not None else {}
+        crawled_count = len(results)
+        
+        # الصفحات التي لم يتغير محتواها منذ التحليل السابق تعاد نتائجها دون تحليل
+        analysis_cache = AnalysisCache.from_config(config, steps)
+        
+        with AnalysisExecutor(config=config, steps=steps, link_checker=link_checker,
+                              progress_callback=report_progress, cache=analysis_cache) as executor:
+            pages = executor.map(crawler.iter_pages(), release_pages=True)
             try:
-                # تحليل السيو الأساسي
-                page_result['basic_seo'] = seo_analyzer.analyze_page(page_data)
-                
-                # تحليل سرعة الصفحة
-                try:
-                    page_result['page_speed'] = page_speed_analyzer.analyze(page_url)
-                except Exception as e:
-                    logger.warning(f"فشل تحليل سرعة الصفحة {page_url}: {str(e)}")
-                
-                # تحليل المحتوى
-                try:
-                    page_result['content'] = content_analyzer.analyze(page_data)
-                except Exception as e:
-                    logger.warning(f"فشل تحليل محتوى الصفحة {page_url}: {str(e)}")
-                
-                # تحليل الصور
-                try:
-                    page_result['images'] = image_optimizer.analyze_images(page_data)
-                except Exception as e:
-                    logger.warning(f"فشل تحليل صور الصفحة {page_url}: {str(e)}")
-                
-                # فحص الروابط
-                try:
-                    page_result['links'] = link_checker.check_links(page_data)
-                except Exception as e:
-                    logger.warning(f"فشل فحص روابط الصفحة {page_url}: {str(e)}")
-                
-                # تحليل الكلمات المفتاحية
-                try:
-                    page_result['keywords'] = keyword_analyzer.analyze(page_data)
-                except Exception as e:
-                    logger.warning(f"فشل تحليل الكلمات المفتاحية للصفحة {page_url}: {str(e)}")
-                
-                # تحليل Core Web Vitals
-                if options.get('analyze_core_web_vitals', True):
-                    try:
-                        page_result['core_web_vitals'] = core_web_vitals_analyzer.analyze(page_url)
-                    except Exception as e:
-                        logger.warning(f"فشل تحليل Core Web Vitals للصفحة {page_url}: {str(e)}")
-                
-                # تحليل E-E-A-T
-                if options.get('analyze_eeat', True):
-                    try:
-                        page_result['eeat'] = eeat_analyzer.analyze(page_url, page_data.get('html'))
-                    except Exception as e:
-                        logger.warning(f"فشل تحليل E-E-A-T للصفحة {page_url}: {str(e)}")
-                
-                # تحليل Schema Markup
-                if options.get('analyze_schema', True):
-                    try:
-                        page_result['schema'] = schema_analyzer.analyze(page_url, page_data.get('html'))
-                    except Exception as e:
-                        logger.warning(f"فشل تحليل Schema Markup للصفحة {page_url}: {str(e)}")
+                for page_url, page_result in pages:
+                    crawled_count += 1
+                    # الصفحات التي فشل تحليلها الأساسي لا تضاف إلى النتائج
+                    if 'error' not in page_result:
+                        results[page_url] = page_result
+                        if checkpoint is not None:
+                            checkpoint.add_result(page_url, page_result)
                 
-                # إضافة النتائج
-                results[page_url] = page_result
-                
-            except Exception as e:
-                logger.error(f"خطأ أثناء تحليل الصفحة {page_url}: {str(e)}")
+                # الزحف انتهى دون انقطاع (حالة الزاحف حُفظت عند انتهاء iter_pages)
+                if checkpoint is not None:
+                    checkpoint.complete()
+            finally:
+                # حفظ آخر النتائج حتى عند فشل المهمة
+                pages.close()
+                link_checker.close()
+                if checkpoint is not None:
+                    checkpoint.flush()
+                    checkpoint.close()
+                if distributed:
+                    crawler.close()
+                if analysis_cache is not None:
+                    analysis_cache.close()
+        
+        if not crawled_count:
+            running_jobs[job_id]['status'] = 'error'
+            running_jobs[job_id]['message'] = 'لم يتم العثور على أي صفحات للتحليل.'
+            return
+        
+        # كشف العناوين والأوصاف والمحتوى المكرر على مستوى الموقع
+        duplicate_detector = DuplicateDetector.from_config(config)
+        for page_url, page_result in results.items():
+            duplicate_detector.add(page_url, page_result)
+        duplicate_detector.annotate(results)
+        duplicates_report = duplicate_detector.report()
+        
+        # PageRank الداخلي وعمق النقرات والصفحات اليتيمة لكل صفحة
+        if link_graph is not None:
+            link_graph.annotate(results)
         
         # تحليل المنافسين إذا تم تحديدهم
         if competitor_analyzer and competitor_domains:
@@ -229,6 +311,10 @@ def analyze_website_job(job_id, url, options):
             if competitors_results:
                 results['competitors'] = competitors_results
         
+        results['duplicates'] = duplicates_report
+        if link_graph is not None:
+            results['link_graph'] = link_graph.report()
+        
         # تحديث الحالة
         running_jobs[job_id]['progress'] = 90
         running_jobs[job_id]['message'] = 'جاري إنشاء التقرير...'
@@ -267,28 +353,11 @@ def analyze_website_job(job_id, url, options):
                     
                     wp_integration.apply_fixes(fixed_items)
         
-        # حساب إحصائيات النتائج
-        total_issues = 0
-        total_score = 0
-        page_count = len(results) - (1 if 'competitors' in results else 0)
-        
-        for page_url, page_data in results.items():
-            if page_url == 'competitors':
-                continue
-                
-            # حساب عدد المشاكل
-            issues = 0
-            for category, category_data in page_data.items():
-                if isinstance(category_data, dict) and 'issues' in category_data:
-                    issues += len(category_data['issues'])
-            total_issues += issues
-            
-            # حساب النتيجة الإجمالية
-            if 'basic_seo' in page_data and 'score' in page_data['basic_seo']:
-                total_score += page_data['basic_seo']['score']
-        
-        # متوسط النتيجة
-        average_score = round(total_score / page_count if page_count > 0 else 0, 1)
+        # حساب إحصائيات النتائج من جدول النتائج العمودي
+        results_table = ResultsTable.from_results(results)
+        page_count = len(results_table)
+        total_issues = results_table.total('all_issues')
+        average_score = round(results_table.mean('basic_score'), 1)
         
         # حفظ ملخص النتائج
         summary = {
@@ -298,6 +367,7 @@ def analyze_website_job(job_id, url, options):
             'total_pages': page_count,
             'total_issues': total_issues,
             'average_score': average_score,
+            'statistics': results_table.summary(),
             'elapsed_time': format_time(time.time() - start_time)
         }
         
@@ -377,10 +447,14 @@ def analyze():
         'wp_api': request.json.get('wp_api', False),
         'competitor_domains': request.json.get('competitor_domains', []),
         'use_parallel': request.json.get('use_parallel', False),
+        'distributed': request.json.get('distributed', False),
+        'workers': request.json.get('workers'),
+        'seed_from_sitemaps': request.json.get('seed_from_sitemaps'),
         'max_concurrent': request.json.get('max_concurrent', 10),
         'analyze_core_web_vitals': request.json.get('analyze_core_web_vitals', True),
         'analyze_eeat': request.json.get('analyze_eeat', True),
-        'analyze_schema': request.json.get('analyze_schema', True)
+        'analyze_schema': request.json.get('analyze_schema', True),
+        'resume': request.json.get('resume')
     }
     
     # إضافة بيانات WordPress إذا تم تحديدها
@@ -438,6 +512,7 @@ def get_job_status(job_id):
         'status': job.get('status'),
         'progress': job.get('progress', 0),
         'message': job.get('message', ''),
+        'crawl_id': job.get('crawl_id'),
         'result': job.get('result'),
         'elapsed_time': format_time(time.time() - job.get('start_time', time.time()))
     }), 200
@@ -12,6 +12,8 @@ from datetime import datetime
 # استيراد الوحدات الداخلية
 from modules.analyzer import SEOAnalyzer
 from modules.crawler import WebCrawler
+from modules.page_store import PageStore, StoredPage
+from modules.parsed_page import configure_parser
 from modules.page_speed import PageSpeedAnalyzer
 from modules.content_analyzer import ContentAnalyzer
 from modules.image_optimizer import ImageOptimizer
@@ -28,6 +30,7 @@ from utils.logger import setup_logger, get_logger
 # تحميل الإعدادات
 config_loader = ConfigLoader()
 config = config_loader.get_all()
+configure_parser(config)
 
 # إعداد المسجل
 logger = get_logger("rseo_streamlit")
@@ -116,7 +119,8 @@ def analyze_website():
             max_depth=depth,
             delay=delay,
             respect_robots_txt=respect_robots,
-            verbose=verbose
+            verbose=verbose,
+            page_store=PageStore.from_config(config)
         )
         
         # بدء الزحف
@@ -192,6 +196,13 @@ def analyze_website():
             except Exception as e:
                 logger.error(f"خطأ أثناء تحليل الصفحة {page_url}: {str(e)}")
                 st.error(f"خطأ أثناء تحليل الصفحة {page_url}: {str(e)}")
+            
+            # تحرير محتوى الصفحة المحمل من مخزن الصفحات
+            if isinstance(page_data, StoredPage):
+                page_data.release()
+        
+        if crawler.page_store is not None:
+            crawler.page_store.close()
         
         # توليد التقرير
         progress_status.write("جاري إنشاء التقرير...")
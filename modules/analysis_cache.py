@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة ذاكرة نتائج التحليل - إعادة استخدام نتائج الصفحات التي لم يتغير محتواها
+
+تحفظ الوحدة لكل صفحة بصمة محتواها بعد توحيده (بدون التعليقات وفروق
+المسافات) مع نتائج تحليلها. عند إعادة تحليل الموقع (مثل مهام المراقبة
+اليومية) تُعاد نتائج الصفحات التي لم تتغير بصمتها دون تشغيل المحللات، ولا
+يُعاد إلا حساب الإحصائيات على مستوى الموقع وفحص الروابط.
+
+لا تُحفظ نتائج الخطوات التي تقيس الصفحة عبر الشبكة (LIVE_STEPS)، ومنها الصور
+التي تُحمل لمعرفة أحجامها وحالتها، لأنها تتغير دون تغير HTML وتُعاد في كل تحليل. كذلك تُعاد أقسام السيو الأساسي التي تعتمد
+على ملفات الموقع (robots.txt وsitemap.xml) لا على محتوى الصفحة.
+
+ترتبط كل نتيجة ببصمة إعدادات التحليل: خطوات التحليل، وقسمي seo_analysis
+وparsing من الإعدادات، والشفرة المصدرية لوحدات المحللات. أي تغيير في أحدها
+يجعل النتائج المحفوظة غير صالحة تلقائيًا.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import importlib.util
+
+logger = logging.getLogger('rseo.analysis_cache')
+
+# إصدار صيغة النتائج (يُرفع يدويًا لإبطال جميع النتائج المحفوظة)
+CACHE_VERSION = 1
+
+# أقسام الإعدادات التي تؤثر في نتائج التحليل
+ANALYSIS_CONFIG_SECTIONS = ('seo_analysis', 'parsing')
+
+# خطوات القياس عبر الشبكة (زمن التحميل ومؤشرات الأداء وتحميل الصور) التي لا تُحفظ نتائجها
+LIVE_STEPS = ('page_speed', 'core_web_vitals', 'images')
+
+# الوحدات التي تحدد نتائج كل خطوة تحليل محفوظة
+STEP_MODULES = {
+    'basic_seo': ('modules.analyzer', 'modules.seo_rules', 'modules.results_table'),
+    'content': ('modules.content_analyzer',),
+    'keywords': ('modules.keyword_analyzer',),
+    'eeat': ('modules.eeat_analyzer',),
+    'schema': ('modules.schema_analyzer',),
+}
+
+# الوحدات المشتركة بين جميع الخطوات
+COMMON_MODULES = ('modules.parsed_page', 'modules.analysis_executor')
+
+_COMMENTS = re.compile(r'<!--.*?-->', re.DOTALL)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def content_hash(html):
+    """
+    بصمة محتوى الصفحة بعد توحيده
+
+    تُحذف التعليقات وتُوحد المسافات حتى لا تُعتبر الصفحة متغيرة بسبب تنسيق
+    الشفرة أو تعليقات تضيفها إضافات التخزين المؤقت.
+
+    Args:
+        html (str): محتوى HTML
+
+    Returns:
+        str: البصمة (ست عشرية)
+    """
+    normalized = _WHITESPACE.sub(' ', _COMMENTS.sub('', html or '')).strip()
+    return hashlib.blake2b(normalized.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+def _module_source(module_name):
+    """محتوى ملف الوحدة دون استيرادها (فارغ إذا لم يوجد الملف)"""
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return b''
+    if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+        return b''
+    with open(spec.origin, 'rb') as f:
+        return f.read()
+
+
+def analysis_fingerprint(config, steps):
+    """
+    بصمة إعدادات التحليل التي تُربط بها النتائج المحفوظة
+
+    Args:
+        config (dict): إعدادات التطبيق
+        steps (iterable): خطوات التحليل
+
+    Returns:
+        str: البصمة (ست عشرية)
+    """
+    config = config or {}
+    steps = sorted(steps)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps({
+        'version': CACHE_VERSION,
+        'steps': steps,
+        'config': {section: config.get(section) for section in ANALYSIS_CONFIG_SECTIONS},
+    }, sort_keys=True, default=str).encode('utf-8'))
+
+    modules = list(COMMON_MODULES)
+    for step in steps:
+        modules.extend(STEP_MODULES.get(step, ()))
+    for module_name in modules:
+        digest.update(module_name.encode('utf-8'))
+        digest.update(hashlib.blake2b(_module_source(module_name), digest_size=16).digest())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    ذاكرة دائمة على القرص (SQLite) لنتائج تحليل الصفحات
+    """
+
+    def __init__(self, db_path="data/analysis_cache.db", fingerprint='', max_age_days=30):
+        """
+        تهيئة الذاكرة
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+            fingerprint (str): بصمة إعدادات التحليل الحالية (analysis_fingerprint)
+            max_age_days (float): عمر النتائج الأقصى بالأيام (تُحذف الأقدم عند التهيئة، 0 بلا حد)
+        """
+        self.db_path = db_path
+        self.fingerprint = fingerprint
+        self.max_age_days = max_age_days
+        self.hits = 0  # عدد الصفحات التي أعيدت نتائجها
+        self.misses = 0  # عدد الصفحات التي حُللت من جديد
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # اتصال واحد مشترك بين الخيوط (مهام المراقبة تعمل في خيوط المجدول)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.setup_database()
+        self.prune()
+
+    @classmethod
+    def from_config(cls, config, steps):
+        """
+        إنشاء الذاكرة من إعدادات التطبيق (القسم analysis.cache)
+
+        Args:
+            config (dict): إعدادات التطبيق
+            steps (iterable): خطوات التحليل التي تُحفظ نتائجها
+
+        Returns:
+            AnalysisCache or None: الذاكرة، أو None إذا كانت معطلة
+        """
+        cache_config = (config or {}).get('analysis', {}).get('cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        return cls(
+            db_path=cache_config.get('path', 'data/analysis_cache.db'),
+            fingerprint=analysis_fingerprint(config, steps),
+            max_age_days=cache_config.get('max_age_days', 30)
+        )
+
+    def setup_database(self):
+        """إنشاء جدول النتائج إذا لم يكن موجودًا"""
+        with self._lock:
+            self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT,
+                fingerprint TEXT,
+                content_hash TEXT,
+                result TEXT,
+                analyzed_at REAL,
+                PRIMARY KEY (url, fingerprint)
+            )
+            ''')
+            self._conn.commit()
+
+    def prune(self):
+        """حذف النتائج الأقدم من max_age_days (ومنها نتائج إعدادات التحليل القديمة)"""
+        if not self.max_age_days:
+            return
+        with self._lock:
+            deleted = self._conn.execute('DELETE FROM results WHERE analyzed_at < ?',
+                                         (time.time() - self.max_age_days * 86400,)).rowcount
+            self._conn.commit()
+        if deleted:
+            logger.info(f"تم حذف {deleted} نتيجة تحليل قديمة")
+
+    def get(self, url, page_hash):
+        """
+        النتيجة المحفوظة لصفحة لم يتغير محتواها
+
+        Args:
+            url (str): عنوان الصفحة
+            page_hash (str): بصمة محتوى الصفحة الحالي (content_hash)
+
+        Returns:
+            dict or None: نتيجة التحليل، أو None إذا تغيرت الصفحة أو الإعدادات
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT content_hash, result FROM results WHERE url = ? AND fingerprint = ?',
+                (url, self.fingerprint)
+            ).fetchone()
+
+        if row is None or row[0] != page_hash:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[1])
+
+    def store(self, url, page_hash, result):
+        """
+        حفظ نتيجة تحليل صفحة (بدون نتائج LIVE_STEPS)
+
+        Args:
+            url (str): عنوان الصفحة
+            page_hash (str): بصمة محتوى الصفحة (content_hash)
+            result (dict): نتيجة التحليل
+        """
+        result = {step: value for step, value in result.items() if step not in LIVE_STEPS}
+        data = json.dumps(result, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (url, fingerprint, content_hash, result, analyzed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (url, self.fingerprint, page_hash, data, time.time())
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """حذف جميع النتائج المحفوظة"""
+        with self._lock:
+            self._conn.execute('DELETE FROM results')
+            self._conn.commit()
+
+    def close(self):
+        """إغلاق الاتصال بقاعدة البيانات"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,474 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة منفذ التحليل - توزيع تحليل الصفحات على مجمع عمليات
+
+تحليل الصفحة (BeautifulSoup والتعابير النمطية وعد الكلمات المفتاحية) عمل
+مقيد بالمعالج، لذلك يوزع المنفذ الصفحات على عدة عمليات ويعيد النتائج بنفس
+ترتيب الصفحات فور جاهزيتها. يبقى فحص الروابط في العملية الرئيسية لأنه يعتمد
+على ذاكرة حالات الروابط المشتركة خلال الزحف.
+
+تُحلل كل صفحة بـ BeautifulSoup مرة واحدة داخل العملية العاملة فقط، بينما يقرأ
+فاحص الروابط في العملية الرئيسية الروابط التي مسحها الزاحف (hrefs).
+
+تُجلب ملفات robots.txt وsitemap.xml مرة واحدة لكل موقع في العملية الرئيسية،
+وتُرسل معلوماتها مع كل صفحة إلى العملية العاملة بدل أن تجلبها كل عملية.
+"""
+
+import os
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from modules.parsed_page import ParsedPage, configure_parser
+from modules.page_store import StoredPage
+from modules.analysis_cache import LIVE_STEPS, content_hash
+from modules.site_info import site_info_cache
+
+logger = logging.getLogger('rseo.analysis_executor')
+
+# خطوات التحليل بالترتيب الذي تظهر به في نتائج الصفحة
+DEFAULT_STEPS = ('basic_seo', 'page_speed', 'content', 'images', 'links', 'keywords',
+                 'core_web_vitals', 'eeat', 'schema')
+
+# الخطوات التي تنفذ في العملية الرئيسية
+PARENT_STEPS = ('links',)
+
+# الخطوات التي تقيس الصفحة بعنوانها فقط (دون HTML)
+URL_STEPS = ('page_speed', 'core_web_vitals')
+
+
+class PagePipeline:
+    """
+    سلسلة تحليل صفحة واحدة (تُنشأ مرة واحدة في كل عملية عاملة)
+    """
+
+    def __init__(self, config=None, steps=DEFAULT_STEPS):
+        """
+        تهيئة سلسلة التحليل
+
+        Args:
+            config (dict): إعدادات التطبيق
+            steps (iterable): أسماء خطوات التحليل المطلوبة
+        """
+        self.config = config or {}
+        self.steps = [step for step in steps if step not in PARENT_STEPS]
+        self.analyzers = {}
+
+    def _get_analyzer(self, step):
+        """إنشاء محلل الخطوة عند أول استخدام (لتجنب تحميل مكتبات غير مطلوبة)"""
+        if step in self.analyzers:
+            return self.analyzers[step]
+
+        if step == 'basic_seo':
+            from modules.analyzer import SEOAnalyzer
+            analyzer = SEOAnalyzer(config=self.config)
+        elif step == 'page_speed':
+            from modules.page_speed import PageSpeedAnalyzer
+            analyzer = PageSpeedAnalyzer()
+        elif step == 'content':
+            from modules.content_analyzer import ContentAnalyzer
+            analyzer = ContentAnalyzer()
+        elif step == 'images':
+            from modules.image_optimizer import ImageOptimizer
+            analyzer = ImageOptimizer()
+        elif step == 'keywords':
+            from modules.keyword_analyzer import KeywordAnalyzer
+            analyzer = KeywordAnalyzer()
+        elif step == 'core_web_vitals':
+            from modules.core_web_vitals import CoreWebVitalsAnalyzer
+            analyzer = CoreWebVitalsAnalyzer(config=self.config)
+        elif step == 'eeat':
+            from modules.eeat_analyzer import EEATAnalyzer
+            analyzer = EEATAnalyzer(config=self.config)
+        elif step == 'schema':
+            from modules.schema_analyzer import SchemaAnalyzer
+            analyzer = SchemaAnalyzer(config=self.config)
+        else:
+            raise ValueError(f"خطوة تحليل غير معروفة: {step}")
+
+        self.analyzers[step] = analyzer
+        return analyzer
+
+    def _run_step(self, step, page_url, page):
+        """تنفيذ خطوة تحليل واحدة"""
+        analyzer = self._get_analyzer(step)
+
+        if step == 'basic_seo':
+            return analyzer.analyze_page(page)
+        if step in URL_STEPS:
+            return analyzer.analyze(page_url)
+        if step == 'images':
+            return analyzer.analyze_images(page)
+        if step in ('eeat', 'schema'):
+            return analyzer.analyze(page_url, parsed_page=page)
+        return analyzer.analyze(page)
+
+    def run(self, page_url, page_data):
+        """
+        تحليل صفحة واحدة
+
+        Args:
+            page_url (str): عنوان URL للصفحة
+            page_data (dict): بيانات الصفحة من الزاحف
+
+        Returns:
+            dict: نتائج الصفحة (أو {'error': ...} إذا فشل التحليل الأساسي)
+        """
+        page_result = {}
+
+        try:
+            # تحليل HTML مرة واحدة ومشاركته مع جميع المحللات
+            page = ParsedPage.from_page_data(page_data)
+
+            for step in self.steps:
+                # فشل التحليل الأساسي يفشل الصفحة، بينما تُتجاهل بقية الخطوات الفاشلة
+                if step == 'basic_seo':
+                    page_result[step] = self._run_step(step, page_url, page)
+                    continue
+
+                try:
+                    page_result[step] = self._run_step(step, page_url, page)
+                except Exception as e:
+                    logger.warning(f"فشل تحليل {step} للصفحة {page_url}: {str(e)}")
+
+        except Exception as e:
+            logger.error(f"خطأ أثناء تحليل الصفحة {page_url}: {str(e)}")
+            return {'error': str(e)}
+
+        return page_result
+
+    def refresh(self, page_url, page_result, page_data=None):
+        """
+        إكمال نتيجة محفوظة لصفحة لم يتغير محتواها
+
+        تُعاد خطوات القياس عبر الشبكة (LIVE_STEPS) وأقسام السيو الأساسي على مستوى
+        الموقع، لأنها تتغير دون تغير HTML الصفحة.
+
+        Args:
+            page_url (str): عنوان URL للصفحة
+            page_result (dict): النتيجة المحفوظة
+            page_data (dict, optional): بيانات الصفحة (مطلوبة للخطوات الحية التي تقرأ HTML مثل images)
+
+        Returns:
+            dict: نتائج الصفحة بترتيب الخطوات
+        """
+        basic_seo = page_result.get('basic_seo')
+        if 'basic_seo' in self.steps and isinstance(basic_seo, dict):
+            try:
+                self._get_analyzer('basic_seo').refresh_site_sections(basic_seo, page_url)
+            except Exception as e:
+                logger.warning(f"فشل تحديث أقسام الموقع للصفحة {page_url}: {str(e)}")
+
+        page = None
+        refreshed = {}
+        for step in self.steps:
+            if step in LIVE_STEPS:
+                try:
+                    # تحليل HTML عند أول خطوة تحتاج إليه فقط
+                    if step not in URL_STEPS and page is None:
+                        page = ParsedPage.from_page_data(page_data)
+                    refreshed[step] = self._run_step(step, page_url, page)
+                except Exception as e:
+                    logger.warning(f"فشل تحليل {step} للصفحة {page_url}: {str(e)}")
+            elif step in page_result:
+                refreshed[step] = page_result[step]
+        return refreshed
+
+
+# سلسلة التحليل الخاصة بكل عملية عاملة
+_worker_pipeline = None
+
+
+def _init_worker(config, steps):
+    """تهيئة العملية العاملة بسلسلة تحليل واحدة تُعاد لجميع صفحاتها"""
+    global _worker_pipeline
+    # العمليات العاملة (spawn) لا ترث محرك التحليل المختار في العملية الرئيسية
+    configure_parser(config)
+    _worker_pipeline = PagePipeline(config, steps)
+
+
+def _seed_site(site):
+    """تخزين معلومات الموقع التي جلبتها العملية الرئيسية في ذاكرة العملية العاملة"""
+    if site is not None:
+        site_info_cache.seed(site)
+
+
+def _analyze_in_worker(page_url, page_data, site=None):
+    """تحليل صفحة داخل العملية العاملة"""
+    _seed_site(site)
+    return _worker_pipeline.run(page_url, page_data)
+
+
+def _refresh_in_worker(page_url, page_result, page_data=None, site=None):
+    """إكمال نتيجة محفوظة داخل العملية العاملة"""
+    _seed_site(site)
+    return _worker_pipeline.refresh(page_url, page_result, page_data)
+
+
+class AnalysisExecutor:
+    """
+    منفذ تحليل الصفحات على مجمع عمليات مع إعادة النتائج بالترتيب
+    """
+
+    def __init__(self, config=None, steps=DEFAULT_STEPS, max_workers=None, link_checker=None,
+                 progress_callback=None, start_method=None, cache=None):
+        """
+        تهيئة المنفذ
+
+        Args:
+            config (dict): إعدادات التطبيق (القسم analysis لإعدادات المنفذ)
+            steps (iterable): خطوات التحليل المطلوبة
+            max_workers (int): عدد العمليات (الافتراضي من الإعدادات أو عدد المعالجات، 1 = بدون عمليات)
+            link_checker (LinkChecker, optional): فاحص الروابط للخطوة 'links'
+            progress_callback (callable, optional): دالة تُستدعى بعد كل صفحة (المنجز, الإجمالي, URL)
+            start_method (str): طريقة بدء العمليات ('spawn' أو 'fork' أو 'forkserver')
+            cache (AnalysisCache, optional): ذاكرة نتائج الصفحات التي لم يتغير محتواها منذ التحليل السابق
+        """
+        self.config = config or {}
+        analysis_config = self.config.get('analysis', {})
+
+        self.steps = tuple(steps)
+        self.link_checker = link_checker if 'links' in self.steps else None
+        self.progress_callback = progress_callback
+        self.cache = cache
+        # إرسال HTML الصفحة مع النتائج المحفوظة فقط إذا قرأته إحدى الخطوات الحية (مثل images)
+        self._refresh_needs_page = any(step in LIVE_STEPS and step not in URL_STEPS for step in self.steps)
+        self.max_workers = max_workers or analysis_config.get('workers') or os.cpu_count() or 1
+        self.start_method = start_method or analysis_config.get('start_method', 'spawn')
+
+        # عدد الصفحات المرسلة مسبقًا لكل عملية حتى لا تبقى العمليات خاملة
+        self.max_pending = self.max_workers * analysis_config.get('prefetch_per_worker', 2)
+
+        # أقل عدد من الصفحات لاستخدام مجمع العمليات
+        self.min_pool_pages = analysis_config.get('min_pool_pages', 8)
+
+        self._pool = None
+        self._pipeline = None
+        self._done = 0
+        self._total = None
+        self._release_pages = False
+
+    def _get_pool(self):
+        """إنشاء مجمع العمليات عند أول استخدام"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.config, self.steps)
+            )
+        return self._pool
+
+    def _reset_pool(self):
+        """التخلص من مجمع عمليات معطل"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @staticmethod
+    def _payload(page_data):
+        """بيانات الصفحة القابلة للإرسال إلى العملية العاملة (بدون الشجرة المحللة وروابط الزاحف)"""
+        if isinstance(page_data, ParsedPage):
+            page_data = dict(page_data.page_data, url=page_data.url, html=page_data.html)
+        return {key: value for key, value in page_data.items() if key not in ('parsed', 'hrefs')}
+
+    def _site(self, page_url):
+        """
+        معلومات robots.txt وsitemap.xml لموقع الصفحة (تُجلب مرة واحدة في العملية الرئيسية)
+
+        Returns:
+            dict or None: معلومات الموقع (SiteInfo.to_dict)، أو None إذا لم تُطلب خطوة basic_seo
+        """
+        if 'basic_seo' not in self.steps:
+            return None
+        site_info_cache.robots(page_url)
+        return site_info_cache.sitemap(page_url).to_dict()
+
+    def _submit(self, page_url, page_data):
+        """إرسال صفحة إلى مجمع العمليات (None إذا كان المجمع معطلًا)"""
+        try:
+            return self._get_pool().submit(_analyze_in_worker, page_url, self._payload(page_data),
+                                           self._site(page_url))
+        except BrokenProcessPool:
+            return None
+
+    def _submit_refresh(self, page_url, page_data, page_result):
+        """إرسال نتيجة محفوظة إلى مجمع العمليات لإكمالها (None إذا كان المجمع معطلًا)"""
+        payload = self._payload(page_data) if self._refresh_needs_page else None
+        try:
+            return self._get_pool().submit(_refresh_in_worker, page_url, page_result, payload,
+                                           self._site(page_url))
+        except BrokenProcessPool:
+            return None
+
+    def _run_isolated(self, page_url, page_data):
+        """إعادة تحليل صفحة بمفردها بعد تعطل المجمع لتحديد الصفحة المسببة"""
+        try:
+            future = self._submit(page_url, page_data)
+            if future is None:
+                raise BrokenProcessPool()
+            return future.result()
+        except BrokenProcessPool:
+            logger.error(f"تعطلت العملية العاملة أثناء تحليل الصفحة {page_url}")
+            self._reset_pool()
+            return {'error': 'تعطلت العملية العاملة أثناء تحليل الصفحة'}
+
+    def _start_links(self, page_data):
+        """بدء فحص روابط الصفحة في الخلفية أثناء تحليلها في العمليات العاملة"""
+        if self.link_checker is None:
+            return
+        try:
+            self.link_checker.prefetch([page_data], wait=False)
+        except Exception as e:
+            logger.warning(f"فشل بدء فحص روابط الصفحة {page_data.get('url', '')}: {str(e)}")
+
+    def _cached(self, page_url, page_data):
+        """
+        البحث عن نتيجة محفوظة للصفحة
+        
+        Returns:
+            tuple: (بصمة المحتوى أو None بدون ذاكرة, النتيجة المحفوظة أو None)
+        """
+        if self.cache is None:
+            return None, None
+        page_hash = content_hash(page_data.get('html', ''))
+        return page_hash, self.cache.get(page_url, page_hash)
+
+    def _finish(self, page_url, page_data, page_result, page_hash=None):
+        """
+        إكمال نتائج الصفحة في العملية الرئيسية (فحص الروابط) والإبلاغ عن التقدم
+
+        page_hash يُمرر للصفحات المحللة من جديد فقط، فتُحفظ نتيجتها قبل إضافة الروابط
+        (حالات الروابط تتغير دون تغير الصفحة، لذلك تُفحص في كل مرة).
+        """
+        if page_hash is not None and 'error' not in page_result:
+            self.cache.store(page_url, page_hash, page_result)
+
+        if self.link_checker is not None and 'error' not in page_result:
+            try:
+                page_result['links'] = self.link_checker.check_links(page_data)
+            except Exception as e:
+                logger.warning(f"فشل فحص روابط الصفحة {page_url}: {str(e)}")
+
+        # تحرير محتوى الصفحة فور الانتهاء منها حتى يبقى استهلاك الذاكرة ثابتًا
+        if self._release_pages:
+            if isinstance(page_data, StoredPage):
+                page_data.release()
+            elif isinstance(page_data, dict):
+                page_data.pop('html', None)
+                page_data.pop('parsed', None)
+
+        self._done += 1
+        if self.progress_callback:
+            self.progress_callback(self._done, self._total, page_url)
+
+        return page_url, page_result
+
+    def map(self, pages, total=None, release_pages=False):
+        """
+        تحليل الصفحات وإعادة النتائج بنفس ترتيبها فور جاهزيتها
+
+        يمكن أن تكون الصفحات مولدًا (مثل WebCrawler.iter_pages) فيبدأ التحليل
+        أثناء استمرار الزحف.
+
+        Args:
+            pages (dict or iterable): بيانات الصفحات (قاموس URL -> بيانات أو أزواج (URL, بيانات))
+            total (int, optional): العدد الإجمالي للصفحات (للإبلاغ عن التقدم)
+            release_pages (bool): تحرير HTML الصفحة وشجرتها المحللة بعد الانتهاء منها
+
+        Yields:
+            tuple: (URL, نتائج الصفحة)
+        """
+        if isinstance(pages, dict):
+            pages = pages.items()
+        if total is None and hasattr(pages, '__len__'):
+            total = len(pages)
+
+        self._done = 0
+        self._total = total
+        self._release_pages = release_pages
+
+        # التحليل في نفس العملية عند عدم الحاجة إلى مجمع عمليات (تكلفة بدء العمليات أكبر من الفائدة)
+        if self.max_workers <= 1 or (total is not None and total < self.min_pool_pages):
+            if self._pipeline is None:
+                self._pipeline = PagePipeline(self.config, self.steps)
+            for page_url, page_data in pages:
+                self._start_links(page_data)
+                page_hash, page_result = self._cached(page_url, page_data)
+                if page_result is not None:
+                    yield self._finish(page_url, page_data,
+                                       self._pipeline.refresh(page_url, page_result, page_data))
+                else:
+                    yield self._finish(page_url, page_data, self._pipeline.run(page_url, page_data), page_hash)
+            self._log_cache()
+            return
+
+        source = iter(pages)
+        window = deque()
+
+        def fill():
+            while len(window) < self.max_pending:
+                # عدم انتظار الصفحة التالية من المصدر إذا كانت نتيجة جاهزة للتسليم
+                if window and window[0][2] is not None and window[0][2].done():
+                    return
+                item = next(source, None)
+                if item is None:
+                    return
+                page_url, page_data = item
+                self._start_links(page_data)
+                page_hash, page_result = self._cached(page_url, page_data)
+                if page_result is not None:
+                    # نتيجة محفوظة: تُعاد قياسات الشبكة وأقسام الموقع فقط
+                    window.append((page_url, page_data, self._submit_refresh(page_url, page_data, page_result),
+                                   None))
+                else:
+                    window.append((page_url, page_data, self._submit(page_url, page_data), page_hash))
+
+        fill()
+        while window:
+            page_url, page_data, future, page_hash = window.popleft()
+
+            try:
+                if future is None:
+                    raise BrokenProcessPool()
+                page_result = future.result()
+            except BrokenProcessPool:
+                # لا يمكن معرفة الصفحة المسببة، لذلك يعاد تحليل الصفحات المعلقة واحدة تلو الأخرى
+                logger.error("تعطل مجمع عمليات التحليل، جاري إعادة تحليل الصفحات المعلقة")
+                suspects = [(page_url, page_data, page_hash)] + [
+                    (url, data, data_hash) for url, data, _, data_hash in window]
+                window.clear()
+                self._reset_pool()
+                for suspect_url, suspect_data, suspect_hash in suspects:
+                    yield self._finish(suspect_url, suspect_data,
+                                       self._run_isolated(suspect_url, suspect_data), suspect_hash)
+                fill()
+                continue
+            except Exception as e:
+                logger.error(f"خطأ أثناء تحليل الصفحة {page_url}: {str(e)}")
+                page_result = {'error': str(e)}
+
+            yield self._finish(page_url, page_data, page_result, page_hash)
+            fill()
+
+        self._log_cache()
+
+    def _log_cache(self):
+        """تسجيل عدد الصفحات التي أعيدت نتائجها من الذاكرة"""
+        if self.cache is not None and (self.cache.hits or self.cache.misses):
+            logger.info(f"ذاكرة التحليل: {self.cache.hits} صفحة لم تتغير، {self.cache.misses} صفحة حُللت من جديد")
+
+    def close(self):
+        """إيقاف مجمع العمليات"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
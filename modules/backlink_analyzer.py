@@ -16,7 +16,6 @@ import pandas as pd
 from datetime import datetime, timedelta
 from urllib.parse import urlparse, urljoin
 import requests
-from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor
 from fake_useragent import UserAgent
 import networkx as nx
@@ -26,6 +25,7 @@ matplotlib.use('Agg')  # استخدام المحرك غير التفاعلي
 
 from utils.config_loader import ConfigLoader
 from utils.helpers import validate_url, create_directory
+from modules.parsed_page import make_soup
 
 class BacklinkAnalyzer:
     """
@@ -155,7 +155,7 @@ class BacklinkAnalyzer:
                 return result
             
             # تحليل المحتوى
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # البحث عن جميع الروابط التي تشير إلى النطاق الهدف
             links = soup.find_all('a', href=True)
@@ -504,7 +504,7 @@ class BacklinkAnalyzer:
                             })
                 else:
                     # تحليل نتائج البحث
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = make_soup(response.text)
                     for link in soup.find_all('a', href=True):
                         href = link.get('href', '')
                         
@@ -7,7 +7,6 @@ RSEO - محلل المنافسين
 
 import re
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 import json
 import time
@@ -15,6 +14,7 @@ from concurrent.futures import ThreadPoolExecutor
 
 from utils.logger import get_logger
 from modules.crawler import WebCrawler
+from modules.parsed_page import make_soup
 
 class CompetitorAnalyzer:
     """محلل المنافسين - يقوم بتحليل المواقع المنافسة ومقارنتها مع موقعك"""
@@ -140,7 +140,7 @@ class CompetitorAnalyzer:
         try:
             response = requests.get(url, headers=self.headers, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 
                 # استخراج عنوان الصفحة
                 title_tag = soup.find('title')
@@ -406,7 +406,7 @@ class CompetitorAnalyzer:
                     tech_info['server'] = server_header
                 
                 html_content = response.text
-                soup = BeautifulSoup(html_content, 'html.parser')
+                soup = make_soup(html_content)
                 
                 # اكتشاف نظام إدارة المحتوى (CMS)
                 # WordPress
@@ -510,7 +510,7 @@ class CompetitorAnalyzer:
                 performance_metrics['load_time_ms'] = response_time_ms * 2
                 
                 # عدد الطلبات (تقدير بسيط)
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 scripts = len(soup.find_all('script', src=True))
                 stylesheets = len(soup.find_all('link', rel='stylesheet'))
                 images = len(soup.find_all('img'))
@@ -10,9 +10,9 @@
 import re
 import logging
 from collections import Counter
-from bs4 import BeautifulSoup
 import spacy
 from urllib.parse import urlparse
+from modules.parsed_page import ParsedPage, extract_text, is_inside
 
 class ContentAnalyzer:
     """
@@ -70,7 +70,7 @@ class ContentAnalyzer:
         تحليل محتوى صفحة ويب
         
         Args:
-            page_data (dict): بيانات الصفحة المحتوية على HTML والعنوان URL
+            page_data (dict or ParsedPage): بيانات الصفحة المحتوية على HTML والعنوان URL
             
         Returns:
             dict: نتائج تحليل المحتوى
@@ -87,18 +87,18 @@ class ContentAnalyzer:
                 'issues': []
             }
         
-        # تحليل HTML باستخدام BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # الحصول على الصفحة المحللة المشتركة (تحلل مرة واحدة لجميع المحللات)
+        page = ParsedPage.from_page_data(page_data)
         
         # استخراج النص الرئيسي للصفحة (تجاهل العناصر غير الضرورية)
-        main_text = self._extract_main_content(soup)
+        main_text = self._extract_main_content(page)
         
         # حساب عدد الكلمات
         words = self._tokenize_text(main_text)
         word_count = len(words)
         
         # تحليل الكلمات المفتاحية
-        keywords = self._extract_keywords(words, soup, url)
+        keywords = self._extract_keywords(words, page, url)
         
         # تحليل قابلية القراءة
         readability = self._analyze_readability(main_text)
@@ -146,29 +146,33 @@ class ContentAnalyzer:
         
         return result
     
-    def _extract_main_content(self, soup):
+    def _extract_main_content(self, page):
         """
         استخراج المحتوى النصي الرئيسي من الصفحة
         
         Args:
-            soup (BeautifulSoup): كائن BeautifulSoup لتحليل HTML
+            page (ParsedPage): الصفحة المحللة
             
         Returns:
             str: النص الرئيسي للصفحة
         """
-        # إزالة العناصر غير المرغوب بها
-        for element in soup(['script', 'style', 'head', 'title', 'meta', 'link', 
-                            'nav', 'footer', 'header', 'aside', 'form']):
-            element.decompose()
+        # العناصر غير المرغوب بها (تُتجاهل دون تعديل الشجرة المشتركة)
+        excluded = ('script', 'style', 'head', 'title', 'meta', 'link',
+                    'nav', 'footer', 'header', 'aside', 'form')
         
         # محاولة العثور على المحتوى الرئيسي
-        main_element = soup.find('main') or soup.find('article') or soup.find('div', {'class': ['content', 'main-content', 'entry-content', 'post-content']})
+        main_element = page.first('main', 'article', exclude=excluded)
+        if not main_element:
+            content_classes = {'content', 'main-content', 'entry-content', 'post-content'}
+            main_element = next((div for div in page.tags('div')
+                                 if content_classes.intersection(div.get('class', []))
+                                 and not is_inside(div, excluded)), None)
         
         if main_element:
-            text = main_element.get_text(separator=' ')
+            text = extract_text(main_element, exclude=excluded, separator=' ')
         else:
             # استخدام جسم الصفحة بالكامل إذا لم يتم العثور على المحتوى الرئيسي
-            text = soup.body.get_text(separator=' ') if soup.body else soup.get_text(separator=' ')
+            text = page.main_text(exclude=excluded)
         
         # تنظيف النص
         text = re.sub(r'\s+', ' ', text)  # استبدال مساحات متعددة بمسافة واحدة
@@ -200,13 +204,13 @@ class ContentAnalyzer:
             # تقسيم النص إلى كلمات
             return [word for word in text.split() if len(word) > 1]
     
-    def _extract_keywords(self, words, soup, url):
+    def _extract_keywords(self, words, page, url):
         """
         استخراج الكلمات المفتاحية من المحتوى
         
         Args:
             words (list): قائمة الكلمات في النص
-            soup (BeautifulSoup): كائن BeautifulSoup للصفحة
+            page (ParsedPage): الصفحة المحللة
             url (str): عنوان URL للصفحة
             
         Returns:
@@ -222,15 +226,16 @@ class ContentAnalyzer:
         word_counts = Counter([word.lower() for word in words if word.lower() not in stopwords])
         
         # استخراج الكلمات المفتاحية من العناصر المهمة في الصفحة
-        title_keywords = self._extract_keywords_from_element(soup.title.text if soup.title else "", stopwords)
+        title_tag = page.soup.title
+        title_keywords = self._extract_keywords_from_element(title_tag.text if title_tag else "", stopwords)
         
         meta_keywords = []
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        meta_desc = next((meta for meta in page.tags('meta') if meta.get('name') == 'description'), None)
         if meta_desc and 'content' in meta_desc.attrs:
             meta_keywords = self._extract_keywords_from_element(meta_desc['content'], stopwords)
         
         h1_keywords = []
-        h1_tags = soup.find_all('h1')
+        h1_tags = page.headings['h1']
         for h1 in h1_tags:
             h1_keywords.extend(self._extract_keywords_from_element(h1.text, stopwords))
         
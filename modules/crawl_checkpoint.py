@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة نقاط حفظ الزحف - حفظ حالة الزحف دوريًا لاستئنافه بعد الانقطاع
+
+تحفظ الوحدة في قاعدة بيانات SQLite قائمة الانتظار والروابط التي تمت زيارتها
+ونتائج تحليل الصفحات المكتملة. عند الاستئناف تُستعاد النتائج كما هي، ولا
+يُعاد جلب إلا الصفحات التي زارها الزاحف ولم يكتمل تحليلها قبل الانقطاع.
+
+تُحذف قائمة الانتظار والروابط المزارة عند اكتمال الزحف، وتُحذف العمليات
+المكتملة والمتوقفة بالكامل بعد max_age_days من آخر تحديث لها.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger('rseo.crawl_checkpoint')
+
+# حالات عملية الزحف
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+
+
+class CheckpointNotFound(LookupError):
+    """لا توجد نقطة حفظ بالمعرف المطلوب"""
+
+
+class CrawlCheckpoint:
+    """
+    نقطة حفظ لعملية زحف واحدة
+    """
+
+    def __init__(self, crawl_id=None, db_path="data/checkpoints.db", interval=30, resume=False, max_age_days=7):
+        """
+        تهيئة نقطة الحفظ
+
+        Args:
+            crawl_id (str, optional): معرف عملية الزحف (يُولد معرف جديد إذا لم يُحدد)
+            db_path (str): مسار قاعدة البيانات
+            interval (float): أقل مدة بين حفظين متتاليين (بالثواني)
+            resume (bool): استئناف عملية محفوظة بدل بدء عملية جديدة
+            max_age_days (float): عمر العمليات الأقصى بالأيام منذ آخر حفظ (تُحذف الأقدم عند التهيئة، 0 بلا حد)
+
+        Raises:
+            CheckpointNotFound: عند الاستئناف بمعرف غير موجود
+        """
+        self.crawl_id = crawl_id or uuid.uuid4().hex[:12]
+        self.db_path = db_path
+        self.interval = interval
+        self.resumed = resume
+        self.max_age_days = max_age_days
+
+        # حالة الاستئناف المحملة من قاعدة البيانات
+        self.start_url = None
+        self.options = {}
+        self.frontier = []  # [(الرابط, العمق)]
+        self.visited = {}  # الرابط -> العمق
+        self.results = {}  # الرابط -> نتيجة التحليل
+
+        self._pending_results = []
+        self._last_save = time.monotonic()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # اتصال واحد مشترك بين الخيوط (الزاحف غير المتزامن يحفظ من خيط حلقة الأحداث)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.setup_database()
+        self.prune()
+
+        if resume:
+            self._load()
+
+    @classmethod
+    def from_config(cls, config, crawl_id=None):
+        """
+        إنشاء نقطة حفظ من إعدادات التطبيق (القسم crawling.checkpoint)
+
+        Args:
+            config (dict): إعدادات التطبيق
+            crawl_id (str, optional): معرف عملية محفوظة لاستئنافها
+
+        Returns:
+            CrawlCheckpoint or None: نقطة الحفظ، أو None إذا كانت معطلة ولم يُطلب استئناف
+
+        Raises:
+            CheckpointNotFound: عند الاستئناف بمعرف غير موجود
+        """
+        checkpoint_config = (config or {}).get('crawling', {}).get('checkpoint', {})
+        if not crawl_id and not checkpoint_config.get('enabled', False):
+            return None
+        return cls(
+            crawl_id=crawl_id,
+            db_path=checkpoint_config.get('path', 'data/checkpoints.db'),
+            interval=checkpoint_config.get('interval_seconds', 30),
+            resume=bool(crawl_id),
+            max_age_days=checkpoint_config.get('max_age_days', 7)
+        )
+
+    def setup_database(self):
+        """إنشاء الجداول إذا لم تكن موجودة"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawls (
+                crawl_id TEXT PRIMARY KEY,
+                start_url TEXT,
+                options TEXT,
+                status TEXT,
+                created_at REAL,
+                updated_at REAL
+            )
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                crawl_id TEXT,
+                url TEXT,
+                depth INTEGER
+            )
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS visited (
+                crawl_id TEXT,
+                url TEXT,
+                depth INTEGER,
+                PRIMARY KEY (crawl_id, url)
+            )
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                crawl_id TEXT,
+                url TEXT,
+                result TEXT,
+                PRIMARY KEY (crawl_id, url)
+            )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_frontier_crawl ON frontier (crawl_id)')
+            self._conn.commit()
+
+    @staticmethod
+    def _delete_rows(cursor, tables, crawl_ids):
+        """حذف صفوف عمليات الزحف المحددة من الجداول"""
+        for table in tables:
+            cursor.executemany(f'DELETE FROM {table} WHERE crawl_id = ?', ((crawl_id,) for crawl_id in crawl_ids))
+
+    def prune(self):
+        """حذف عمليات الزحف (المكتملة والمتوقفة) التي لم تُحدث منذ أكثر من max_age_days"""
+        if not self.max_age_days:
+            return
+        with self._lock:
+            cursor = self._conn.cursor()
+            expired = [row[0] for row in cursor.execute(
+                'SELECT crawl_id FROM crawls WHERE updated_at < ? AND crawl_id != ?',
+                (time.time() - self.max_age_days * 86400, self.crawl_id))]
+            self._delete_rows(cursor, ('frontier', 'visited', 'results', 'crawls'), expired)
+            self._conn.commit()
+        if expired:
+            logger.info(f"تم حذف {len(expired)} عملية زحف قديمة من نقاط الحفظ")
+
+    def _load(self):
+        """تحميل حالة عملية زحف محفوظة"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            row = cursor.execute('SELECT start_url, options FROM crawls WHERE crawl_id = ?',
+                                 (self.crawl_id,)).fetchone()
+            if row is None:
+                raise CheckpointNotFound(f"لا توجد نقطة حفظ للزحف {self.crawl_id}")
+
+            self.start_url = row[0]
+            self.options = json.loads(row[1] or '{}')
+            self.frontier = cursor.execute('SELECT url, depth FROM frontier WHERE crawl_id = ?',
+                                           (self.crawl_id,)).fetchall()
+            self.visited = dict(cursor.execute('SELECT url, depth FROM visited WHERE crawl_id = ?',
+                                               (self.crawl_id,)).fetchall())
+            self.results = {url: json.loads(result) for url, result in cursor.execute(
+                'SELECT url, result FROM results WHERE crawl_id = ?', (self.crawl_id,))}
+
+        logger.info(f"استئناف الزحف {self.crawl_id}: {len(self.results)} صفحة مكتملة، "
+                    f"{len(self.frontier)} رابط في قائمة الانتظار")
+
+    def start(self, start_url, options=None):
+        """
+        تسجيل عملية زحف جديدة (لا يغير شيئًا عند الاستئناف)
+
+        Args:
+            start_url (str): عنوان البداية
+            options (dict, optional): خيارات الزحف المحفوظة مع العملية
+        """
+        if self.resumed:
+            return
+
+        self.start_url = start_url
+        self.options = dict(options or {})
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO crawls (crawl_id, start_url, options, status, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (self.crawl_id, start_url, json.dumps(self.options), STATUS_RUNNING, now, now)
+            )
+            self._conn.commit()
+
+    def resume_state(self):
+        """
+        حالة الزاحف عند الاستئناف
+
+        الصفحات التي تمت زيارتها دون نتيجة محفوظة (كانت قيد التحليل عند الانقطاع)
+        تعاد إلى قائمة الانتظار.
+
+        Returns:
+            tuple: (الروابط المكتملة {الرابط: العمق}, قائمة الانتظار [(الرابط, العمق)])
+        """
+        done = {url: depth for url, depth in self.visited.items() if url in self.results}
+        queued = {url for url, _ in self.frontier}
+        retry = [(url, depth) for url, depth in self.visited.items()
+                 if url not in self.results and url not in queued]
+        return done, retry + list(self.frontier)
+
+    def due(self):
+        """هل حان وقت الحفظ الدوري؟"""
+        return time.monotonic() - self._last_save >= self.interval
+
+    def add_result(self, url, result):
+        """
+        تسجيل نتيجة تحليل صفحة (تُكتب مع الحفظ التالي)
+
+        Args:
+            url (str): عنوان الصفحة
+            result (dict): نتيجة التحليل
+        """
+        with self._lock:
+            self._pending_results.append((self.crawl_id, url, json.dumps(result, ensure_ascii=False, default=str)))
+
+    def save(self, frontier=None, new_visits=()):
+        """
+        حفظ حالة الزحف والنتائج المعلقة
+
+        Args:
+            frontier (iterable, optional): قائمة الانتظار الحالية [(الرابط, العمق)] (تحل محل المحفوظة)
+            new_visits (iterable): الروابط التي تمت زيارتها منذ الحفظ السابق [(الرابط, العمق)]
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            if frontier is not None:
+                cursor.execute('DELETE FROM frontier WHERE crawl_id = ?', (self.crawl_id,))
+                cursor.executemany('INSERT INTO frontier (crawl_id, url, depth) VALUES (?, ?, ?)',
+                                   ((self.crawl_id, url, depth) for url, depth in frontier))
+            cursor.executemany('INSERT OR REPLACE INTO visited (crawl_id, url, depth) VALUES (?, ?, ?)',
+                               ((self.crawl_id, url, depth) for url, depth in new_visits))
+            cursor.executemany('INSERT OR REPLACE INTO results (crawl_id, url, result) VALUES (?, ?, ?)',
+                               self._pending_results)
+            cursor.execute('UPDATE crawls SET updated_at = ? WHERE crawl_id = ?', (time.time(), self.crawl_id))
+            self._conn.commit()
+            self._pending_results = []
+            self._last_save = time.monotonic()
+
+    def flush(self):
+        """كتابة النتائج المعلقة فقط (دون حالة الزاحف)"""
+        self.save()
+
+    def complete(self):
+        """
+        تعليم عملية الزحف كمكتملة بعد حفظ آخر النتائج
+
+        لا تُستأنف العملية المكتملة، فتُحذف قائمة انتظارها وروابطها المزارة مباشرة،
+        وتبقى نتائجها حتى يحذفها prune.
+        """
+        self.save()
+        with self._lock:
+            cursor = self._conn.cursor()
+            self._delete_rows(cursor, ('frontier', 'visited'), (self.crawl_id,))
+            cursor.execute('UPDATE crawls SET status = ?, updated_at = ? WHERE crawl_id = ?',
+                           (STATUS_COMPLETED, time.time(), self.crawl_id))
+            self._conn.commit()
+
+    def close(self):
+        """إغلاق الاتصال بقاعدة البيانات"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,460 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة جدولة الزحف - تطبيق قواعد التهذيب لكل مضيف (المعدل والاتصالات المتزامنة)
+
+يحتفظ المجدول لكل مضيف بدلو رموز (token bucket) يحدد معدل بدء الطلبات
+(طلب واحد كل delay ثانية مع دفعة أولية اختيارية) وبحد أقصى للاتصالات
+المتزامنة. يحترم المجدول قيمة Crawl-delay في robots.txt، ويمكن استخدامه من
+الزاحف المتزامن (acquire) ومن الزاحف غير المتزامن (acquire_async)، ومشاركة
+نسخة واحدة بين عدة عمليات زحف في العملية نفسها.
+
+في الوضع التكيفي يعدل المجدول عدد الاتصالات لكل مضيف بأسلوب AIMD: يزيده
+اتصالًا واحدًا بعد كل جولة طلبات بزمن استجابة (TTFB) مستقر، ويقسمه على اثنين
+عند الرمزين 429/503 أو ارتفاع زمن الاستجابة، ويوقف طلبات المضيف حتى انتهاء
+مهلة Retry-After.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger('rseo.crawl_scheduler')
+
+# رموز الحالة التي تعني أن الخادم يطلب تخفيف الضغط
+THROTTLE_STATUSES = (429, 503)
+
+# أقل فاصل بين الطلبات بعد التراجع، وأقصى فاصل يصل إليه التراجع (بالثواني)
+BACKOFF_MIN_DELAY = 0.5
+MAX_BACKOFF_DELAY = 60.0
+
+
+def parse_retry_after(value, now=None):
+    """
+    تحويل قيمة ترويسة Retry-After (ثوانٍ أو تاريخ HTTP) إلى عدد ثوانٍ
+
+    Args:
+        value (str): قيمة الترويسة
+        now (float, optional): الوقت الحالي (time.time) لحساب المدة حتى التاريخ
+
+    Returns:
+        float or None: مدة الانتظار بالثواني، أو None إذا كانت القيمة غير صالحة
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - (time.time() if now is None else now))
+
+
+class _Waiter:
+    """طلب ينتظر تحرير اتصال للمضيف (من خيط عادي أو من حلقة أحداث)"""
+
+    __slots__ = ('event', 'loop', 'future', 'woken')
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.woken = False
+
+    def wake(self):
+        self.woken = True
+        if self.loop is None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._set_result)
+
+    def _set_result(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class HostState:
+    """
+    حالة التهذيب لمضيف واحد: دلو الرموز وعدد الاتصالات النشطة
+    """
+
+    def __init__(self, host, delay=1.0, max_connections=2, burst=1, adaptive=False,
+                 max_connections_ceiling=None, now=None):
+        """
+        تهيئة حالة المضيف
+
+        Args:
+            host (str): اسم المضيف
+            delay (float): أقل فاصل زمني بين بدء طلبين (بالثواني)
+            max_connections (int): أقصى عدد للطلبات المتزامنة (القيمة الأولية في الوضع التكيفي)
+            burst (int): عدد الطلبات المسموح بها دفعة واحدة قبل تطبيق الفاصل
+            adaptive (bool): تعديل عدد الاتصالات والفاصل حسب استجابات الخادم
+            max_connections_ceiling (int, optional): الحد الأعلى لعدد الاتصالات في الوضع التكيفي
+            now (float, optional): وقت الإنشاء (time.monotonic) الذي يبدأ منه ملء الدلو
+        """
+        self.host = host
+        self.delay = max(0.0, delay)
+        self.min_delay = self.delay  # حد التهذيب الأدنى: لا ينزل الفاصل تحته أبدًا
+        self.max_connections = max(1, max_connections)
+        self.max_connections_ceiling = max(self.max_connections, max_connections_ceiling or 0)
+        self.burst = max(1, burst)
+        self.adaptive = adaptive
+
+        # حالة التحكم التكيفي
+        self.ttfb_avg = None  # متوسط متحرك لزمن الاستجابة
+        self.ttfb_base = None  # زمن الاستجابة المرجعي للخادم دون ضغط
+        self.successes = 0
+        self.last_decrease = 0.0
+        self.blocked_until = 0.0  # وقت انتهاء مهلة Retry-After
+
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic() if now is None else now
+        self.active = 0
+        self.waiters = deque()
+
+    def _refill(self, now):
+        """إضافة الرموز المستحقة منذ آخر تحديث"""
+        if self.delay <= 0:
+            self.tokens = float(self.burst)
+        else:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) / self.delay)
+        self.updated = now
+
+    def try_acquire(self, now):
+        """
+        محاولة حجز اتصال للمضيف
+
+        Returns:
+            tuple: (تم الحجز, مدة الانتظار بالثواني أو None إذا كانت كل الاتصالات مشغولة)
+        """
+        if now < self.blocked_until:
+            return False, self.blocked_until - now
+        if self.active >= self.max_connections:
+            return False, None
+
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.active += 1
+            return True, 0.0
+        return False, (1 - self.tokens) * self.delay
+
+    def on_response(self, now, status_code, ttfb=None, retry_after=None, latency_factor=2.0,
+                    max_retry_after=300):
+        """
+        تحديث حالة المضيف حسب استجابة الخادم
+
+        Args:
+            now (float): الوقت الحالي (time.monotonic)
+            status_code (int): رمز حالة الاستجابة
+            ttfb (float, optional): زمن وصول ترويسات الاستجابة (بالثواني)
+            retry_after (float, optional): مهلة Retry-After بالثواني
+            latency_factor (float): نسبة ارتفاع زمن الاستجابة عن المرجع التي تعتبر ضغطًا على الخادم
+            max_retry_after (float): الحد الأعلى المقبول لمهلة Retry-After
+        """
+        if retry_after is not None and status_code in THROTTLE_STATUSES:
+            self.blocked_until = max(self.blocked_until, now + min(retry_after, max_retry_after))
+
+        if not self.adaptive:
+            return
+
+        if status_code in THROTTLE_STATUSES:
+            self._decrease(now, throttled=True)
+            return
+
+        if ttfb is None:
+            return
+
+        # متوسط متحرك سريع، ومرجع يتبع أقل قيمة فورًا ويرتفع ببطء مع تغير الخادم
+        self.ttfb_avg = ttfb if self.ttfb_avg is None else 0.7 * self.ttfb_avg + 0.3 * ttfb
+        if self.ttfb_base is None or self.ttfb_avg < self.ttfb_base:
+            self.ttfb_base = self.ttfb_avg
+        else:
+            self.ttfb_base += (self.ttfb_avg - self.ttfb_base) * 0.01
+
+        # تجاهل الفروق الصغيرة جدًا في الخوادم السريعة
+        if self.ttfb_avg > max(self.ttfb_base * latency_factor, self.ttfb_base + 0.05):
+            self._decrease(now)
+            return
+
+        # زيادة جمعية بعد جولة كاملة من الطلبات الناجحة بالعدد الحالي
+        self.successes += 1
+        if self.successes >= self.max_connections:
+            self.successes = 0
+            if self.delay > self.min_delay:
+                # استعادة الفاصل الأصلي أولًا بعد التراجع
+                half = self.delay / 2
+                self.delay = half if half > max(self.min_delay, BACKOFF_MIN_DELAY) else self.min_delay
+            elif self.max_connections < self.max_connections_ceiling:
+                self.max_connections += 1
+
+    def _decrease(self, now, throttled=False):
+        """تخفيض ضربي لعدد الاتصالات (ولفاصل الطلبات عند الرفض أو عند الوصول لاتصال واحد)"""
+        # الاستجابات التي كانت قيد التنفيذ وقت التخفيض لا تسبب تخفيضًا ثانيًا
+        if now - self.last_decrease < max(self.ttfb_avg or 0.0, 1.0):
+            return
+        self.last_decrease = now
+        self.successes = 0
+
+        if throttled or self.max_connections == 1:
+            self.delay = min(MAX_BACKOFF_DELAY, max(self.delay * 2, self.min_delay, BACKOFF_MIN_DELAY))
+        self.max_connections = max(1, self.max_connections // 2)
+        logger.info(f"تخفيف الضغط على {self.host}: {self.max_connections} اتصال، "
+                    f"فاصل {self.delay:.2f} ثانية")
+
+
+class CrawlScheduler:
+    """
+    مجدول التهذيب المشترك بين الزواحف: معدل طلبات وعدد اتصالات لكل مضيف
+    """
+
+    def __init__(self, delay=1.0, max_per_host=2, burst=1, respect_crawl_delay=True,
+                 max_crawl_delay=30, hosts=None, adaptive=False, max_connections_ceiling=16,
+                 latency_factor=2.0, max_retry_after=300, clock=time.monotonic):
+        """
+        تهيئة المجدول
+
+        Args:
+            delay (float): الفاصل الافتراضي بين الطلبات للمضيف الواحد (بالثواني)
+            max_per_host (int): العدد الافتراضي للاتصالات المتزامنة للمضيف الواحد
+            burst (int): عدد الطلبات المسموح بها دفعة واحدة
+            respect_crawl_delay (bool): تطبيق قيمة Crawl-delay من robots.txt
+            max_crawl_delay (float): الحد الأعلى المقبول لقيمة Crawl-delay (بالثواني)
+            hosts (dict, optional): إعدادات خاصة لكل مضيف {المضيف: {'delay': ..., 'max_connections': ...}}
+            adaptive (bool): تعديل عدد الاتصالات لكل مضيف حسب استجابات الخادم (AIMD)
+            max_connections_ceiling (int): الحد الأعلى لعدد الاتصالات لكل مضيف في الوضع التكيفي
+            latency_factor (float): نسبة ارتفاع زمن الاستجابة عن المرجع التي تؤدي إلى التراجع
+            max_retry_after (float): الحد الأعلى المقبول لمهلة Retry-After (بالثواني)
+            clock (callable): مصدر الوقت المتزايد (time.monotonic، ويُستبدل في الاختبارات)
+        """
+        self.delay = max(0.0, delay or 0)
+        self.max_per_host = max(1, max_per_host)
+        self.burst = max(1, burst)
+        self.respect_crawl_delay = respect_crawl_delay
+        self.max_crawl_delay = max_crawl_delay
+        self.host_overrides = dict(hosts or {})
+        self.adaptive = adaptive
+        self.max_connections_ceiling = max_connections_ceiling
+        self.latency_factor = latency_factor
+        self.max_retry_after = max_retry_after
+        self.clock = clock
+
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, **overrides):
+        """
+        إنشاء المجدول من إعدادات التطبيق (القسم crawling.politeness)
+
+        Args:
+            config (dict): إعدادات التطبيق
+            **overrides: قيم تتقدم على الإعدادات (مثل delay أو max_per_host من خيارات المهمة)
+
+        Returns:
+            CrawlScheduler: المجدول
+        """
+        crawling_config = (config or {}).get('crawling', {})
+        politeness = crawling_config.get('politeness', {})
+        settings = {
+            'delay': crawling_config.get('delay_seconds', 1.0),
+            'max_per_host': politeness.get('max_per_host', 2),
+            'burst': politeness.get('burst', 1),
+            'respect_crawl_delay': politeness.get('respect_crawl_delay', True),
+            'max_crawl_delay': politeness.get('max_crawl_delay', 30),
+            'hosts': politeness.get('hosts', {}),
+            'adaptive': politeness.get('adaptive', False),
+            'max_connections_ceiling': politeness.get('max_connections_ceiling', 16),
+            'latency_factor': politeness.get('latency_factor', 2.0),
+            'max_retry_after': politeness.get('max_retry_after', 300),
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**settings)
+
+    @staticmethod
+    def host_key(url):
+        """اسم المضيف لعنوان URL (يقبل المضيف نفسه أيضًا)"""
+        return urlparse(url).netloc or url
+
+    def _state(self, host):
+        """الحصول على حالة المضيف وإنشاؤها عند أول استخدام (تحت القفل)"""
+        state = self._hosts.get(host)
+        if state is None:
+            override = self.host_overrides.get(host, {})
+            state = HostState(
+                host,
+                delay=override.get('delay', self.delay),
+                max_connections=override.get('max_connections', self.max_per_host),
+                burst=override.get('burst', self.burst),
+                adaptive=override.get('adaptive', self.adaptive),
+                max_connections_ceiling=override.get('max_connections_ceiling', self.max_connections_ceiling),
+                now=self.clock()
+            )
+            self._hosts[host] = state
+        return state
+
+    def host_state(self, url):
+        """
+        الحصول على حالة التهذيب لمضيف
+
+        Args:
+            url (str): عنوان URL أو اسم المضيف
+
+        Returns:
+            HostState: حالة المضيف
+        """
+        with self._lock:
+            return self._state(self.host_key(url))
+
+    def set_host_limits(self, url, delay=None, max_connections=None):
+        """
+        تعديل سرعة الزحف لمضيف محدد
+
+        Args:
+            url (str): عنوان URL أو اسم المضيف
+            delay (float, optional): الفاصل الجديد بين الطلبات
+            max_connections (int, optional): العدد الجديد للاتصالات المتزامنة
+        """
+        with self._lock:
+            state = self._state(self.host_key(url))
+            if delay is not None:
+                state.delay = state.min_delay = max(0.0, delay)
+            if max_connections is not None:
+                state.max_connections = max(1, max_connections)
+                state.max_connections_ceiling = max(state.max_connections_ceiling, state.max_connections)
+                self._wake(state, state.max_connections - state.active)
+
+    def set_crawl_delay(self, url, crawl_delay):
+        """
+        تطبيق قيمة Crawl-delay من robots.txt على مضيف
+
+        لا تقلل القيمة الفاصل المضبوط مسبقًا، ويُحد طولها بـ max_crawl_delay
+        حتى لا يتوقف الزحف بسبب قيمة مبالغ فيها.
+
+        Args:
+            url (str): عنوان URL أو اسم المضيف
+            crawl_delay (float or None): قيمة Crawl-delay بالثواني
+        """
+        if not self.respect_crawl_delay or not crawl_delay:
+            return
+
+        crawl_delay = min(float(crawl_delay), self.max_crawl_delay)
+        with self._lock:
+            state = self._state(self.host_key(url))
+            if crawl_delay > state.min_delay:
+                state.min_delay = crawl_delay
+                state.delay = max(state.delay, crawl_delay)
+                # لا يُسمح بدفعة أولية عند وجود Crawl-delay
+                state.burst = 1
+                state.tokens = min(state.tokens, 1.0)
+                logger.info(f"تطبيق Crawl-delay ({crawl_delay} ثانية) على {state.host}")
+
+    def _wake(self, state, count=1):
+        """إيقاظ طلبات تنتظر اتصالًا للمضيف (تحت القفل)"""
+        while count > 0 and state.waiters:
+            state.waiters.popleft().wake()
+            count -= 1
+
+    def acquire(self, url):
+        """
+        انتظار دور الطلب (للزاحف المتزامن) وحجز اتصال للمضيف
+
+        Args:
+            url (str): عنوان URL المراد طلبه
+        """
+        host = self.host_key(url)
+        while True:
+            waiter = None
+            with self._lock:
+                state = self._state(host)
+                acquired, wait = state.try_acquire(self.clock())
+                if acquired:
+                    return
+                if wait is None:
+                    waiter = _Waiter()
+                    state.waiters.append(waiter)
+
+            if waiter is not None:
+                waiter.event.wait()
+            else:
+                time.sleep(wait)
+
+    async def acquire_async(self, url):
+        """
+        انتظار دور الطلب (للزاحف غير المتزامن) وحجز اتصال للمضيف
+
+        Args:
+            url (str): عنوان URL المراد طلبه
+        """
+        host = self.host_key(url)
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = None
+            with self._lock:
+                state = self._state(host)
+                acquired, wait = state.try_acquire(self.clock())
+                if acquired:
+                    return
+                if wait is None:
+                    waiter = _Waiter(loop)
+                    state.waiters.append(waiter)
+
+            if waiter is None:
+                await asyncio.sleep(wait)
+                continue
+
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter.woken:
+                        # تمرير الإيقاظ لطلب آخر حتى لا يضيع الاتصال المحرر
+                        self._wake(state)
+                    else:
+                        state.waiters.remove(waiter)
+                raise
+
+    def record_response(self, url, status_code, ttfb=None, retry_after=None):
+        """
+        تسجيل استجابة الخادم لتعديل سرعة الزحف (يُستدعى فور وصول الترويسات)
+
+        Args:
+            url (str): عنوان URL الذي تم طلبه
+            status_code (int): رمز حالة الاستجابة
+            ttfb (float, optional): زمن وصول ترويسات الاستجابة (بالثواني)
+            retry_after (str or float, optional): قيمة ترويسة Retry-After
+        """
+        if isinstance(retry_after, str):
+            retry_after = parse_retry_after(retry_after)
+
+        with self._lock:
+            state = self._state(self.host_key(url))
+            previous = state.max_connections
+            state.on_response(self.clock(), status_code, ttfb, retry_after,
+                              self.latency_factor, self.max_retry_after)
+            if state.max_connections > previous:
+                self._wake(state, state.max_connections - previous)
+
+    def release(self, url):
+        """
+        تحرير اتصال المضيف بعد انتهاء الطلب
+
+        Args:
+            url (str): عنوان URL الذي تم طلبه
+        """
+        with self._lock:
+            state = self._state(self.host_key(url))
+            state.active = max(0, state.active - 1)
+            self._wake(state)
@@ -12,10 +12,19 @@ import time
 import logging
 import requests
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
 from tqdm import tqdm
 from fake_useragent import UserAgent
 import validators
+from modules.parsed_page import PageScan
+from modules.site_info import site_info_cache
+from modules.frontier import CrawlFrontier
+from modules.url_registry import URLRegistry
+from modules.html_charset import is_html, decode_html
+from modules.crawl_scheduler import CrawlScheduler, THROTTLE_STATUSES
+from modules.sitemap import SitemapReader, sitemaps_from_robots
+
+# حجم الدفعة المقروءة من الاستجابة (بايت)
+BODY_CHUNK_SIZE = 64 * 1024
 
 class WebCrawler:
     """
@@ -23,7 +32,9 @@ class WebCrawler:
     """
     
     def __init__(self, start_url, max_pages=100, max_depth=3, delay=1, 
-                 respect_robots_txt=True, user_agent=None, verbose=False):
+                 respect_robots_txt=True, user_agent=None, verbose=False, frontier_priority=None,
+                 http_cache=None, scheduler=None, max_retries=2, seed_from_sitemaps=False, checkpoint=None,
+                 page_store=None, url_registry=None, max_body_bytes=10 * 1024 * 1024, link_graph=None):
         """
         تهيئة الزاحف
         
@@ -31,10 +42,20 @@ class WebCrawler:
             start_url (str): نقطة البداية للزحف
             max_pages (int): العدد الأقصى للصفحات المراد زحفها
             max_depth (int): عمق الزحف الأقصى
-            delay (float): التأخير بين الطلبات (ثوانٍ)
+            delay (float): الفاصل بين بدء الطلبات (ثوانٍ)
             respect_robots_txt (bool): احترام توجيهات ملف robots.txt
             user_agent (str): نص User-Agent المخصص
             verbose (bool): طباعة معلومات مفصلة أثناء الزحف
+            frontier_priority (str, optional): ترتيب زيارة الروابط: None (بترتيب الاكتشاف)، 'depth' أو 'inlinks'
+            http_cache (HTTPCache, optional): ذاكرة HTTP على القرص للطلبات الشرطية عند إعادة الزحف
+            scheduler (CrawlScheduler, optional): مجدول التهذيب المشترك (يُنشأ من delay إذا لم يُمرر)
+            max_retries (int): عدد مرات إعادة طلب الصفحة بعد الرمز 429/503
+            seed_from_sitemaps (bool): إضافة روابط خرائط الموقع (robots.txt و/sitemap.xml) إلى قائمة الانتظار
+            checkpoint (CrawlCheckpoint, optional): نقطة حفظ دورية لحالة الزحف (أو عملية محفوظة لاستئنافها)
+            page_store (PageStore, optional): مخزن على القرص لصفحات crawl() (تبقى في الذاكرة إذا لم يُمرر)
+            url_registry (URLRegistry, optional): سجل الروابط ونمط مجموعات الروابط المرئية والمزارة
+            max_body_bytes (int): الحد الأقصى لحجم الصفحة (تُتجاهل الصفحات الأكبر دون إكمال تنزيلها)
+            link_graph (LinkGraph, optional): رسم الروابط الداخلية الذي تُسجل فيه روابط كل صفحة وروابط خرائط الموقع
         """
         self.start_url = start_url
         self.max_pages = max_pages
@@ -42,6 +63,17 @@ class WebCrawler:
         self.delay = delay
         self.respect_robots_txt = respect_robots_txt
         self.verbose = verbose
+        self.http_cache = http_cache
+        # معدل الطلبات للمضيف (يطبق Crawl-delay من robots.txt)
+        self.scheduler = scheduler or CrawlScheduler(delay=delay, max_per_host=1)
+        self.max_retries = max_retries
+        self.retries = {}  # عدد مرات إعادة طلب كل رابط بعد رفض الخادم المؤقت
+        self.throttled_urls = set()  # الروابط التي رفضها الخادم مؤقتًا في آخر طلب
+        self.seed_from_sitemaps = seed_from_sitemaps
+        self.unchanged_urls = set()  # الصفحات التي أجاب الخادم عنها بالرمز 304
+        self.page_store = page_store
+        self.max_body_bytes = max_body_bytes
+        self.link_graph = link_graph
         
         # التحقق من صحة الرابط
         if not validators.url(start_url):
@@ -71,59 +103,48 @@ class WebCrawler:
         self.logger = logging.getLogger('rseo.crawler')
         
         # تهيئة متغيرات التتبع
-        self.visited_urls = set()
-        self.urls_to_visit = [(start_url, 0)]  # (url, depth)
-        self.disallowed_paths = []
+        # مجموعات الروابط مضغوطة (بصمات أو مرشح Bloom) بدل نصوص الروابط
+        self.url_registry = url_registry or URLRegistry()
+        self.visited_urls = self.url_registry.new_set()
+        self.frontier = CrawlFrontier(priority=frontier_priority, seen=self.url_registry.new_set())
+        self.robots_matcher = None
+        
+        # نقطة الحفظ: الروابط التي تمت زيارتها منذ آخر حفظ، وعدد الصفحات المكتملة قبل الاستئناف
+        self.checkpoint = checkpoint
+        self._unsaved_visits = []
+        self.resumed_pages = 0
+        if checkpoint is not None and checkpoint.resumed:
+            self._restore_checkpoint()
+        else:
+            self.frontier.add(start_url, 0)
+            if checkpoint is not None:
+                checkpoint.start(start_url, {'max_pages': max_pages, 'max_depth': max_depth})
         
         # قراءة ملف robots.txt إذا كان مطلوبًا
         if self.respect_robots_txt:
             self._parse_robots_txt()
     
     def _parse_robots_txt(self):
-        """قراءة وتحليل ملف robots.txt للحصول على القواعد"""
-        robots_url = f"{self.base_url}/robots.txt"
+        """قراءة ملف robots.txt والحصول على مطابق قواعده المترجم"""
         try:
-            response = self.session.get(robots_url, timeout=10)
-            if response.status_code == 200:
-                lines = response.text.split('\n')
-                user_agent_match = False
-                
-                for line in lines:
-                    line = line.strip().lower()
-                    
-                    # البحث عن القواعد المطبقة على الروبوت الحالي أو جميع الروبوتات
-                    if line.startswith('user-agent:'):
-                        ua = line.split(':', 1)[1].strip()
-                        user_agent_match = (ua == '*' or 'bot' in ua.lower())
-                    
-                    # إذا كانت القاعدة تنطبق، قم بحفظ المسارات المحظورة
-                    if user_agent_match and line.startswith('disallow:') and len(line) > 10:
-                        path = line.split(':', 1)[1].strip()
-                        if path:
-                            self.disallowed_paths.append(path)
+            # جلب الملف عبر ذاكرة الموقع حتى تعيد المحللات والزواحف الأخرى استخدامه
+            site_info = site_info_cache.robots(self.base_url, session=self.session)
+            if site_info.robots_exists:
+                self.robots_matcher = site_info.robots_matcher()
+                self.scheduler.set_crawl_delay(self.base_url, self.robots_matcher.crawl_delay)
                 
                 if self.verbose:
-                    self.logger.info(f"تم تحليل ملف robots.txt: تم العثور على {len(self.disallowed_paths)} مسار محظور")
+                    self.logger.info(f"تم تحليل ملف robots.txt: تم العثور على {len(self.robots_matcher.rules)} قاعدة")
         except Exception as e:
             self.logger.warning(f"فشل قراءة ملف robots.txt: {str(e)}")
     
     def _is_allowed(self, url):
         """التحقق مما إذا كان URL مسموحًا به"""
-        if not self.respect_robots_txt or not self.disallowed_paths:
+        if not self.respect_robots_txt or self.robots_matcher is None:
             return True
-        
-        parsed_url = urlparse(url)
-        path = parsed_url.path
-        
-        for disallowed in self.disallowed_paths:
-            if disallowed == '/' and path == '/':
-                return False
-            if path.startswith(disallowed):
-                return False
-        
-        return True
+        return self.robots_matcher.is_allowed(url)
     
-    def _is_valid_url(self, url):
+    def _is_valid_url(self, url, check_robots=True):
         """التحقق من صلاحية الرابط للزحف"""
         # تجاهل الروابط الخارجية
         if not url.startswith(self.base_url):
@@ -139,7 +160,7 @@ class WebCrawler:
             return False
         
         # التحقق من مسارات robots.txt
-        if not self._is_allowed(url):
+        if check_robots and not self._is_allowed(url):
             return False
         
         # التحقق من الهاش (تجاهل الأجزاء داخل الصفحة)
@@ -168,119 +189,284 @@ class WebCrawler:
         
         return url
     
-    def _extract_links(self, soup, page_url):
-        """استخراج الروابط من صفحة HTML"""
+    def extract_links(self, hrefs):
+        """
+        استخراج روابط الموقع الصالحة للزحف من روابط الصفحة المطلقة
+        
+        Args:
+            hrefs (iterable): روابط الصفحة المطلقة (page_data['hrefs'] من fetch_page)
+        
+        Returns:
+            set: الروابط بعد توحيدها وتطبيق robots.txt عليها
+        """
         links = set()
         
-        # البحث عن جميع الروابط في الصفحة
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag.get('href', '').strip()
-            
-            # تجاهل الروابط الفارغة والبريد الإلكتروني وروابط JavaScript
-            if not href or href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
-                continue
-            
-            # تحويل الروابط النسبية إلى مطلقة
-            if not href.startswith(('http://', 'https://')):
-                href = urljoin(page_url, href)
-            
+        # الروابط المطلقة في الصفحة (بدون الفارغة والبريد الإلكتروني وروابط JavaScript)
+        for href in hrefs:
             # تنظيف الرابط
             href = self._normalize_url(href)
             
             # إضافة الرابط إذا كان صالحًا
-            if self._is_valid_url(href):
+            if self._is_valid_url(href, check_robots=False):
                 links.add(href)
         
+        # تطبيق robots.txt على روابط الصفحة دفعة واحدة
+        if self.respect_robots_txt and self.robots_matcher is not None:
+            links = set(self.robots_matcher.filter(links))
+        
         return links
     
     def _get_page(self, url):
         """الحصول على محتوى صفحة ويب"""
+        response = None
         try:
-            response = self.session.get(url, timeout=30)
+            # طلب شرطي إذا كانت الصفحة مخزنة من زحف سابق
+            # (stream: تُقرأ الترويسات أولًا ولا يُنزل المحتوى إلا عند الحاجة)
+            headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+            response = self.session.get(url, timeout=30, headers=headers, stream=True)
+            # تعديل سرعة الزحف حسب زمن الاستجابة ورموز الرفض
+            self.scheduler.record_response(url, response.status_code, response.elapsed.total_seconds(),
+                                           response.headers.get('Retry-After'))
+            if response.status_code in THROTTLE_STATUSES:
+                self.throttled_urls.add(url)
             response.raise_for_status()
             
-            # التأكد من أن المحتوى هو HTML
-            content_type = response.headers.get('Content-Type', '').lower()
-            if 'text/html' not in content_type:
+            # الصفحة لم تتغير منذ الزحف السابق: قراءتها من القرص
+            if response.status_code == 304 and self.http_cache:
+                cached = self.http_cache.revalidated(url)
+                if cached is not None:
+                    self.unchanged_urls.add(url)
+                    return cached['html']
+                # الصفحة غير موجودة في الذاكرة: إعادة الطلب بدون ترويسات شرطية
+                response.close()
+                response = self.session.get(url, timeout=30, stream=True)
+                response.raise_for_status()
+            
+            # التأكد من أن المحتوى هو HTML قبل تنزيله
+            content_type = response.headers.get('Content-Type', '')
+            if not is_html(content_type):
                 self.logger.warning(f"تم تجاهل {url}: ليس HTML ({content_type})")
                 return None
             
-            # محاولة تحديد ترميز الصفحة
-            if response.encoding == 'ISO-8859-1':
-                # محاولة اكتشاف الترميز من المحتوى
-                if 'charset=utf-8' in response.text.lower():
-                    response.encoding = 'utf-8'
-                elif 'charset=windows-1256' in response.text.lower():
-                    response.encoding = 'windows-1256'
-                elif any(arabic_char in response.text for arabic_char in 'ةكمنتالبيسش'):
-                    response.encoding = 'utf-8'
+            body = self._read_body(url, response)
+            if body is None:
+                return None
+            
+            # تحديد الترميز من الترويسة وأول البايتات ثم فك الترميز مرة واحدة
+            html_content = decode_html(body, content_type)
+            
+            if self.http_cache:
+                self.http_cache.store(url, response.headers, html_content, content_type.lower())
             
-            return response.text
+            return html_content
         except requests.exceptions.RequestException as e:
             self.logger.error(f"خطأ في الحصول على {url}: {str(e)}")
             return None
+        finally:
+            if response is not None:
+                response.close()
     
-    def crawl(self):
+    def _read_body(self, url, response):
         """
-        بدء عملية زحف الموقع
+        تنزيل محتوى الاستجابة على دفعات مع تطبيق الحد الأقصى للحجم
         
         Returns:
-            dict: البيانات المجمعة للصفحات المزحوفة
+            bytearray or None: المحتوى، أو None إذا تجاوز الحد الأقصى
         """
-        pages_data = {}
+        content_length = response.headers.get('Content-Length', '')
+        if content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            self.logger.warning(f"تم تجاهل {url}: حجم الصفحة {content_length} بايت يتجاوز الحد الأقصى")
+            return None
+        
+        body = bytearray()
+        for chunk in response.iter_content(BODY_CHUNK_SIZE):
+            body += chunk
+            if len(body) > self.max_body_bytes:
+                self.logger.warning(f"تم إيقاف تنزيل {url}: حجم الصفحة يتجاوز {self.max_body_bytes} بايت")
+                return None
+        return body
+    
+    def _restore_checkpoint(self):
+        """استعادة الروابط المكتملة وقائمة الانتظار من نقطة الحفظ"""
+        done, queued = self.checkpoint.resume_state()
+        self.visited_urls.update(done)
+        for url in done:
+            self.frontier.mark_seen(url)
+        for url, depth in queued:
+            self.frontier.add(url, depth)
+        self.resumed_pages = len(done)
+        
+        # انقطاع قبل أول حفظ: البدء من جديد
+        if not done and not queued:
+            self.frontier.add(self.start_url, 0)
+    
+    def save_checkpoint(self):
+        """حفظ قائمة الانتظار والروابط التي تمت زيارتها والنتائج المعلقة"""
+        if self.checkpoint is None:
+            return
+        self.checkpoint.save(self.frontier.pending(), self._unsaved_visits)
+        self._unsaved_visits = []
+    
+    def _seed_from_sitemaps(self):
+        """
+        إضافة روابط الصفحات من خرائط الموقع إلى قائمة الانتظار (حتى max_pages رابط)
+        
+        مع رسم الروابط تُقرأ الخرائط كاملة وتُسجل جميع روابطها لكشف الصفحات اليتيمة،
+        ولا تُضاف إلى قائمة الانتظار إلا إذا كان seed_from_sitemaps مفعلًا.
+        """
+        site_info = site_info_cache.robots(self.base_url, session=self.session)
+        reader = SitemapReader(session=self.session, scheduler=self.scheduler)
+        sitemaps = sitemaps_from_robots(site_info.robots_txt if site_info.robots_exists else '', self.base_url)
+        
+        # صفحات الخريطة تعامل كروابط من الصفحة الرئيسية، فتصل الصفحات العميقة دون تتبع الروابط
+        seeded = 0
+        for url in reader.iter_urls(sitemaps):
+            seeding = self.seed_from_sitemaps and len(self.frontier) < self.max_pages
+            if not seeding and self.link_graph is None:
+                break
+            url = self._normalize_url(url)
+            if not self._is_valid_url(url):
+                continue
+            if self.link_graph is not None:
+                self.link_graph.add_sitemap_url(url)
+            if seeding and self.frontier.add(url, min(1, self.max_depth)):
+                seeded += 1
+        
+        self.logger.info(f"تمت إضافة {seeded} رابط من {reader.sitemaps_read} خريطة موقع")
+    
+    def _retry_later(self, url, depth):
+        """إعادة رابط رفضه الخادم مؤقتًا إلى قائمة الانتظار (ينتظر المجدول مهلة Retry-After)"""
+        self.throttled_urls.discard(url)
+        attempts = self.retries.get(url, 0)
+        if attempts >= self.max_retries:
+            self.logger.warning(f"تخطي {url} بعد {attempts} محاولات رفضها الخادم")
+            return
+        
+        self.retries[url] = attempts + 1
+        self.visited_urls.discard(url)
+        self.frontier.requeue(url, depth)
+    
+    def fetch_page(self, url, depth):
+        """
+        جلب صفحة واحدة ومسح عنوانها وروابطها بعد انتظار دورها وفق معدل المضيف
+        
+        Args:
+            url (str): عنوان الصفحة
+            depth (int): عمق الصفحة
+        
+        Returns:
+            dict or None: بيانات الصفحة مع روابطها المطلقة (hrefs)، أو None إذا فشل الجلب
+                (الرابط في throttled_urls إذا رفضه الخادم مؤقتًا)
+        """
+        self.scheduler.acquire(url)
+        try:
+            html_content = self._get_page(url)
+        finally:
+            self.scheduler.release(url)
+        if not html_content:
+            return None
+        
+        # مسح سريع للعنوان والروابط فقط، ويبقى تحليل الصفحة الكامل لمرحلة التحليل
+        page_data = {
+            'url': url,
+            'html': html_content,
+            'depth': depth,
+            'unchanged': url in self.unchanged_urls,
+            'timestamp': time.time()
+        }
+        scan = PageScan(url, html_content)
+        page_data['title'] = scan.title
+        page_data['hrefs'] = scan.links
+        return page_data
+    
+    def iter_pages(self):
+        """
+        زحف الموقع مع إعادة كل صفحة فور جلبها (وضع التدفق)
+        
+        لا يحتفظ الزاحف بمحتوى الصفحات، لذلك يبقى استهلاك الذاكرة ثابتًا مهما كان
+        حجم الموقع، ويمكن تحليل الصفحات أثناء استمرار الزحف.
+        
+        Yields:
+            tuple: (URL, بيانات الصفحة)
+        """
+        # الصفحات المكتملة قبل الاستئناف تحتسب ضمن max_pages
+        pages_count = self.resumed_pages
         
         # عرض شريط التقدم إذا كان الوضع المفصل مفعلًا
-        progress_bar = tqdm(total=self.max_pages, desc="زحف الصفحات", disable=not self.verbose)
+        progress_bar = tqdm(total=self.max_pages, initial=pages_count, desc="زحف الصفحات", disable=not self.verbose)
+        
+        if (self.seed_from_sitemaps or self.link_graph is not None) and not self.resumed_pages:
+            self._seed_from_sitemaps()
         
-        while self.urls_to_visit and len(self.visited_urls) < self.max_pages:
-            # استخراج الرابط التالي وعمقه
-            url, depth = self.urls_to_visit.pop(0)
+        try:
+            yield from self._crawl_loop(progress_bar, pages_count)
+        finally:
+            # حفظ الحالة عند انتهاء الزحف أو توقفه (مثل Ctrl+C أو توقف المستهلك)
+            self.save_checkpoint()
+            progress_bar.close()
+    
+    def _crawl_loop(self, progress_bar, pages_count):
+        """حلقة الزحف الرئيسية لـ iter_pages"""
+        unfollowed = False  # روابط في صفحات أقصى عمق لم تُضف لقائمة الانتظار
+        while self.frontier and len(self.visited_urls) < self.max_pages:
+            # استخراج الرابط التالي وعمقه (كل رابط يدخل قائمة الانتظار مرة واحدة فقط)
+            url, depth = self.frontier.pop()
             
-            # تجاهل الرابط إذا تمت زيارته بالفعل أو تجاوز العمق المسموح
-            if url in self.visited_urls or depth > self.max_depth:
+            # تجاهل الرابط إذا تجاوز العمق المسموح
+            if depth > self.max_depth:
                 continue
             
             # تعيين الرابط كتمت زيارته
             self.visited_urls.add(url)
+            if self.checkpoint is not None:
+                self._unsaved_visits.append((url, depth))
             
-            # الحصول على محتوى الصفحة
-            html_content = self._get_page(url)
-            if not html_content:
+            page_data = self.fetch_page(url, depth)
+            if page_data is None:
+                if url in self.throttled_urls:
+                    self._retry_later(url, depth)
                 continue
-            
-            # تحليل HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # تخزين بيانات الصفحة
-            pages_data[url] = {
-                'url': url,
-                'html': html_content,
-                'title': soup.title.text.strip() if soup.title else '',
-                'depth': depth,
-                'timestamp': time.time()
-            }
+            pages_count += 1
             
             # تحديث شريط التقدم
             progress_bar.update(1)
             
-            # إيقاف الزحف إذا وصلنا للحد الأقصى من الصفحات
-            if len(pages_data) >= self.max_pages:
-                break
+            # استخراج روابط الصفحة وإضافتها للزيارة (وتسجيلها في رسم الروابط لجميع الصفحات)
+            links = None
+            if self.link_graph is not None:
+                links = self.extract_links(page_data['hrefs'])
+                self.link_graph.add_page(url, links)
+                if depth >= self.max_depth and not unfollowed:
+                    unfollowed = any(link not in self.frontier for link in links)
+            if depth < self.max_depth and pages_count < self.max_pages:
+                self.frontier.add_many(links if links is not None else self.extract_links(page_data['hrefs']),
+                                       depth + 1)
             
-            # استخراج روابط الصفحة وإضافتها للزيارة
-            if depth < self.max_depth:
-                links = self._extract_links(soup, url)
-                for link in links:
-                    if link not in self.visited_urls:
-                        self.urls_to_visit.append((link, depth + 1))
+            # تسليم الصفحة للمستهلك دون الاحتفاظ بها
+            yield url, page_data
+            del page_data
             
-            # إضافة تأخير بين الطلبات
-            if self.delay > 0:
-                time.sleep(self.delay)
+            if self.checkpoint is not None and self.checkpoint.due():
+                self.save_checkpoint()
+            
+            # إيقاف الزحف إذا وصلنا للحد الأقصى من الصفحات
+            if pages_count >= self.max_pages:
+                break
         
-        # إغلاق شريط التقدم
-        progress_bar.close()
+        self.logger.info(f"اكتمل الزحف: تمت زيارة {len(self.visited_urls)} صفحة، تم تحليل {pages_count} صفحة "
+                         f"({len(self.unchanged_urls)} صفحة لم تتغير)")
         
-        self.logger.info(f"اكتمل الزحف: تمت زيارة {len(self.visited_urls)} صفحة، تم تحليل {len(pages_data)} صفحة")
+        # الزحف شمل جميع الصفحات التي يصل إليها رابط (لكشف الصفحات اليتيمة من خرائط الموقع)
+        if self.link_graph is not None:
+            self.link_graph.complete = not self.frontier and not unfollowed and len(self.visited_urls) < self.max_pages
+    
+    def crawl(self):
+        """
+        بدء عملية زحف الموقع
         
-        return pages_data
+        Returns:
+            dict: البيانات المجمعة للصفحات المزحوفة (مقابض StoredPage عند استخدام مخزن الصفحات)
+        """
+        if self.page_store is None:
+            return dict(self.iter_pages())
+        return {url: self.page_store.put(url, page_data) for url, page_data in self.iter_pages()}
@@ -0,0 +1,740 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة الزحف الموزع - زحف المواقع الكبيرة بعدة عمليات عاملة على قائمة انتظار مشتركة
+
+تُحفظ قائمة الانتظار في قاعدة بيانات SQLite بوضع WAL يشترك فيها جميع العاملين
+على الجهاز نفسه. الزحف بعدة أجهزة غير مدعوم: وضع WAL لا يعمل على أنظمة الملفات
+الشبكية (NFS وSMB)، لذلك يجب أن تكون القاعدة على قرص محلي. يُقسم كل رابط إلى جزء
+(shard) حسب بصمته، ويطلب كل عامل دفعات من روابط جزئه فقط. جدول الروابط نفسه
+هو مجموعة إزالة التكرار العامة (مفتاح أساسي لكل رابط)، وجدول المضيفين يحفظ
+موعد الطلب التالي لكل مضيف حتى يبقى التهذيب صحيحًا مهما كان عدد العاملين.
+
+يكتب العاملون الصفحات المكتملة مضغوطة في جدول الصفحات، ويقرؤها المنسق
+(DistributedCrawler.iter_pages) بالترتيب ويحذفها بعد تسليمها، فيحل محل
+WebCrawler في خط التحليل دون تغيير.
+
+العاملون الخارجيون (عمليات أو حاويات مستقلة على الجهاز نفسه تشترك في مجلد
+القاعدة المحلي) ينضمون بالأمر:
+    rseo crawl-worker --db <مسار القاعدة> --crawl-id <المعرف> --shard <رقم الجزء>
+"""
+
+import os
+import json
+import time
+import uuid
+import zlib
+import sqlite3
+import logging
+import multiprocessing
+from contextlib import contextmanager
+import validators
+from modules.url_registry import url_fingerprint
+from modules.crawl_scheduler import (CrawlScheduler, parse_retry_after, THROTTLE_STATUSES,
+                                     BACKOFF_MIN_DELAY, MAX_BACKOFF_DELAY)
+
+logger = logging.getLogger('rseo.distributed_crawl')
+
+# حالات عملية الزحف
+STATUS_RUNNING = 'running'
+STATUS_STOPPED = 'stopped'
+STATUS_COMPLETED = 'completed'
+
+# حالات الروابط في قائمة الانتظار
+URL_QUEUED = 0
+URL_CLAIMED = 1
+URL_DONE = 2
+URL_FAILED = 3
+
+
+def _connect(db_path):
+    """
+    اتصال بقاعدة البيانات المشتركة (وضع WAL: القراءة لا تنتظر الكتابة)
+
+    المعاملات تبدأ صراحة بـ BEGIN IMMEDIATE حتى لا يطلب عاملان الرابط نفسه.
+    """
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    return conn
+
+
+@contextmanager
+def _transaction(conn):
+    """معاملة كتابة (تحجز قفل الكتابة من بدايتها)"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+class SharedFrontier:
+    """
+    قائمة انتظار مشتركة لعملية زحف موزعة واحدة
+    """
+
+    def __init__(self, db_path, crawl_id):
+        """
+        Args:
+            db_path (str): مسار قاعدة البيانات المشتركة
+            crawl_id (str): معرف عملية الزحف
+        """
+        self.db_path = db_path
+        self.crawl_id = crawl_id
+        self._conn = _connect(db_path)
+        self.setup_database()
+
+        # إعدادات العملية (تُقرأ من القاعدة في load)
+        self.start_url = None
+        self.shards = 1
+        self.max_pages = 0
+        self.max_depth = 0
+        self.options = {}
+
+    def setup_database(self):
+        """إنشاء الجداول إذا لم تكن موجودة"""
+        with _transaction(self._conn) as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS crawls (
+                crawl_id TEXT PRIMARY KEY,
+                start_url TEXT,
+                shards INTEGER,
+                max_pages INTEGER,
+                max_depth INTEGER,
+                options TEXT,
+                status TEXT,
+                claimed_total INTEGER DEFAULT 0,
+                created_at REAL
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                crawl_id TEXT,
+                url TEXT,
+                shard INTEGER,
+                depth INTEGER,
+                state INTEGER DEFAULT 0,
+                attempts INTEGER DEFAULT 0,
+                claimed_at REAL,
+                PRIMARY KEY (crawl_id, url)
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS hosts (
+                crawl_id TEXT,
+                host TEXT,
+                next_allowed REAL,
+                delay REAL,
+                min_delay REAL,
+                PRIMARY KEY (crawl_id, host)
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                crawl_id TEXT,
+                url TEXT,
+                data BLOB
+            )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_urls_claim ON urls (crawl_id, shard, state, depth)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_crawl ON pages (crawl_id, id)')
+
+    def exists(self):
+        """هل العملية مسجلة في القاعدة؟"""
+        return self._conn.execute('SELECT 1 FROM crawls WHERE crawl_id = ?',
+                                  (self.crawl_id,)).fetchone() is not None
+
+    def start(self, start_url, shards, max_pages, max_depth, options=None):
+        """
+        تسجيل عملية زحف جديدة وإضافة رابط البداية
+
+        Args:
+            start_url (str): عنوان البداية
+            shards (int): عدد أجزاء قائمة الانتظار
+            max_pages (int): العدد الأقصى للصفحات
+            max_depth (int): عمق الزحف الأقصى
+            options (dict, optional): إعدادات الزاحف التي يقرؤها العاملون
+        """
+        with _transaction(self._conn) as conn:
+            conn.execute(
+                'INSERT INTO crawls (crawl_id, start_url, shards, max_pages, max_depth, options, status, '
+                'claimed_total, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)',
+                (self.crawl_id, start_url, shards, max_pages, max_depth, json.dumps(options or {}),
+                 STATUS_RUNNING, time.time())
+            )
+        self.load()
+        self.add_links([start_url], 0)
+
+    def load(self):
+        """
+        قراءة إعدادات العملية
+
+        Raises:
+            LookupError: إذا لم تكن العملية مسجلة
+        """
+        row = self._conn.execute(
+            'SELECT start_url, shards, max_pages, max_depth, options FROM crawls WHERE crawl_id = ?',
+            (self.crawl_id,)
+        ).fetchone()
+        if row is None:
+            raise LookupError(f"لا توجد عملية زحف موزعة بالمعرف {self.crawl_id}")
+        self.start_url, self.shards, self.max_pages, self.max_depth = row[:4]
+        self.options = json.loads(row[4] or '{}')
+
+    def shard_of(self, url):
+        """رقم الجزء المسؤول عن الرابط"""
+        return url_fingerprint(url) % self.shards
+
+    @property
+    def status(self):
+        """حالة العملية (running أو stopped أو completed)"""
+        row = self._conn.execute('SELECT status FROM crawls WHERE crawl_id = ?', (self.crawl_id,)).fetchone()
+        return row[0] if row else None
+
+    def set_status(self, status):
+        """تغيير حالة العملية (stopped يوقف جميع العاملين)"""
+        with _transaction(self._conn) as conn:
+            conn.execute('UPDATE crawls SET status = ? WHERE crawl_id = ?', (status, self.crawl_id))
+
+    def add_links(self, urls, depth):
+        """
+        إضافة روابط إلى قائمة الانتظار (الروابط المعروفة لأي عامل تُتجاهل)
+
+        Args:
+            urls (iterable): الروابط
+            depth (int): عمق الروابط
+        """
+        with _transaction(self._conn) as conn:
+            self._insert_links(conn, urls, depth)
+
+    def _insert_links(self, conn, urls, depth):
+        conn.executemany(
+            'INSERT OR IGNORE INTO urls (crawl_id, url, shard, depth) VALUES (?, ?, ?, ?)',
+            ((self.crawl_id, url, self.shard_of(url), depth) for url in urls)
+        )
+
+    def claim(self, shard, limit, claim_timeout=300):
+        """
+        حجز دفعة من روابط الجزء (الأقل عمقًا أولًا) ضمن حد max_pages
+
+        الروابط المحجوزة منذ أكثر من claim_timeout ثانية (عامل توقف) تعاد إلى الانتظار أولًا.
+
+        Args:
+            shard (int): رقم الجزء
+            limit (int): أقصى عدد للروابط
+            claim_timeout (float): مهلة الحجز بالثواني
+
+        Returns:
+            list: [(الرابط, العمق)]
+        """
+        now = time.time()
+        with _transaction(self._conn) as conn:
+            expired = conn.execute(
+                'UPDATE urls SET state = ?, attempts = attempts + 1 '
+                'WHERE crawl_id = ? AND shard = ? AND state = ? AND claimed_at < ?',
+                (URL_QUEUED, self.crawl_id, shard, URL_CLAIMED, now - claim_timeout)
+            ).rowcount
+            if expired:
+                logger.warning(f"إعادة {expired} رابط محجوز منذ أكثر من {claim_timeout} ثانية في الجزء {shard}")
+
+            claimed_total = conn.execute('SELECT claimed_total FROM crawls WHERE crawl_id = ?',
+                                         (self.crawl_id,)).fetchone()[0] - expired
+            limit = min(limit, self.max_pages - claimed_total)
+            rows = []
+            if limit > 0:
+                rows = conn.execute(
+                    'SELECT url, depth FROM urls WHERE crawl_id = ? AND shard = ? AND state = ? '
+                    'ORDER BY depth LIMIT ?',
+                    (self.crawl_id, shard, URL_QUEUED, limit)
+                ).fetchall()
+                conn.executemany(
+                    'UPDATE urls SET state = ?, claimed_at = ? WHERE crawl_id = ? AND url = ?',
+                    ((URL_CLAIMED, now, self.crawl_id, url) for url, _ in rows)
+                )
+            conn.execute('UPDATE crawls SET claimed_total = ? WHERE crawl_id = ?',
+                         (claimed_total + len(rows), self.crawl_id))
+        return rows
+
+    def complete(self, url, page_data, links=(), depth=0):
+        """
+        تسجيل صفحة مكتملة وروابطها الجديدة في معاملة واحدة
+
+        Args:
+            url (str): عنوان الصفحة
+            page_data (dict): بيانات الصفحة (الشجرة المحللة parsed لا تُحفظ)
+            links (iterable): روابط الصفحة المراد زحفها
+            depth (int): عمق الصفحة
+        """
+        # JSON وليس pickle: قراءة بيانات من قاعدة مشتركة بـ pickle تسمح لمن يكتب فيها بتنفيذ شفرة في المنسق
+        data = zlib.compress(json.dumps({key: value for key, value in page_data.items() if key != 'parsed'},
+                                        ensure_ascii=False).encode('utf-8'))
+        with _transaction(self._conn) as conn:
+            conn.execute('UPDATE urls SET state = ? WHERE crawl_id = ? AND url = ?',
+                         (URL_DONE, self.crawl_id, url))
+            conn.execute('INSERT INTO pages (crawl_id, url, data) VALUES (?, ?, ?)', (self.crawl_id, url, data))
+            self._insert_links(conn, links, depth + 1)
+
+    def fail(self, url):
+        """تسجيل رابط فشل جلبه (يبقى محتسبًا ضمن max_pages كما في WebCrawler)"""
+        with _transaction(self._conn) as conn:
+            conn.execute('UPDATE urls SET state = ? WHERE crawl_id = ? AND url = ?',
+                         (URL_FAILED, self.crawl_id, url))
+
+    def retry(self, url, max_retries):
+        """
+        إعادة رابط رفضه الخادم مؤقتًا (429/503) إلى قائمة الانتظار
+
+        Args:
+            url (str): عنوان الصفحة
+            max_retries (int): أقصى عدد لمرات الإعادة
+
+        Returns:
+            bool: False إذا استُنفدت المحاولات (يُسجل الرابط كفاشل)
+        """
+        with _transaction(self._conn) as conn:
+            attempts = conn.execute('SELECT attempts FROM urls WHERE crawl_id = ? AND url = ?',
+                                    (self.crawl_id, url)).fetchone()[0]
+            if attempts >= max_retries:
+                conn.execute('UPDATE urls SET state = ? WHERE crawl_id = ? AND url = ?',
+                             (URL_FAILED, self.crawl_id, url))
+                return False
+            conn.execute('UPDATE urls SET state = ?, attempts = attempts + 1 WHERE crawl_id = ? AND url = ?',
+                         (URL_QUEUED, self.crawl_id, url))
+            conn.execute('UPDATE crawls SET claimed_total = claimed_total - 1 WHERE crawl_id = ?',
+                         (self.crawl_id,))
+        return True
+
+    def reset_claims(self):
+        """إعادة جميع الروابط المحجوزة إلى الانتظار (عند استئناف عملية توقف عاملوها)"""
+        with _transaction(self._conn) as conn:
+            reset = conn.execute('UPDATE urls SET state = ? WHERE crawl_id = ? AND state = ?',
+                                 (URL_QUEUED, self.crawl_id, URL_CLAIMED)).rowcount
+            conn.execute('UPDATE crawls SET claimed_total = claimed_total - ?, status = ? WHERE crawl_id = ?',
+                         (reset, STATUS_RUNNING, self.crawl_id))
+
+    def finished(self):
+        """
+        هل انتهى الزحف؟ (لا روابط محجوزة، ولا روابط في الانتظار أو بلغ الحد الأقصى)
+        """
+        counts = dict(self._conn.execute(
+            'SELECT state, COUNT(*) FROM urls WHERE crawl_id = ? AND state IN (?, ?) GROUP BY state',
+            (self.crawl_id, URL_QUEUED, URL_CLAIMED)
+        ).fetchall())
+        if counts.get(URL_CLAIMED):
+            return False
+        if not counts.get(URL_QUEUED):
+            return True
+        claimed_total = self._conn.execute('SELECT claimed_total FROM crawls WHERE crawl_id = ?',
+                                           (self.crawl_id,)).fetchone()[0]
+        return claimed_total >= self.max_pages
+
+    def pending_pages(self, limit=50):
+        """
+        الصفحات المكتملة التي لم يُؤكد تسليمها بترتيب اكتمالها
+
+        Args:
+            limit (int): أقصى عدد للصفحات (-1 بلا حد)
+
+        Returns:
+            list: [(رقم الصفحة, الرابط, بيانات الصفحة)]
+        """
+        rows = self._conn.execute('SELECT id, url, data FROM pages WHERE crawl_id = ? ORDER BY id LIMIT ?',
+                                  (self.crawl_id, limit)).fetchall()
+        return [(page_id, url, json.loads(zlib.decompress(data).decode('utf-8'))) for page_id, url, data in rows]
+
+    def ack_pages(self, last_id):
+        """
+        حذف الصفحات المسلمة (حتى الرقم last_id)، فلا تُسلم مجددًا عند الاستئناف
+
+        Args:
+            last_id (int): رقم آخر صفحة مسلمة
+        """
+        with _transaction(self._conn) as conn:
+            conn.execute('DELETE FROM pages WHERE crawl_id = ? AND id <= ?', (self.crawl_id, last_id))
+
+    def stats(self):
+        """
+        عدد الروابط في كل حالة
+
+        Returns:
+            dict: {الحالة: العدد}
+        """
+        return dict(self._conn.execute('SELECT state, COUNT(*) FROM urls WHERE crawl_id = ? GROUP BY state',
+                                       (self.crawl_id,)).fetchall())
+
+    def close(self):
+        """إغلاق الاتصال بقاعدة البيانات"""
+        self._conn.close()
+
+
+class SharedHostScheduler:
+    """
+    مجدول تهذيب مشترك بين العمليات (نفس واجهة CrawlScheduler)
+
+    يحجز كل طلب موعدًا في جدول المضيفين: الموعد التالي للمضيف يتقدم بمقدار
+    الفاصل مع كل طلب، فلا يتجاوز معدل الطلبات للمضيف طلبًا كل delay ثانية
+    مهما كان عدد العاملين. يعتمد على ساعة النظام (time.time) لأنها مشتركة بين
+    العمليات بخلاف time.monotonic.
+    """
+
+    host_key = staticmethod(CrawlScheduler.host_key)
+
+    def __init__(self, db_path, crawl_id, delay=1.0, respect_crawl_delay=True, max_crawl_delay=30,
+                 max_retry_after=300):
+        """
+        Args:
+            db_path (str): مسار قاعدة البيانات المشتركة
+            crawl_id (str): معرف عملية الزحف
+            delay (float): الفاصل بين بدء الطلبات لكل مضيف (ثوانٍ)
+            respect_crawl_delay (bool): تطبيق قيمة Crawl-delay من robots.txt
+            max_crawl_delay (float): الحد الأعلى المقبول لقيمة Crawl-delay (بالثواني)
+            max_retry_after (float): الحد الأعلى المقبول لمهلة Retry-After (بالثواني)
+        """
+        self.crawl_id = crawl_id
+        self.delay = max(0.0, delay or 0)
+        self.respect_crawl_delay = respect_crawl_delay
+        self.max_crawl_delay = max_crawl_delay
+        self.max_retry_after = max_retry_after
+        self._conn = _connect(db_path)
+
+    def _state(self, conn, host):
+        """(الموعد التالي، الفاصل، أقل فاصل) للمضيف مع إنشائه عند أول استخدام (داخل معاملة)"""
+        row = conn.execute('SELECT next_allowed, delay, min_delay FROM hosts WHERE crawl_id = ? AND host = ?',
+                           (self.crawl_id, host)).fetchone()
+        if row is None:
+            row = (0.0, self.delay, self.delay)
+            conn.execute('INSERT INTO hosts (crawl_id, host, next_allowed, delay, min_delay) VALUES (?, ?, ?, ?, ?)',
+                         (self.crawl_id, host) + row)
+        return row
+
+    def acquire(self, url):
+        """
+        حجز موعد الطلب التالي للمضيف وانتظاره
+
+        Args:
+            url (str): عنوان URL المراد طلبه
+        """
+        host = self.host_key(url)
+        with _transaction(self._conn) as conn:
+            next_allowed, delay, _ = self._state(conn, host)
+            now = time.time()
+            slot = max(now, next_allowed)
+            conn.execute('UPDATE hosts SET next_allowed = ? WHERE crawl_id = ? AND host = ?',
+                         (slot + delay, self.crawl_id, host))
+        if slot > now:
+            time.sleep(slot - now)
+
+    def release(self, url):
+        """لا شيء: كل عامل يرسل طلبًا واحدًا في كل مرة"""
+
+    def record_response(self, url, status_code, ttfb=None, retry_after=None):
+        """
+        تسجيل استجابة الخادم: مضاعفة الفاصل وتأجيل المضيف عند 429/503، وتقليله تدريجيًا بعد النجاح
+
+        Args:
+            url (str): عنوان URL الذي تم طلبه
+            status_code (int): رمز حالة الاستجابة
+            ttfb (float, optional): زمن وصول ترويسات الاستجابة (غير مستخدم)
+            retry_after (str or float, optional): قيمة ترويسة Retry-After
+        """
+        if isinstance(retry_after, str):
+            retry_after = parse_retry_after(retry_after)
+
+        host = self.host_key(url)
+        with _transaction(self._conn) as conn:
+            next_allowed, delay, min_delay = self._state(conn, host)
+            if status_code in THROTTLE_STATUSES:
+                delay = min(max(delay * 2, BACKOFF_MIN_DELAY), MAX_BACKOFF_DELAY)
+                pause = max(delay, min(retry_after or 0, self.max_retry_after))
+                next_allowed = max(next_allowed, time.time() + pause)
+                logger.warning(f"الخادم {host} يطلب تخفيف الضغط ({status_code}): الفاصل الآن {delay:.1f} ثانية")
+            elif delay > min_delay:
+                delay = max(min_delay, delay * 0.9)
+            else:
+                return
+            conn.execute('UPDATE hosts SET next_allowed = ?, delay = ? WHERE crawl_id = ? AND host = ?',
+                         (next_allowed, delay, self.crawl_id, host))
+
+    def set_crawl_delay(self, url, crawl_delay):
+        """
+        تطبيق قيمة Crawl-delay من robots.txt على مضيف (لجميع العاملين)
+
+        Args:
+            url (str): عنوان URL أو اسم المضيف
+            crawl_delay (float or None): قيمة Crawl-delay بالثواني
+        """
+        if not self.respect_crawl_delay or not crawl_delay:
+            return
+
+        crawl_delay = min(float(crawl_delay), self.max_crawl_delay)
+        host = self.host_key(url)
+        with _transaction(self._conn) as conn:
+            self._state(conn, host)
+            conn.execute('UPDATE hosts SET min_delay = MAX(min_delay, ?), delay = MAX(delay, ?) '
+                         'WHERE crawl_id = ? AND host = ?', (crawl_delay, crawl_delay, self.crawl_id, host))
+
+    def close(self):
+        """إغلاق الاتصال بقاعدة البيانات"""
+        self._conn.close()
+
+
+def run_worker(db_path, crawl_id, shard, poll_interval=0.5):
+    """
+    تشغيل عامل زحف لجزء واحد حتى انتهاء الزحف أو إيقافه
+
+    Args:
+        db_path (str): مسار قاعدة البيانات المشتركة
+        crawl_id (str): معرف عملية الزحف
+        shard (int): رقم الجزء
+        poll_interval (float): مدة الانتظار عندما يكون الجزء فارغًا (بالثواني)
+
+    Returns:
+        int: عدد الصفحات التي جلبها العامل
+    """
+    # استيراد متأخر: الزاحف يستورد وحدات ثقيلة لا يحتاجها المنسق
+    from modules.crawler import WebCrawler
+    from modules.parsed_page import set_parser_backend
+
+    frontier = SharedFrontier(db_path, crawl_id)
+    frontier.load()
+    options = frontier.options
+    if not 0 <= shard < frontier.shards:
+        raise ValueError(f"رقم الجزء {shard} خارج النطاق (عدد الأجزاء {frontier.shards})")
+
+    set_parser_backend(options.get('parser_backend', 'lxml'))
+    scheduler = SharedHostScheduler(
+        db_path, crawl_id,
+        delay=options.get('delay', 1.0),
+        respect_crawl_delay=options.get('respect_crawl_delay', True),
+        max_crawl_delay=options.get('max_crawl_delay', 30),
+        max_retry_after=options.get('max_retry_after', 300)
+    )
+    crawler = WebCrawler(
+        start_url=frontier.start_url,
+        max_pages=frontier.max_pages,
+        max_depth=frontier.max_depth,
+        delay=options.get('delay', 1.0),
+        respect_robots_txt=options.get('respect_robots_txt', True),
+        user_agent=options.get('user_agent'),
+        scheduler=scheduler,
+        max_body_bytes=options.get('max_body_bytes', 10 * 1024 * 1024)
+    )
+    batch_size = options.get('batch_size', 5)
+    claim_timeout = options.get('claim_timeout', 300)
+    max_retries = options.get('max_retries', 2)
+
+    fetched = 0
+    try:
+        while frontier.status == STATUS_RUNNING:
+            batch = frontier.claim(shard, batch_size, claim_timeout)
+            if not batch:
+                if frontier.finished():
+                    break
+                # قد تضيف أجزاء أخرى روابط لهذا الجزء
+                time.sleep(poll_interval)
+                continue
+
+            for url, depth in batch:
+                page_data = crawler.fetch_page(url, depth)
+                if page_data is None:
+                    if url in crawler.throttled_urls:
+                        crawler.throttled_urls.discard(url)
+                        frontier.retry(url, max_retries)
+                    else:
+                        frontier.fail(url)
+                    continue
+
+                links = crawler.extract_links(page_data['hrefs']) if depth < frontier.max_depth else ()
+                frontier.complete(url, page_data, links, depth)
+                fetched += 1
+    finally:
+        scheduler.close()
+        frontier.close()
+
+    logger.info(f"انتهى العامل {shard} من الزحف {crawl_id}: {fetched} صفحة")
+    return fetched
+
+
+class DistributedCrawler:
+    """
+    منسق زحف موزع بنفس واجهة WebCrawler (iter_pages وcrawl)
+    """
+
+    def __init__(self, start_url, max_pages=100, max_depth=3, delay=1, respect_robots_txt=True, user_agent=None,
+                 workers=4, shards=None, db_path="data/distributed_crawl.db", crawl_id=None, batch_size=5,
+                 claim_timeout=300, poll_interval=0.5, max_retries=2, max_body_bytes=10 * 1024 * 1024,
+                 worker_options=None):
+        """
+        تهيئة المنسق وتسجيل عملية الزحف (أو استئناف عملية مسجلة بمعرفها)
+
+        Args:
+            start_url (str): نقطة البداية للزحف
+            max_pages (int): العدد الأقصى للصفحات المراد زحفها
+            max_depth (int): عمق الزحف الأقصى
+            delay (float): الفاصل بين بدء الطلبات لكل مضيف (لجميع العاملين معًا)
+            respect_robots_txt (bool): احترام توجيهات ملف robots.txt
+            user_agent (str): نص User-Agent المخصص
+            workers (int): عدد العمليات العاملة المحلية (0: العاملون الخارجيون فقط)
+            shards (int, optional): عدد أجزاء قائمة الانتظار (عدد العاملين افتراضيًا)
+            db_path (str): مسار قاعدة البيانات المشتركة
+            crawl_id (str, optional): معرف عملية الزحف (تُستأنف العملية إذا كانت مسجلة)
+            batch_size (int): عدد الروابط التي يحجزها العامل في كل مرة
+            claim_timeout (float): مهلة إعادة روابط عامل توقف إلى الانتظار (بالثواني)
+            poll_interval (float): فاصل فحص الصفحات المكتملة (بالثواني)
+            max_retries (int): عدد مرات إعادة طلب الصفحة بعد الرمز 429/503
+            max_body_bytes (int): الحد الأقصى لحجم الصفحة
+            worker_options (dict, optional): إعدادات إضافية للعاملين (مثل parser_backend وmax_crawl_delay)
+        """
+        if not validators.url(start_url):
+            raise ValueError(f"الرابط غير صالح: {start_url}")
+
+        self.start_url = start_url
+        self.workers = max(0, workers)
+        self.db_path = db_path
+        self.crawl_id = crawl_id or uuid.uuid4().hex[:12]
+        self.poll_interval = poll_interval
+        self._processes = {}
+
+        self.frontier = SharedFrontier(db_path, self.crawl_id)
+        if self.frontier.exists():
+            self.frontier.load()
+            if self.frontier.start_url != start_url:
+                raise ValueError(f"عملية الزحف {self.crawl_id} خاصة بالموقع {self.frontier.start_url}")
+            self.frontier.reset_claims()
+            logger.info(f"استئناف الزحف الموزع {self.crawl_id}")
+        else:
+            options = {
+                'delay': delay,
+                'respect_robots_txt': respect_robots_txt,
+                'user_agent': user_agent,
+                'batch_size': batch_size,
+                'claim_timeout': claim_timeout,
+                'max_retries': max_retries,
+                'max_body_bytes': max_body_bytes,
+            }
+            options.update(worker_options or {})
+            self.frontier.start(start_url, shards or max(1, self.workers), max_pages, max_depth, options)
+
+    @classmethod
+    def from_config(cls, config, start_url, **overrides):
+        """
+        إنشاء المنسق من إعدادات التطبيق (القسم crawling.distributed)
+
+        Args:
+            config (dict): إعدادات التطبيق
+            start_url (str): نقطة البداية للزحف
+            **overrides: قيم تتقدم على الإعدادات (مثل max_pages أو workers من خيارات المهمة)
+
+        Returns:
+            DistributedCrawler: المنسق
+        """
+        crawling_config = (config or {}).get('crawling', {})
+        distributed = crawling_config.get('distributed', {})
+        politeness = crawling_config.get('politeness', {})
+        settings = {
+            'max_pages': crawling_config.get('max_pages', 100),
+            'delay': crawling_config.get('delay_seconds', 1.0),
+            'respect_robots_txt': crawling_config.get('respect_robots_txt', True),
+            'max_body_bytes': crawling_config.get('max_body_bytes', 10 * 1024 * 1024),
+            'workers': distributed.get('workers', 4),
+            'shards': distributed.get('shards'),
+            'db_path': distributed.get('db_path', 'data/distributed_crawl.db'),
+            'batch_size': distributed.get('batch_size', 5),
+            'claim_timeout': distributed.get('claim_timeout_seconds', 300),
+            'worker_options': {
+                'parser_backend': (config or {}).get('parsing', {}).get('backend', 'lxml'),
+                'respect_crawl_delay': politeness.get('respect_crawl_delay', True),
+                'max_crawl_delay': politeness.get('max_crawl_delay', 30),
+                'max_retry_after': politeness.get('max_retry_after', 300),
+            },
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(start_url, **settings)
+
+    def _start_worker(self, shard):
+        """تشغيل عملية عاملة محلية لجزء (بطريقة spawn حتى لا تُنسخ حالة العملية الرئيسية)"""
+        context = multiprocessing.get_context('spawn')
+        process = context.Process(target=run_worker, args=(self.db_path, self.crawl_id, shard),
+                                  name=f"rseo-crawl-{shard}", daemon=True)
+        process.start()
+        self._processes[shard] = process
+
+    def _check_workers(self):
+        """إعادة تشغيل العاملين المحليين الذين توقفوا بخطأ قبل انتهاء الزحف"""
+        for shard, process in list(self._processes.items()):
+            if not process.is_alive() and process.exitcode not in (0, None):
+                logger.warning(f"توقف العامل {shard} بالرمز {process.exitcode}، إعادة تشغيله")
+                self._start_worker(shard)
+
+    def _stop_workers(self):
+        """انتظار العاملين المحليين ثم إيقاف من لم ينتهِ منهم"""
+        for process in self._processes.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes = {}
+
+    def iter_pages(self):
+        """
+        زحف الموقع بالعاملين مع إعادة كل صفحة فور اكتمالها (وضع التدفق)
+
+        Yields:
+            tuple: (URL, بيانات الصفحة) (بدون الشجرة المحللة parsed)
+        """
+        # كل عامل محلي يتولى جزءًا، والأجزاء الباقية للعاملين الخارجيين
+        for shard in range(min(self.workers, self.frontier.shards)):
+            self._start_worker(shard)
+
+        completed = False
+        delivered = None  # رقم آخر صفحة سُلمت للمستهلك
+        try:
+            while True:
+                pages = self.frontier.pending_pages(limit=-1 if completed else 50)
+                for page_id, url, page_data in pages:
+                    # الصفحة تعتبر مسلمة بمجرد إعادتها (حتى إذا أوقف المستهلك المولد بعدها)
+                    delivered = page_id
+                    yield url, page_data
+                if pages:
+                    self.frontier.ack_pages(delivered)
+                    continue
+                if completed:
+                    break
+
+                # الصفحات تُكتب مع تحديث حالة روابطها في المعاملة نفسها، فتبقى بعد الانتهاء دفعة أخيرة فقط
+                if self.frontier.finished():
+                    completed = True
+                    continue
+
+                self._check_workers()
+                time.sleep(self.poll_interval)
+        finally:
+            # الصفحات المسلمة قبل توقف المستهلك لا تُسلم مجددًا عند الاستئناف
+            if delivered is not None:
+                self.frontier.ack_pages(delivered)
+            # توقف المستهلك قبل النهاية يوقف جميع العاملين (محليين وبعيدين)
+            self.frontier.set_status(STATUS_COMPLETED if completed else STATUS_STOPPED)
+            self._stop_workers()
+            stats = self.frontier.stats()
+            logger.info(f"اكتمل الزحف الموزع {self.crawl_id}: {stats.get(URL_DONE, 0)} صفحة، "
+                        f"{stats.get(URL_FAILED, 0)} فشل، {stats.get(URL_QUEUED, 0)} رابط لم يُزحف")
+
+    def crawl(self):
+        """
+        بدء عملية زحف الموقع
+
+        Returns:
+            dict: البيانات المجمعة للصفحات المزحوفة
+        """
+        return dict(self.iter_pages())
+
+    def close(self):
+        """إغلاق الاتصال بقاعدة البيانات"""
+        self.frontier.close()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة كشف المحتوى المكرر - تحليل على مستوى الموقع للعناوين والأوصاف والمحتوى المتشابه
+
+يحسب محلل السيو لكل صفحة بصمة SimHash من 64 بت لمحتواها الرئيسي (مقاطع من
+ثلاث كلمات). بعد التحليل تُجمع البصمات هنا، وتُقسم كل بصمة إلى max_distance+1
+نطاقًا (LSH banding): أي صفحتين يختلف محتواهما في max_distance بت أو أقل
+تتطابقان حتمًا في نطاق واحد على الأقل، فلا تُقارن إلا الصفحات التي تشترك في
+نطاق بدل مقارنة جميع الأزواج. العناوين والأوصاف المتطابقة تُجمع بفهرس بصمات.
+"""
+
+import re
+import logging
+from modules.url_registry import url_fingerprint
+from modules.seo_rules import SIMHASH_BITS, make_issue
+
+logger = logging.getLogger('rseo.duplicate_detector')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def hamming_distance(first, second):
+    """عدد البتات المختلفة بين بصمتين"""
+    return bin(first ^ second).count('1')
+
+
+def _normalize(text):
+    """توحيد النص للمقارنة التامة (حالة الأحرف والمسافات)"""
+    return _WHITESPACE.sub(' ', text or '').strip().lower()
+
+
+class DuplicateDetector:
+    """
+    كشف العناوين والأوصاف المكررة والصفحات شبه المكررة في نتائج تحليل موقع
+    """
+
+    def __init__(self, max_distance=4, min_words=50, thin_words=300):
+        """
+        Args:
+            max_distance (int): أقصى عدد بتات مختلفة بين بصمتي صفحتين شبه مكررتين
+                (كل زيادة تضيف نطاقًا أضيق فيزداد عدد المقارنات بسرعة في المواقع الكبيرة)
+            min_words (int): أقل عدد كلمات لمقارنة محتوى الصفحة (بصمات النصوص القصيرة غير موثوقة)
+            thin_words (int): الصفحات الأقل من هذا العدد من الكلمات تُعد محتوى ضعيفًا
+        """
+        self.max_distance = max(0, min(int(max_distance), SIMHASH_BITS - 1))
+        self.min_words = min_words
+        self.thin_words = thin_words
+
+        self.urls = []
+        self._simhashes = {}  # البصمة -> أرقام الصفحات
+        self._titles = {}  # بصمة العنوان -> [النص, أرقام الصفحات]
+        self._descriptions = {}  # بصمة الوصف -> [النص, أرقام الصفحات]
+        self._thin = []
+        self._report = None
+
+        # حدود النطاقات: max_distance+1 نطاق متقارب الطول
+        bands = self.max_distance + 1
+        self._bands = []
+        start = 0
+        for index in range(bands):
+            width = SIMHASH_BITS // bands + (1 if index < SIMHASH_BITS % bands else 0)
+            self._bands.append((start, (1 << width) - 1))
+            start += width
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        إنشاء الكاشف من إعدادات التطبيق (القسم analysis.duplicates)
+
+        Args:
+            config (dict): إعدادات التطبيق
+
+        Returns:
+            DuplicateDetector: الكاشف
+        """
+        config = config or {}
+        duplicates_config = config.get('analysis', {}).get('duplicates', {})
+        return cls(
+            max_distance=duplicates_config.get('max_distance', 4),
+            min_words=duplicates_config.get('min_words', 50),
+            thin_words=config.get('seo_analysis', {}).get('content', {}).get('min_words', 300)
+        )
+
+    def add(self, url, page_result):
+        """
+        إضافة نتيجة تحليل صفحة
+
+        Args:
+            url (str): عنوان الصفحة
+            page_result (dict): نتيجة تحليل الصفحة (تُستخدم أقسام basic_seo)
+        """
+        basic_seo = page_result.get('basic_seo') or {}
+        if not isinstance(basic_seo, dict):
+            return
+
+        index = len(self.urls)
+        self.urls.append(url)
+        self._report = None
+
+        for section, groups in (('title', self._titles), ('meta_description', self._descriptions)):
+            text = (basic_seo.get(section) or {}).get('content')
+            normalized = _normalize(text)
+            if normalized:
+                groups.setdefault(url_fingerprint(normalized), [text, []])[1].append(index)
+
+        content = basic_seo.get('content') or {}
+        word_count = content.get('word_count', 0)
+        if word_count < self.thin_words:
+            self._thin.append(index)
+        if content.get('simhash') and word_count >= self.min_words:
+            self._simhashes.setdefault(int(content['simhash'], 16), []).append(index)
+
+    def _near_duplicate_clusters(self):
+        """مجموعات الصفحات شبه المكررة (أرقام الصفحات) عبر نطاقات LSH"""
+        values = list(self._simhashes)
+        parent = list(range(len(values)))
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        # كل بصمة تُقارن فقط بالبصمات التي تشاركها أحد النطاقات. يُجمع أعضاء كل نطاق
+        # حسب مجموعتهم، فتُتخطى مجموعة الصفحة نفسها دون المرور على أعضائها، ولا
+        # تتضاعف المقارنات في النطاقات المشتركة بين صفحات كثيرة (مثل صفحات القالب الواحد)
+        buckets = {}
+        for node, value in enumerate(values):
+            for band, (shift, mask) in enumerate(self._bands):
+                groups = buckets.setdefault((band, (value >> shift) & mask), {})  # الجذر -> الأعضاء
+
+                # دمج مجموعات النطاق التي اتحدت جذورها منذ إضافتها (الأصغر في الأكبر)
+                for stored in [stored for stored in groups if find(stored) != stored]:
+                    members, root = groups.pop(stored), find(stored)
+                    current = groups.setdefault(root, [])
+                    if len(current) < len(members):
+                        groups[root], members = members, current
+                    groups[root].extend(members)
+
+                for stored, members in groups.items():
+                    root, other_root = find(node), find(stored)
+                    if root != other_root and any(hamming_distance(value, values[other]) <= self.max_distance
+                                                  for other in members):
+                        parent[root] = other_root
+                groups.setdefault(find(node), []).append(node)
+
+        clusters = {}
+        for node, value in enumerate(values):
+            clusters.setdefault(find(node), []).extend(self._simhashes[value])
+        return sorted((sorted(pages) for pages in clusters.values() if len(pages) > 1),
+                      key=lambda pages: (-len(pages), pages[0]))
+
+    def report(self):
+        """
+        تقرير التكرار على مستوى الموقع
+
+        Returns:
+            dict: العناوين والأوصاف المكررة، ومجموعات الصفحات شبه المكررة، والصفحات ضعيفة المحتوى
+        """
+        if self._report is not None:
+            return self._report
+
+        def exact(groups):
+            return sorted(({'content': text, 'urls': [self.urls[index] for index in pages]}
+                           for text, pages in groups.values() if len(pages) > 1),
+                          key=lambda group: -len(group['urls']))
+
+        self._report = {
+            'pages_count': len(self.urls),
+            'duplicate_titles': exact(self._titles),
+            'duplicate_descriptions': exact(self._descriptions),
+            'near_duplicates': [{'urls': [self.urls[index] for index in pages]}
+                                for pages in self._near_duplicate_clusters()],
+            'thin_pages': [self.urls[index] for index in self._thin],
+        }
+        logger.info(f"كشف التكرار: {len(self._report['duplicate_titles'])} عنوان مكرر، "
+                    f"{len(self._report['duplicate_descriptions'])} وصف مكرر، "
+                    f"{len(self._report['near_duplicates'])} مجموعة صفحات شبه مكررة")
+        return self._report
+
+    def page_issues(self):
+        """
+        مشاكل التكرار لكل صفحة (بنفس صيغة مشاكل محلل السيو)
+
+        Returns:
+            dict: {الرابط: [المشاكل]}
+        """
+        report = self.report()
+        issues = {}
+
+        for group in report['duplicate_titles']:
+            for url in group['urls']:
+                issues.setdefault(url, []).append(make_issue(
+                    'warning', f'عنوان الصفحة مكرر في {len(group["urls"]) - 1} صفحة أخرى', 'medium',
+                    'اكتب عنوانًا فريدًا لكل صفحة يميز محتواها عن الصفحات الأخرى'
+                ))
+
+        for group in report['duplicate_descriptions']:
+            for url in group['urls']:
+                issues.setdefault(url, []).append(make_issue(
+                    'warning', f'الوصف التعريفي مكرر في {len(group["urls"]) - 1} صفحة أخرى', 'medium',
+                    'اكتب وصفًا تعريفيًا فريدًا لكل صفحة'
+                ))
+
+        for group in report['near_duplicates']:
+            for url in group['urls']:
+                issues.setdefault(url, []).append(make_issue(
+                    'warning', f'محتوى الصفحة شبه مطابق لـ {len(group["urls"]) - 1} صفحة أخرى', 'medium',
+                    'ادمج الصفحات المتشابهة أو ميز محتواها، أو استخدم rel="canonical" للإشارة إلى الصفحة الأصلية'
+                ))
+
+        return issues
+
+    def annotate(self, results):
+        """
+        إضافة مشاكل التكرار إلى مشاكل basic_seo للصفحات المتأثرة
+
+        لا تتغير نتيجة الصفحة (score) لأن المشكلة تخص مجموعة صفحات لا صفحة واحدة.
+
+        Args:
+            results (dict): نتائج التحليل {الرابط: نتيجة الصفحة}
+        """
+        for url, issues in self.page_issues().items():
+            basic_seo = results.get(url, {}).get('basic_seo')
+            if isinstance(basic_seo, dict):
+                basic_seo.setdefault('issues', []).extend(issues)
@@ -9,11 +9,11 @@ RSEO - محلل E-E-A-T
 
 import re
 import requests
-from bs4 import BeautifulSoup
 import json
 from urllib.parse import urlparse, urljoin
 import time
 import logging
+from modules.parsed_page import ParsedPage
 
 class EEATAnalyzer:
     """
@@ -36,13 +36,14 @@ class EEATAnalyzer:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
     
-    def analyze(self, url, html_content=None):
+    def analyze(self, url, html_content=None, parsed_page=None):
         """
         تحليل مؤشرات E-E-A-T على الصفحة
         
         Args:
             url (str): رابط الصفحة للتحليل
             html_content (str, optional): محتوى HTML للصفحة إذا كان متاحًا. الافتراضي None.
+            parsed_page (ParsedPage, optional): الصفحة المحللة مسبقًا لتجنب إعادة التحليل. الافتراضي None.
             
         Returns:
             dict: نتائج تحليل E-E-A-T
@@ -75,14 +76,16 @@ class EEATAnalyzer:
         
         try:
             # الحصول على محتوى الصفحة إذا لم يتم توفيره
-            if not html_content:
-                response = requests.get(url, headers=self.headers, timeout=10)
-                if response.status_code != 200:
-                    self.logger.error(f"فشل في الحصول على محتوى الصفحة {url}, الحالة: {response.status_code}")
-                    return results
-                html_content = response.text
+            if parsed_page is None:
+                if not html_content:
+                    response = requests.get(url, headers=self.headers, timeout=10)
+                    if response.status_code != 200:
+                        self.logger.error(f"فشل في الحصول على محتوى الصفحة {url}, الحالة: {response.status_code}")
+                        return results
+                    html_content = response.text
+                parsed_page = ParsedPage(url, html_content)
             
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = parsed_page.soup
             
             # تحليل عامل التجربة (Experience)
             experience_score, experience_findings, experience_suggestions = self._analyze_experience(soup, url)
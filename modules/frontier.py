@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة حدود الزحف - قائمة انتظار الروابط المراد زيارتها مع إزالة التكرار عند الإضافة
+
+تحتفظ الوحدة بمجموعة الروابط التي سبق رؤيتها، فلا يدخل أي رابط قائمة الانتظار
+أكثر من مرة مهما تكرر في صفحات الموقع (روابط القائمة والتذييل). الإضافة
+والسحب بتكلفة O(1) في الوضع الافتراضي (FIFO)، مع أولوية اختيارية حسب العمق
+أو عدد الروابط الواردة.
+"""
+
+import heapq
+import itertools
+from collections import deque
+
+# أنماط الأولوية المدعومة
+PRIORITY_FIFO = None
+PRIORITY_DEPTH = 'depth'
+PRIORITY_INLINKS = 'inlinks'
+
+
+class CrawlFrontier:
+    """
+    حدود الزحف: قائمة انتظار الروابط مع مجموعة الروابط المرئية
+    """
+
+    def __init__(self, priority=PRIORITY_FIFO, seen=None):
+        """
+        تهيئة حدود الزحف
+
+        Args:
+            priority (str, optional): ترتيب السحب: None (بترتيب الاكتشاف)،
+                'depth' (الأقل عمقًا أولًا)، 'inlinks' (الأكثر روابط واردة أولًا)
+            seen (URLSet, optional): مجموعة الروابط المرئية (مجموعة نصوص عادية إذا لم تُمرر)
+        """
+        if priority not in (PRIORITY_FIFO, PRIORITY_DEPTH, PRIORITY_INLINKS):
+            raise ValueError(f"نمط أولوية غير مدعوم: {priority}")
+
+        self.priority = priority
+        self.seen = seen if seen is not None else set()
+        self.inlinks = {}  # عدد الروابط الواردة لكل رابط في قائمة الانتظار (نمط inlinks)
+        self._pushed = {}  # العدد المستخدم في آخر مدخل للرابط في الكومة
+        self._depths = {}  # أقل عمق اكتُشف به الرابط (نمط inlinks)
+
+        self._queue = deque()
+        self._heap = []
+        self._counter = itertools.count()  # لكسر التعادل بترتيب الاكتشاف
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __contains__(self, url):
+        return url in self.seen
+
+    def add(self, url, depth):
+        """
+        إضافة رابط إلى قائمة الانتظار إذا لم تتم رؤيته من قبل
+
+        Args:
+            url (str): الرابط
+            depth (int): عمق الرابط
+
+        Returns:
+            bool: True إذا أضيف الرابط، False إذا كان مرئيًا من قبل
+        """
+        if url in self.seen:
+            # رابط وارد إضافي لرابط ما زال في قائمة الانتظار يرفع أولويته
+            if self.priority == PRIORITY_INLINKS and url in self.inlinks:
+                self.inlinks[url] += 1
+                self._depths[url] = min(self._depths[url], depth)
+                # تحديث الترتيب عند تضاعف العدد فقط، فيبقى حجم الكومة O(n log n) على الأكثر
+                if self.inlinks[url] >= 2 * self._pushed[url]:
+                    self._push_inlinks(url)
+            return False
+
+        self.seen.add(url)
+        self._size += 1
+
+        if self.priority == PRIORITY_FIFO:
+            self._queue.append((url, depth))
+        elif self.priority == PRIORITY_DEPTH:
+            heapq.heappush(self._heap, (depth, next(self._counter), url))
+        else:
+            self.inlinks[url] = 1
+            self._depths[url] = depth
+            self._push_inlinks(url)
+        return True
+
+    def _push_inlinks(self, url):
+        """إضافة مدخل للرابط في الكومة بعدد روابطه الواردة الحالي"""
+        count = self.inlinks[url]
+        self._pushed[url] = count
+        heapq.heappush(self._heap, (-count, next(self._counter), url))
+
+    def add_many(self, urls, depth):
+        """
+        إضافة مجموعة روابط بنفس العمق
+
+        Args:
+            urls (iterable): الروابط
+            depth (int): عمق الروابط
+
+        Returns:
+            int: عدد الروابط الجديدة المضافة
+        """
+        return sum(1 for url in urls if self.add(url, depth))
+
+    def pending(self):
+        """
+        الروابط المتبقية في قائمة الانتظار (لحفظ حالة الزحف)
+
+        Returns:
+            list: [(الرابط, العمق)]
+        """
+        if self.priority == PRIORITY_FIFO:
+            return list(self._queue)
+        if self.priority == PRIORITY_DEPTH:
+            return [(url, depth) for depth, _, url in self._heap]
+        return list(self._depths.items())
+
+    def requeue(self, url, depth):
+        """
+        إعادة رابط تمت زيارته إلى قائمة الانتظار (مثل الصفحات المرفوضة مؤقتًا بالرمز 429)
+
+        Args:
+            url (str): الرابط
+            depth (int): عمق الرابط
+
+        Returns:
+            bool: True إذا أعيد الرابط، False إذا كان ما زال في قائمة الانتظار (نمط inlinks)
+        """
+        if self.priority == PRIORITY_INLINKS and url in self.inlinks:
+            # للرابط مدخل واحد صالح في الكومة، فلا يُحسب مرة ثانية في الحجم
+            self._depths[url] = min(self._depths[url], depth)
+            return False
+
+        self.seen.add(url)
+        self._size += 1
+
+        if self.priority == PRIORITY_FIFO:
+            self._queue.append((url, depth))
+        elif self.priority == PRIORITY_DEPTH:
+            heapq.heappush(self._heap, (depth, next(self._counter), url))
+        else:
+            self.inlinks[url] = 1
+            self._depths[url] = depth
+            self._push_inlinks(url)
+        return True
+
+    def mark_seen(self, url):
+        """تسجيل رابط كمرئي دون إضافته إلى قائمة الانتظار (مثل الروابط المحظورة)"""
+        self.seen.add(url)
+
+    def pop(self):
+        """
+        سحب الرابط التالي من قائمة الانتظار
+
+        Returns:
+            tuple: (الرابط, العمق)
+
+        Raises:
+            IndexError: إذا كانت قائمة الانتظار فارغة
+        """
+        if self.priority == PRIORITY_FIFO:
+            url, depth = self._queue.popleft()
+        elif self.priority == PRIORITY_DEPTH:
+            depth, _, url = heapq.heappop(self._heap)
+        else:
+            # تجاهل المدخلات القديمة التي حلت محلها أولوية أعلى
+            while True:
+                count, _, url = heapq.heappop(self._heap)
+                if url in self.inlinks and self._pushed[url] == -count:
+                    del self.inlinks[url]
+                    del self._pushed[url]
+                    depth = self._depths.pop(url)
+                    break
+
+        self._size -= 1
+        return url, depth
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة ترميز HTML - تحديد ترميز الصفحة من البايتات قبل فك ترميزها
+
+يُحدد الترميز مرة واحدة من علامة BOM أو ترويسة Content-Type أو وسم meta في
+أول بضعة كيلوبايتات من الصفحة، ثم يُفك ترميز المحتوى مرة واحدة، بدل فك
+ترميز الصفحة كاملة عدة مرات للبحث عن charset في النص.
+"""
+
+import re
+import codecs
+
+# عدد البايتات الأولى التي يُبحث فيها عن وسم meta (كما في خوارزمية المتصفحات)
+SNIFF_BYTES = 4096
+
+# الترميز المستخدم إذا لم يُحدد ولم يكن المحتوى UTF-8 صالحًا (الافتراضي القديم لمكتبة requests)
+FALLBACK_ENCODING = 'iso-8859-1'
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+# <meta charset="..."> و<meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+
+def _normalize(encoding):
+    """اسم الترميز الموحد، أو None إذا كان غير معروف"""
+    try:
+        return codecs.lookup(encoding).name
+    except (LookupError, TypeError):
+        return None
+
+
+def is_html(content_type):
+    """
+    التحقق من أن نوع المحتوى HTML (من الترويسة قبل قراءة المحتوى)
+
+    Args:
+        content_type (str): قيمة ترويسة Content-Type
+
+    Returns:
+        bool: True إذا كان المحتوى HTML
+    """
+    return 'text/html' in (content_type or '').lower()
+
+
+def detect_encoding(content_type, head):
+    """
+    تحديد ترميز الصفحة
+
+    الأولوية: علامة BOM، ثم charset في ترويسة Content-Type، ثم وسم meta في أول
+    SNIFF_BYTES بايت، ثم UTF-8 إذا كانت البايتات الأولى صالحة بهذا الترميز.
+
+    Args:
+        content_type (str): قيمة ترويسة Content-Type
+        head (bytes): البايتات الأولى من المحتوى
+
+    Returns:
+        str: اسم الترميز
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    match = _HEADER_CHARSET.search(content_type or '')
+    if match:
+        encoding = _normalize(match.group(1))
+        if encoding:
+            return encoding
+
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        encoding = _normalize(match.group(1).decode('ascii', 'ignore'))
+        if encoding:
+            # الصفحة مفكوكة من البايتات، فلا معنى لترميز UTF-16 معلن داخل نص ASCII
+            return 'utf-8' if encoding.startswith('utf-16') else encoding
+
+    try:
+        # تجاهل حرف متعدد البايتات مقطوع في نهاية الجزء المفحوص
+        codecs.getincrementaldecoder('utf-8')().decode(head[:SNIFF_BYTES])
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def decode_html(body, content_type):
+    """
+    فك ترميز محتوى الصفحة مرة واحدة
+
+    Args:
+        body (bytes or bytearray): محتوى الصفحة
+        content_type (str): قيمة ترويسة Content-Type
+
+    Returns:
+        str: نص HTML
+    """
+    encoding = detect_encoding(content_type, bytes(body[:SNIFF_BYTES]))
+    return body.decode(encoding, errors='replace')
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة ذاكرة HTTP المؤقتة - تخزين الصفحات على القرص مع الطلبات الشرطية لإعادة الزحف
+
+تحفظ الوحدة محتوى كل صفحة مع ترويسات ETag وLast-Modified في قاعدة بيانات
+SQLite، وعند إعادة زحف الموقع (مثل مهام المراقبة الدورية) يرسل الزاحف
+If-None-Match وIf-Modified-Since، فإذا أجاب الخادم بالرمز 304 تُقرأ الصفحة من
+القرص وتُعلم كصفحة لم تتغير بدل تنزيلها من جديد.
+"""
+
+import os
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger('rseo.http_cache')
+
+
+class HTTPCache:
+    """
+    ذاكرة HTTP مؤقتة دائمة على القرص (SQLite) للزواحف
+    """
+
+    def __init__(self, db_path="data/http_cache.db"):
+        """
+        تهيئة الذاكرة المؤقتة
+
+        Args:
+            db_path (str): مسار قاعدة البيانات
+        """
+        self.db_path = db_path
+        self.hits = 0  # عدد الاستجابات 304 (صفحات لم تتغير)
+
+        # التأكد من وجود المجلد
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # اتصال واحد مشترك بين الخيوط (الزاحف غير المتزامن يعمل في خيط خلفي)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.setup_database()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        إنشاء الذاكرة المؤقتة من إعدادات التطبيق (القسم crawling.http_cache)
+
+        Args:
+            config (dict): إعدادات التطبيق
+
+        Returns:
+            HTTPCache or None: الذاكرة المؤقتة، أو None إذا كانت معطلة
+        """
+        cache_config = (config or {}).get('crawling', {}).get('http_cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        return cls(db_path=cache_config.get('path', 'data/http_cache.db'))
+
+    def setup_database(self):
+        """إنشاء جدول الصفحات إذا لم يكن موجودًا"""
+        with self._lock:
+            self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                body BLOB,
+                fetched_at REAL
+            )
+            ''')
+            self._conn.commit()
+
+    def get(self, url):
+        """
+        الحصول على الصفحة المخزنة
+
+        Args:
+            url (str): عنوان URL
+
+        Returns:
+            dict or None: بيانات الصفحة (etag, last_modified, content_type, html, fetched_at)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, content_type, body, fetched_at FROM pages WHERE url = ?',
+                (url,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        etag, last_modified, content_type, body, fetched_at = row
+        try:
+            html = zlib.decompress(body).decode('utf-8')
+        except (zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"تعذرت قراءة الصفحة المخزنة {url}: {str(e)}")
+            return None
+
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': content_type,
+            'html': html,
+            'fetched_at': fetched_at
+        }
+
+    def conditional_headers(self, url):
+        """
+        ترويسات الطلب الشرطي لصفحة مخزنة
+
+        Args:
+            url (str): عنوان URL
+
+        Returns:
+            dict: ترويسات If-None-Match وIf-Modified-Since (فارغة إذا لم تكن الصفحة مخزنة)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+
+        headers = {}
+        if row is not None:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def store(self, url, headers, html, content_type=''):
+        """
+        تخزين صفحة إذا أرسل الخادم ترويسات تسمح بالطلبات الشرطية
+
+        Args:
+            url (str): عنوان URL
+            headers (Mapping): ترويسات الاستجابة
+            html (str): محتوى الصفحة
+            content_type (str): نوع المحتوى
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        body = zlib.compress(html.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (url, etag, last_modified, content_type, body, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, content_type, body, time.time())
+            )
+            self._conn.commit()
+
+    def revalidated(self, url):
+        """
+        الحصول على الصفحة المخزنة بعد استجابة 304 وتحديث وقت التحقق منها
+
+        Args:
+            url (str): عنوان URL
+
+        Returns:
+            dict or None: بيانات الصفحة المخزنة
+        """
+        cached = self.get(url)
+        if cached is None:
+            return None
+
+        self.hits += 1
+        with self._lock:
+            self._conn.execute('UPDATE pages SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self._conn.commit()
+        return cached
+
+    def close(self):
+        """إغلاق الاتصال بقاعدة البيانات"""
+        with self._lock:
+            self._conn.close()
@@ -12,9 +12,9 @@ import re
 import logging
 import requests
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
 from io import BytesIO
 from PIL import Image, UnidentifiedImageError
+from modules.parsed_page import ParsedPage
 
 class ImageOptimizer:
     """
@@ -46,7 +46,7 @@ class ImageOptimizer:
         تحليل الصور في صفحة ويب
         
         Args:
-            page_data (dict): بيانات الصفحة المحتوية على HTML والعنوان URL
+            page_data (dict or ParsedPage): بيانات الصفحة المحتوية على HTML والعنوان URL
             
         Returns:
             dict: نتائج تحليل الصور والمشاكل والتوصيات
@@ -63,11 +63,8 @@ class ImageOptimizer:
                 'issues': []
             }
         
-        # تحليل HTML باستخدام BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # استخراج عناصر الصور
-        img_tags = soup.find_all('img')
+        # استخراج عناصر الصور من الصفحة المحللة المشتركة
+        img_tags = ParsedPage.from_page_data(page_data).images
         
         # إحصائيات الصور
         total_images = len(img_tags)
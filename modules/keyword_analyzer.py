@@ -7,7 +7,6 @@ RSEO - محلل الكلمات المفتاحية
 
 import re
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import math
@@ -15,6 +14,7 @@ from collections import Counter
 from concurrent.futures import ThreadPoolExecutor
 
 from utils.logger import get_logger
+from modules.parsed_page import make_soup
 
 class KeywordAnalyzer:
     """محلل الكلمات المفتاحية - تحليل وتقييم الكلمات المفتاحية للمواقع"""
@@ -189,7 +189,7 @@ class KeywordAnalyzer:
                 try:
                     response = requests.get(url, headers=self.headers, timeout=10)
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.text, 'html.parser')
+                        soup = make_soup(response.text)
                         
                         # استخراج النص
                         text = soup.get_text()
@@ -7,27 +7,183 @@
 الروابط المكسورة والتوجيهات.
 """
 
+import time
 import logging
+import threading
 import requests
+from collections import OrderedDict
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
+from modules.parsed_page import page_links
+from modules.link_engine import AsyncLinkEngine
+
+class LinkStatusCache:
+    """
+    ذاكرة مؤقتة محدودة الحجم (LRU) لحالات الروابط مع مدة صلاحية
+
+    يمكن مشاركتها بين عدة فاحصات روابط خلال زحف واحد حتى لا تُفحص روابط
+    القائمة والتذييل مع كل صفحة، كما تدمج الطلبات المتزامنة لنفس الرابط
+    في طلب واحد.
+    """
+    
+    def __init__(self, max_size=10000, ttl=3600):
+        """
+        تهيئة الذاكرة المؤقتة
+        
+        Args:
+            max_size (int): العدد الأقصى للروابط المخزنة
+            ttl (int): مدة صلاحية نتيجة الفحص بالثواني
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # url -> (وقت الفحص, النتيجة)
+        self._pending = {}  # url -> Future للفحوصات الجارية
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _lookup(self, url):
+        """البحث عن نتيجة صالحة (يجب استدعاؤها مع القفل)"""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > self.ttl:
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        return entry[1]
+    
+    def get(self, url):
+        """
+        الحصول على حالة رابط مخزنة
+        
+        Args:
+            url (str): عنوان URL
+            
+        Returns:
+            dict or None: حالة الرابط إذا كانت مخزنة وصالحة
+        """
+        with self._lock:
+            result = self._lookup(url)
+            if result is not None:
+                self.hits += 1
+            return result
+    
+    def set(self, url, result):
+        """
+        تخزين حالة رابط مع إزالة الأقدم استخدامًا عند امتلاء الذاكرة
+        
+        Args:
+            url (str): عنوان URL
+            result (dict): حالة الرابط
+        """
+        with self._lock:
+            self._entries[url] = (time.time(), result)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def claim(self, url):
+        """
+        حجز فحص رابط أو الانضمام إلى فحص جارٍ له
+        
+        Args:
+            url (str): عنوان URL
+            
+        Returns:
+            tuple: (النتيجة المخزنة أو None, Future للفحص, True إذا كان المستدعي هو المسؤول عن الفحص)
+        """
+        with self._lock:
+            result = self._lookup(url)
+            if result is not None:
+                self.hits += 1
+                return result, None, False
+            
+            future = self._pending.get(url)
+            if future is not None:
+                self.hits += 1
+                return None, future, False
+            
+            self.misses += 1
+            future = Future()
+            self._pending[url] = future
+            return None, future, True
+    
+    def resolve(self, url, future, result=None, error=None):
+        """
+        إنهاء فحص محجوز وإبلاغ المنتظرين بالنتيجة
+        
+        Args:
+            url (str): عنوان URL
+            future (Future): الفحص المحجوز
+            result (dict): حالة الرابط
+            error (Exception): الخطأ في حال فشل الفحص (لا يتم تخزينه)
+        """
+        if error is None:
+            self.set(url, result)
+        with self._lock:
+            self._pending.pop(url, None)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+    
+    def get_or_check(self, url, check):
+        """
+        الحصول على حالة رابط من الذاكرة أو فحصه مرة واحدة فقط
+        
+        Args:
+            url (str): عنوان URL
+            check (callable): دالة الفحص التي تُستدعى عند عدم وجود نتيجة
+            
+        Returns:
+            dict: حالة الرابط
+        """
+        result, future, owner = self.claim(url)
+        if future is None:
+            return result
+        if not owner:
+            return future.result()
+        
+        try:
+            result = check(url)
+        except Exception as e:
+            self.resolve(url, future, error=e)
+            raise
+        self.resolve(url, future, result)
+        return result
+    
+    def clear(self):
+        """مسح جميع النتائج المخزنة"""
+        with self._lock:
+            self._entries.clear()
+
 
 class LinkChecker:
     """
     فئة لفحص الروابط في صفحات الويب
     """
     
-    def __init__(self, max_workers=5, timeout=10, check_external=True, verbose=False):
+    def __init__(self, max_workers=5, timeout=10, check_external=True, verbose=False, cache=None,
+                 engine='async', max_concurrent=100, max_per_host=8, session=None):
         """
         تهيئة فاحص الروابط
         
         Args:
-            max_workers (int): العدد الأقصى للعمليات المتزامنة
+            max_workers (int): العدد الأقصى للعمليات المتزامنة (محرك الخيوط)
             timeout (int): مهلة انتهاء الطلب بالثواني
             check_external (bool): فحص الروابط الخارجية أيضًا
             verbose (bool): طباعة معلومات إضافية أثناء الفحص
+            cache (LinkStatusCache, optional): ذاكرة حالات الروابط المشتركة خلال الزحف
+            engine (str): محرك الفحص: 'async' (asyncio) أو 'threads' (مجمع خيوط)
+            max_concurrent (int): أقصى عدد للطلبات المتزامنة (المحرك غير المتزامن)
+            max_per_host (int): أقصى عدد للطلبات المتزامنة للمضيف الواحد (المحرك غير المتزامن)
+            session (CrawlSession, optional): جلسة aiohttp مشتركة لإعادة استخدام مجمع الاتصالات
         """
         self.max_workers = max_workers
         self.timeout = timeout
@@ -35,22 +191,52 @@ class LinkChecker:
         self.verbose = verbose
         self.logger = logging.getLogger('rseo.link_checker')
         
-        # جلسة للطلبات HTTP
+        # جلسة للطلبات HTTP (مجمع الاتصالات بحجم عدد العمليات المتزامنة)
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'User-Agent': 'RSEO Link Checker/1.0',
             'Accept-Language': 'ar,en-US;q=0.9,en;q=0.8',
         })
         
         # تخزين مؤقت لنتائج الروابط التي تم فحصها
-        self.checked_links = {}
+        self.checked_links = cache if cache is not None else LinkStatusCache()
+        
+        # محرك الفحص: asyncio افتراضيًا، ومجمع خيوط واحد طوال عمر الفاحص كبديل
+        self.engine = None
+        self.executor = None
+        if engine == 'async':
+            self.engine = AsyncLinkEngine(
+                session=session,
+                max_concurrent=max_concurrent,
+                max_per_host=max_per_host,
+                timeout=timeout
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    def close(self):
+        """إيقاف محرك الفحص وإغلاق جلسة HTTP"""
+        if self.engine is not None:
+            self.engine.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def check_links(self, page_data):
         """
         فحص الروابط في صفحة
         
         Args:
-            page_data (dict): بيانات الصفحة المحتوية على HTML والعنوان URL
+            page_data (dict or ParsedPage): بيانات الصفحة المحتوية على HTML والعنوان URL
             
         Returns:
             dict: نتائج فحص الروابط
@@ -66,15 +252,12 @@ class LinkChecker:
                 'issues': []
             }
         
-        # تحليل HTML باستخدام BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
         # استخراج معلومات الموقع الحالي
         parsed_url = urlparse(url)
         base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         
         # جمع جميع الروابط
-        all_links = self._extract_all_links(soup, url)
+        all_links = self._extract_all_links(page_links(page_data))
         
         # تصنيف الروابط
         internal_links = []
@@ -145,31 +328,56 @@ class LinkChecker:
         
         return result
     
-    def _extract_all_links(self, soup, base_url):
+    def prefetch(self, pages, wait=True):
         """
-        استخراج جميع الروابط من صفحة HTML
+        فحص روابط مجموعة صفحات دفعة واحدة وتخزين النتائج في الذاكرة المؤقتة
+        
+        يسمح ذلك بفحص روابط الموقع كله بالتوازي بدلًا من انتظار روابط كل صفحة
+        قبل بدء الصفحة التالية، ثم تقرأ check_links النتائج من الذاكرة.
         
         Args:
-            soup (BeautifulSoup): كائن BeautifulSoup للصفحة
-            base_url (str): عنوان URL الأساسي للصفحة
+            pages (iterable): بيانات الصفحات (dict أو ParsedPage)
+            wait (bool): انتظار انتهاء الفحص، أو بدؤه في الخلفية فقط
             
         Returns:
-            set: مجموعة الروابط الفريدة
+            Future or None: الفحص الجاري في الخلفية عندما تكون wait=False
         """
         links = set()
-        
-        # البحث عن جميع وسوم الروابط
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag.get('href', '').strip()
-            
-            # تجاهل الروابط الفارغة والبريد الإلكتروني وروابط JavaScript
-            if not href or href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+        for page_data in pages:
+            if not page_data.get('html'):
                 continue
+            page_netloc = urlparse(page_data.get('url', '')).netloc
+            for link in self._extract_all_links(page_links(page_data)):
+                link_netloc = urlparse(link).netloc
+                if self.check_external or not link_netloc or link_netloc == page_netloc:
+                    links.add(link)
+        
+        if not links:
+            return None
+        
+        if wait:
+            self._check_links_status(links, None)
+            return None
+        
+        # تنضم check_links لاحقًا إلى الفحوصات الجارية عبر الذاكرة المؤقتة
+        if self.engine is not None:
+            return self.engine.submit_urls(links, cache=self.checked_links)
+        return self.executor.submit(self._check_links_status, links, None)
+    
+    def _extract_all_links(self, hrefs):
+        """
+        استخراج جميع الروابط الفريدة من روابط الصفحة
+        
+        Args:
+            hrefs (iterable): الروابط المطلقة في الصفحة (page_links)
             
-            # تحويل الروابط النسبية إلى مطلقة
-            if not href.startswith(('http://', 'https://')):
-                href = urljoin(base_url, href)
-            
+        Returns:
+            set: مجموعة الروابط الفريدة
+        """
+        links = set()
+        
+        # الروابط المطلقة المستخرجة مسبقًا (بدون الفارغة والبريد الإلكتروني وروابط JavaScript)
+        for href in hrefs:
             # إزالة الهاش (الإشارة داخل الصفحة)
             if '#' in href:
                 href = href.split('#')[0]
@@ -195,23 +403,30 @@ class LinkChecker:
         Returns:
             dict: حالة كل رابط
         """
+        if self.engine is not None:
+            return self.engine.check_urls(links, cache=self.checked_links)
+        
         results = {}
+        future_to_url = {}
+        
+        for link in links:
+            # الروابط المخزنة لا تحتاج إلى مهمة في مجمع العمليات
+            status = self.checked_links.get(link)
+            if status is not None:
+                results[link] = status
+            else:
+                future_to_url[self.executor.submit(self.checked_links.get_or_check, link, self._check_link_status)] = link
         
-        # استخدام ThreadPoolExecutor للتحقق من الروابط بشكل متوازٍ
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # إنشاء مهام للتحقق من كل رابط
-            future_to_url = {executor.submit(self._check_link_status, link): link for link in links}
+        # جمع النتائج
+        for future in tqdm(as_completed(future_to_url), total=len(future_to_url), disable=not self.verbose, desc="فحص الروابط"):
+            link = future_to_url[future]
             
-            # جمع النتائج
-            for future in tqdm(as_completed(future_to_url), total=len(links), disable=not self.verbose, desc="فحص الروابط"):
-                link = future_to_url[future]
-                
-                try:
-                    status = future.result()
-                    results[link] = status
-                except Exception as e:
-                    self.logger.error(f"خطأ في فحص الرابط {link}: {str(e)}")
-                    results[link] = {'status': 'error', 'status_code': 0, 'error': str(e)}
+            try:
+                status = future.result()
+                results[link] = status
+            except Exception as e:
+                self.logger.error(f"خطأ في فحص الرابط {link}: {str(e)}")
+                results[link] = {'status': 'error', 'status_code': 0, 'error': str(e)}
         
         return results
     
@@ -225,10 +440,6 @@ class LinkChecker:
         Returns:
             dict: حالة الرابط
         """
-        # استخدام النتيجة المخزنة مؤقتًا إذا كانت متاحة
-        if url in self.checked_links:
-            return self.checked_links[url]
-        
         try:
             # إرسال طلب HEAD للتحقق من حالة الرابط
             response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
@@ -239,6 +450,8 @@ class LinkChecker:
                 # قراءة جزء صغير من المحتوى فقط
                 for chunk in response.iter_content(chunk_size=1024):
                     break
+                # إعادة الاتصال إلى المجمع دون تنزيل بقية المحتوى
+                response.close()
             
             # تحديد ما إذا كان هناك توجيه
             redirected = response.history and len(response.history) > 0
@@ -255,22 +468,13 @@ class LinkChecker:
                 result['redirected_url'] = response.url
                 result['redirect_count'] = len(response.history)
             
-            # تخزين النتيجة مؤقتًا
-            self.checked_links[url] = result
-            
             return result
             
         except requests.exceptions.Timeout:
-            result = {'status': 'error', 'status_code': 0, 'error': 'timeout'}
-            self.checked_links[url] = result
-            return result
+            return {'status': 'error', 'status_code': 0, 'error': 'timeout'}
             
         except requests.exceptions.ConnectionError:
-            result = {'status': 'error', 'status_code': 0, 'error': 'connection_error'}
-            self.checked_links[url] = result
-            return result
+            return {'status': 'error', 'status_code': 0, 'error': 'connection_error'}
             
         except requests.exceptions.RequestException as e:
-            result = {'status': 'error', 'status_code': 0, 'error': str(e)}
-            self.checked_links[url] = result
-            return result
+            return {'status': 'error', 'status_code': 0, 'error': str(e)}
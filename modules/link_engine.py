@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة محرك فحص الروابط غير المتزامن - فحص آلاف الروابط بالتوازي باستخدام asyncio
+
+يستخدم المحرك مجمع اتصالات aiohttp واحدًا مشتركًا (CrawlSession) مع حد أقصى
+للطلبات المتزامنة لكل مضيف، ويرسل طلب HEAD أولًا ثم طلب GET جزئي
+(Range: bytes=0-0) للخوادم التي لا تدعم HEAD. شكل النتيجة مطابق لنتائج
+LinkChecker._check_link_status.
+"""
+
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+
+from modules.parallel_crawler import CrawlSession
+
+logger = logging.getLogger('rseo.link_engine')
+
+DEFAULT_USER_AGENT = 'RSEO Link Checker/1.0'
+
+
+class AsyncLinkEngine:
+    """
+    محرك فحص روابط غير متزامن مع حدود تزامن عامة ولكل مضيف
+    """
+
+    def __init__(self, session=None, max_concurrent=100, max_per_host=8, timeout=10,
+                 user_agent=DEFAULT_USER_AGENT):
+        """
+        تهيئة المحرك
+
+        Args:
+            session (CrawlSession, optional): جلسة مشتركة (مثل جلسة الزاحف) لإعادة استخدام مجمع الاتصالات
+            max_concurrent (int): أقصى عدد للطلبات المتزامنة
+            max_per_host (int): أقصى عدد للطلبات المتزامنة للمضيف الواحد
+            timeout (int): مهلة الطلب بالثواني
+            user_agent (str): نص User-Agent
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_host = max(1, max_per_host)
+        self.timeout = timeout
+        self.headers = {
+            'User-Agent': user_agent,
+            'Accept-Language': 'ar,en-US;q=0.9,en;q=0.8',
+        }
+
+        # إنشاء جلسة خاصة بالمحرك إذا لم تُمرر جلسة مشتركة
+        self._owns_session = session is None
+        self.crawl_session = session or CrawlSession(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_per_host,
+            timeout=timeout,
+            user_agent=user_agent
+        )
+
+        # تُنشأ على حلقة الجلسة عند أول فحص
+        self._semaphore = None
+        self._host_semaphores = {}
+
+    def _get_host_semaphore(self, url):
+        """الحصول على أداة تحديد التزامن الخاصة بمضيف الرابط"""
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_semaphores[host]
+
+    async def _request(self, session, method, url, headers=None):
+        """
+        إرسال طلب مع تتبع التوجيهات دون تنزيل المحتوى
+
+        Returns:
+            tuple: (رمز الحالة, عدد التوجيهات, العنوان النهائي)
+        """
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+
+        async with session.request(method, url, headers=request_headers, allow_redirects=True,
+                                   timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+            return response.status, len(response.history), str(response.url)
+
+    async def check_url(self, session, url):
+        """
+        التحقق من حالة رابط واحد
+
+        Args:
+            session (aiohttp.ClientSession): جلسة aiohttp
+            url (str): عنوان URL للتحقق
+
+        Returns:
+            dict: حالة الرابط
+        """
+        async with self._get_host_semaphore(url):
+            async with self._semaphore:
+                try:
+                    # إرسال طلب HEAD للتحقق من حالة الرابط
+                    status, redirect_count, final_url = await self._request(session, 'HEAD', url)
+
+                    # إذا كان طلب HEAD غير مدعوم، استخدم GET لأول بايت فقط
+                    if status >= 400:
+                        status, redirect_count, final_url = await self._request(
+                            session, 'GET', url, headers={'Range': 'bytes=0-0'})
+
+                        # المورد موجود لكن النطاق غير مقبول (مثل الملفات الفارغة)
+                        if status == 416:
+                            status, redirect_count, final_url = await self._request(session, 'GET', url)
+
+                except asyncio.TimeoutError:
+                    return {'status': 'error', 'status_code': 0, 'error': 'timeout'}
+
+                except aiohttp.ClientConnectionError:
+                    return {'status': 'error', 'status_code': 0, 'error': 'connection_error'}
+
+                except (aiohttp.ClientError, ValueError) as e:
+                    return {'status': 'error', 'status_code': 0, 'error': str(e)}
+
+        # تحديد ما إذا كان هناك توجيه
+        redirected = redirect_count > 0
+
+        result = {
+            'status': 'success' if status < 400 else 'error',
+            'status_code': status,
+            'redirected': redirected
+        }
+
+        # إضافة معلومات التوجيه إذا كان موجودًا
+        if redirected:
+            result['original_url'] = url
+            result['redirected_url'] = final_url
+            result['redirect_count'] = redirect_count
+
+        return result
+
+    async def _check_cached(self, session, url, cache):
+        """فحص رابط عبر الذاكرة المؤقتة مع دمج الفحوصات المتزامنة لنفس الرابط"""
+        if cache is None:
+            return await self.check_url(session, url)
+
+        result, future, owner = cache.claim(url)
+        if future is None:
+            return result
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await self.check_url(session, url)
+        except BaseException as e:
+            cache.resolve(url, future, error=e)
+            raise
+        cache.resolve(url, future, result)
+        return result
+
+    async def check_urls_async(self, urls, cache=None):
+        """
+        التحقق من حالة قائمة من الروابط بشكل متزامن (على حلقة الجلسة)
+
+        Args:
+            urls (iterable): الروابط المراد فحصها
+            cache (LinkStatusCache, optional): ذاكرة حالات الروابط
+
+        Returns:
+            dict: حالة كل رابط
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        session = await self.crawl_session.get_session()
+        urls = list(dict.fromkeys(urls))
+        statuses = await asyncio.gather(
+            *(self._check_cached(session, url, cache) for url in urls),
+            return_exceptions=True
+        )
+
+        results = {}
+        for url, status in zip(urls, statuses):
+            if isinstance(status, BaseException):
+                logger.error(f"خطأ في فحص الرابط {url}: {str(status)}")
+                status = {'status': 'error', 'status_code': 0, 'error': str(status)}
+            results[url] = status
+        return results
+
+    def check_urls(self, urls, cache=None):
+        """
+        التحقق من حالة قائمة من الروابط (من أي خيط)
+
+        Args:
+            urls (iterable): الروابط المراد فحصها
+            cache (LinkStatusCache, optional): ذاكرة حالات الروابط
+
+        Returns:
+            dict: حالة كل رابط
+        """
+        return self.crawl_session.run(self.check_urls_async(urls, cache))
+
+    def submit_urls(self, urls, cache=None):
+        """
+        بدء فحص قائمة من الروابط في الخلفية دون انتظار النتائج
+
+        Args:
+            urls (iterable): الروابط المراد فحصها
+            cache (LinkStatusCache, optional): ذاكرة حالات الروابط
+
+        Returns:
+            concurrent.futures.Future: نتيجة الفحص عند اكتماله
+        """
+        return asyncio.run_coroutine_threadsafe(self.check_urls_async(urls, cache), self.crawl_session.loop)
+
+    def close(self):
+        """إغلاق الجلسة إذا كانت خاصة بالمحرك"""
+        if self._owns_session:
+            self.crawl_session.close()
+        self._semaphore = None
+        self._host_semaphores = {}
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة رسم الروابط الداخلية - PageRank الداخلي وعمق النقرات والصفحات اليتيمة
+
+يسجل الزاحف روابط كل صفحة أثناء الزحف كأزواج من المعرفات الرقمية (من سجل
+الروابط URLRegistry) في مصفوفات مضغوطة بدل نصوص الروابط. بعد الزحف تُحول
+الحواف إلى مصفوفة تجاور متفرقة بصيغة CSR (indptr وindices)، ويُحسب عليها
+PageRank بتكرار القوة وعمق النقرات بالبحث بالعرض بعمليات NumPy على المصفوفات
+كاملة، فيبقى زمن التحليل بضع ثوانٍ حتى مع مليون رابط.
+
+تُحدد الصفحات اليتيمة من الفرق بين خرائط الموقع والروابط المكتشفة (صفحات لا
+يصل إليها أي رابط من الصفحات المزحوفة)، والصفحات المسدودة التي لا تحتوي على
+أي رابط داخلي.
+"""
+
+import logging
+from array import array
+import numpy as np
+from modules.url_registry import URLRegistry
+from modules.seo_rules import make_issue
+
+logger = logging.getLogger('rseo.link_graph')
+
+
+class LinkGraph:
+    """
+    رسم الروابط الداخلية لعملية زحف واحدة
+    """
+
+    def __init__(self, start_url, url_registry=None, damping=0.85, max_iterations=100, tolerance=1e-6,
+                 max_click_depth=3):
+        """
+        Args:
+            start_url (str): الصفحة الرئيسية (جذر عمق النقرات)
+            url_registry (URLRegistry, optional): سجل الروابط المشترك مع الزاحف (مصدر المعرفات الرقمية)
+            damping (float): معامل التخميد في PageRank
+            max_iterations (int): أقصى عدد لتكرارات PageRank
+            tolerance (float): حد التقارب (مجموع فروق القيم بين تكرارين)
+            max_click_depth (int): الصفحات الأبعد من هذا العدد من النقرات تُعد عميقة
+        """
+        self.start_url = start_url
+        self.url_registry = url_registry or URLRegistry()
+        self.damping = damping
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.max_click_depth = max_click_depth
+
+        # الحواف ومعرفات الصفحات المزحوفة وروابط خرائط الموقع (مصفوفات أعداد بدل قوائم كائنات)
+        self._sources = array('q')
+        self._targets = array('q')
+        self._pages = array('q')
+        self._sitemap = array('q')
+        self._result = None
+        # يعينه الزاحف عندما يشمل الزحف جميع الصفحات التي يصل إليها رابط؛ وإلا فروابط خرائط
+        # الموقع غير المزحوفة قد تكون مرتبطة من صفحات لم تُزحف، فلا تُعد يتيمة
+        self.complete = False
+
+    @classmethod
+    def from_config(cls, config, start_url, url_registry=None):
+        """
+        إنشاء الرسم من إعدادات التطبيق (القسم analysis.link_graph)
+
+        Args:
+            config (dict): إعدادات التطبيق
+            start_url (str): الصفحة الرئيسية
+            url_registry (URLRegistry, optional): سجل الروابط المشترك مع الزاحف
+
+        Returns:
+            LinkGraph or None: الرسم، أو None إذا كان معطلًا
+        """
+        graph_config = (config or {}).get('analysis', {}).get('link_graph', {})
+        if not graph_config.get('enabled', False):
+            return None
+        return cls(
+            start_url,
+            url_registry=url_registry,
+            damping=graph_config.get('damping', 0.85),
+            max_iterations=graph_config.get('max_iterations', 100),
+            tolerance=graph_config.get('tolerance', 1e-6),
+            max_click_depth=graph_config.get('max_click_depth', 3)
+        )
+
+    def add_page(self, url, links):
+        """
+        تسجيل صفحة مزحوفة وروابطها الداخلية
+
+        Args:
+            url (str): عنوان الصفحة
+            links (iterable): الروابط الداخلية في الصفحة (بعد توحيدها)
+        """
+        registry = self.url_registry
+        source = registry.id(url)
+        targets = [registry.id(link) for link in links]
+        self._pages.append(source)
+        self._sources.extend([source] * len(targets))
+        self._targets.extend(targets)
+        self._result = None
+
+    def add_sitemap_url(self, url):
+        """
+        تسجيل رابط من خريطة الموقع (لكشف الصفحات اليتيمة)
+
+        Args:
+            url (str): الرابط (بعد توحيده)
+        """
+        self._sitemap.append(self.url_registry.id(url))
+        self._result = None
+
+    def __len__(self):
+        return len(self._pages)
+
+    def _build(self):
+        """
+        تحويل الحواف إلى مصفوفة CSR للصفحات المزحوفة وحساب المقاييس
+
+        Returns:
+            dict: مصفوفات المقاييس لكل صفحة مزحوفة بترتيب pages
+        """
+        n = len(self.url_registry)
+        pages = np.unique(np.frombuffer(self._pages, dtype=np.int64))
+        sources = np.frombuffer(self._sources, dtype=np.int64)
+        targets = np.frombuffer(self._targets, dtype=np.int64)
+
+        # إزالة الروابط إلى الصفحة نفسها والروابط المكررة في الصفحة الواحدة
+        distinct = sources != targets
+        keys = np.unique(sources[distinct] * n + targets[distinct])
+        sources, targets = keys // n, keys % n
+
+        # الروابط الداخلية لكل رابط معروف (ومنها الروابط إلى صفحات لم تُزحف)
+        outlinks_all = np.bincount(sources, minlength=n)
+        inlinks_all = np.bincount(targets, minlength=n)
+
+        # الرسم الفرعي للصفحات المزحوفة بمعرفات متتالية 0..m-1
+        m = len(pages)
+        index = np.full(n, -1, dtype=np.int64)
+        index[pages] = np.arange(m)
+        crawled = index[targets] >= 0
+        # المفاتيح مرتبة حسب المصدر ثم الهدف، فتبقى الحواف مرتبة بعد إعادة الترقيم (صيغة CSR مباشرة)
+        indices = index[targets[crawled]]
+        outdegree = np.bincount(index[sources[crawled]], minlength=m)
+        indptr = np.zeros(m + 1, dtype=np.int64)
+        np.cumsum(outdegree, out=indptr[1:])
+
+        root = self.url_registry.get(self.start_url)
+        root = int(index[root]) if root is not None else -1
+
+        return {
+            'pages': pages,
+            'edges': len(keys),
+            'pagerank': self._pagerank(indptr, indices, outdegree),
+            'click_depth': self._click_depth(indptr, indices, root),
+            'inlinks': np.bincount(indices, minlength=m),
+            'outlinks': outlinks_all[pages],
+            'linked': inlinks_all,
+            'root': root,
+        }
+
+    def _pagerank(self, indptr, indices, outdegree):
+        """PageRank بتكرار القوة على مصفوفة CSR (الصفحات بلا روابط توزع قيمتها على جميع الصفحات)"""
+        m = len(outdegree)
+        if not m:
+            return np.zeros(0)
+
+        rank = np.full(m, 1.0 / m)
+        dangling = outdegree == 0
+        share = np.zeros(m)
+        iterations = 0
+        for iterations in range(1, self.max_iterations + 1):
+            # نصيب كل رابط من قيمة صفحته، ثم جمع الأنصبة لكل هدف
+            np.divide(rank, outdegree, out=share, where=~dangling)
+            incoming = np.bincount(indices, weights=np.repeat(share, outdegree), minlength=m)
+            updated = (1 - self.damping) / m + self.damping * (incoming + rank[dangling].sum() / m)
+            delta = np.abs(updated - rank).sum()
+            rank = updated
+            if delta < self.tolerance:
+                break
+
+        logger.debug(f"تقارب PageRank بعد {iterations} تكرار")
+        return rank
+
+    @staticmethod
+    def _click_depth(indptr, indices, root):
+        """عمق النقرات من الصفحة الرئيسية بالبحث بالعرض مستوى كاملًا في كل خطوة (-1 للصفحات غير الموصولة)"""
+        depth = np.full(len(indptr) - 1, -1, dtype=np.int64)
+        if root < 0:
+            return depth
+
+        depth[root] = 0
+        frontier = np.array([root], dtype=np.int64)
+        level = 0
+        while frontier.size:
+            # مواقع روابط جميع صفحات المستوى الحالي في indices دفعة واحدة
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+            neighbors = indices[positions]
+            frontier = np.unique(neighbors[depth[neighbors] < 0])
+            level += 1
+            depth[frontier] = level
+        return depth
+
+    def _metrics(self):
+        """المقاييس المحسوبة (تُحسب مرة واحدة بعد آخر إضافة)"""
+        if self._result is None:
+            self._result = self._build()
+        return self._result
+
+    def _orphans(self, metrics):
+        """معرفات الصفحات اليتيمة: صفحات مزحوفة (وروابط خرائط الموقع عند اكتمال الزحف) لا يصل إليها أي رابط"""
+        candidates = metrics['pages']
+        if self.complete:
+            candidates = np.union1d(np.frombuffer(self._sitemap, dtype=np.int64), candidates)
+        orphans = candidates[metrics['linked'][candidates] == 0]
+        root = self.url_registry.get(self.start_url)
+        return orphans[orphans != root] if root is not None else orphans
+
+    def page_metrics(self):
+        """
+        مقاييس الروابط الداخلية لكل صفحة مزحوفة
+
+        Returns:
+            dict: {الرابط: {'pagerank', 'click_depth', 'inlinks', 'outlinks', 'orphan', 'dead_end'}}
+        """
+        metrics = self._metrics()
+        orphans = set(self._orphans(metrics).tolist())
+        registry = self.url_registry
+        result = {}
+        for position, page_id in enumerate(metrics['pages'].tolist()):
+            click_depth = int(metrics['click_depth'][position])
+            result[registry.url(page_id)] = {
+                'pagerank': round(float(metrics['pagerank'][position]), 6),
+                'click_depth': click_depth if click_depth >= 0 else None,
+                'inlinks': int(metrics['inlinks'][position]),
+                'outlinks': int(metrics['outlinks'][position]),
+                'orphan': page_id in orphans,
+                'dead_end': bool(metrics['outlinks'][position] == 0),
+            }
+        return result
+
+    def report(self, top=10):
+        """
+        تقرير رسم الروابط على مستوى الموقع
+
+        Args:
+            top (int): عدد الصفحات الأعلى في PageRank المعروضة
+
+        Returns:
+            dict: إحصائيات الرسم والصفحات اليتيمة والمسدودة وتوزيع عمق النقرات
+        """
+        metrics = self._metrics()
+        registry = self.url_registry
+        pages = metrics['pages']
+        depth = metrics['click_depth']
+
+        levels, counts = np.unique(depth[depth >= 0], return_counts=True)
+        best = np.argsort(-metrics['pagerank'], kind='stable')[:top]
+        report = {
+            'pages_count': len(pages),
+            'links_count': int(metrics['edges']),
+            'complete': self.complete,
+            'top_pages': [{'url': registry.url(int(pages[i])), 'pagerank': round(float(metrics['pagerank'][i]), 6)}
+                          for i in best],
+            'click_depth_distribution': {int(level): int(count) for level, count in zip(levels, counts)},
+            'deep_pages': [registry.url(page_id) for page_id in pages[depth > self.max_click_depth].tolist()],
+            'unreachable_pages': [registry.url(page_id) for page_id in pages[depth < 0].tolist()],
+            'orphan_pages': [registry.url(page_id) for page_id in self._orphans(metrics).tolist()],
+            'dead_end_pages': [registry.url(page_id) for page_id in pages[metrics['outlinks'] == 0].tolist()],
+        }
+        logger.info(f"رسم الروابط: {report['pages_count']} صفحة، {report['links_count']} رابط، "
+                    f"{len(report['orphan_pages'])} صفحة يتيمة، {len(report['dead_end_pages'])} صفحة مسدودة")
+        return report
+
+    def annotate(self, results):
+        """
+        إضافة مقاييس الروابط الداخلية (القسم link_graph) ومشاكلها إلى نتائج الصفحات
+
+        تُضاف المشاكل إلى مشاكل basic_seo دون تغيير نتيجة الصفحة.
+
+        Args:
+            results (dict): نتائج التحليل {الرابط: نتيجة الصفحة}
+        """
+        for url, page_metrics in self.page_metrics().items():
+            page_result = results.get(url)
+            if not isinstance(page_result, dict) or not isinstance(page_result.get('basic_seo'), dict):
+                continue
+            page_result['link_graph'] = page_metrics
+            issues = page_result['basic_seo'].setdefault('issues', [])
+
+            if page_metrics['orphan']:
+                issues.append(make_issue(
+                    'warning', 'لا يوجد رابط داخلي إلى الصفحة (صفحة يتيمة)', 'medium',
+                    'أضف روابط إلى الصفحة من صفحات الموقع ذات الصلة حتى تصل إليها محركات البحث والزوار'
+                ))
+            if page_metrics['dead_end']:
+                issues.append(make_issue(
+                    'info', 'الصفحة لا تحتوي على روابط داخلية', 'low',
+                    'أضف روابط إلى صفحات أخرى في الموقع لتوزيع قوة الروابط وإبقاء الزائر في الموقع'
+                ))
+            if page_metrics['click_depth'] is not None and page_metrics['click_depth'] > self.max_click_depth:
+                issues.append(make_issue(
+                    'warning', f'الصفحة على بعد {page_metrics["click_depth"]} نقرات من الصفحة الرئيسية', 'low',
+                    f'اجعل الصفحات المهمة على بعد {self.max_click_depth} نقرات أو أقل بروابط من الصفحات الرئيسية'
+                ))
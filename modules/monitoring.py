@@ -21,8 +21,16 @@ from apscheduler.triggers.cron import CronTrigger
 from jinja2 import Environment, FileSystemLoader
 
 # استيراد وحدات داخلية
-from modules.analyzer import SEOAnalyzer
+from modules.analysis_executor import AnalysisExecutor
+from modules.analysis_cache import AnalysisCache
+from modules.duplicate_detector import DuplicateDetector
+from modules.link_graph import LinkGraph
+from modules.results_table import ResultsTable
 from modules.crawler import WebCrawler
+from modules.http_cache import HTTPCache
+from modules.crawl_scheduler import CrawlScheduler
+from modules.parsed_page import configure_parser
+from modules.url_registry import URLRegistry
 from modules.report_generator import ReportGenerator
 from utils.config_loader import ConfigLoader
 from utils.logger import get_logger
@@ -36,6 +44,7 @@ class MonitoringSystem:
         self.logger = get_logger(__name__)
         self.config_loader = ConfigLoader()
         self.config = self.config_loader.get_all()
+        configure_parser(self.config)
         
         # إعداد مجلدات المراقبة والتقارير
         self.monitoring_dir = os.path.join('data', 'monitoring')
@@ -43,6 +52,11 @@ class MonitoringSystem:
         create_directory(self.monitoring_dir)
         create_directory(self.reports_dir)
         
+        # ذاكرة HTTP على القرص: إعادة الزحف الدوري ترسل طلبات شرطية وتتخطى الصفحات غير المتغيرة
+        self.http_cache = HTTPCache.from_config(self.config)
+        # مجدول التهذيب المشترك بين المهام المجدولة
+        self.crawl_scheduler = CrawlScheduler.from_config(self.config)
+        
         # تهيئة جدولة المهام
         self.scheduler = BackgroundScheduler()
         self.scheduler.start()
@@ -325,6 +339,8 @@ class MonitoringSystem:
             depth = options.get('depth', 3)
             delay = self.config.get('crawling', {}).get('delay_seconds', 1)
             respect_robots = self.config.get('crawling', {}).get('respect_robots_txt', True)
+            url_registry = URLRegistry.from_config(self.config)
+            link_graph = LinkGraph.from_config(self.config, url, url_registry=url_registry)
             
             crawler = WebCrawler(
                 start_url=url,
@@ -332,60 +348,72 @@ class MonitoringSystem:
                 max_depth=depth,
                 delay=delay,
                 respect_robots_txt=respect_robots,
-                verbose=True
+                verbose=True,
+                frontier_priority=self.config.get('crawling', {}).get('frontier_priority'),
+                http_cache=self.http_cache,
+                scheduler=self.crawl_scheduler,
+                seed_from_sitemaps=options.get('seed_from_sitemaps',
+                                               self.config.get('crawling', {}).get('seed_from_sitemaps', False)),
+                url_registry=url_registry,
+                max_body_bytes=self.config.get('crawling', {}).get('max_body_bytes', 10 * 1024 * 1024),
+                link_graph=link_graph
             )
             
-            # بدء الزحف
-            pages = crawler.crawl()
-            
-            if not pages:
-                self.logger.error(f"لم يتم العثور على أي صفحات للتحليل من {url}")
-                return None
-            
-            # تهيئة المحلل
-            seo_analyzer = SEOAnalyzer(config=self.config)
-            
-            # تحليل كل صفحة
+            # الزحف والتحليل معًا: تُحلل كل صفحة فور جلبها ثم يُحرر محتواها
             results = {}
-            page_count = len(pages)
+            pages_count = 0
             
-            for i, (page_url, page_data) in enumerate(pages.items()):
-                self.logger.info(f"تحليل صفحة {i+1} من {page_count}: {page_url}")
-                
-                page_result = {}
-                
-                try:
-                    # تحليل السيو الأساسي
-                    page_result['basic_seo'] = seo_analyzer.analyze_page(page_data)
-                    
-                    # يمكن إضافة المزيد من التحليلات حسب الحاجة
-                    
-                    # حفظ نتائج الصفحة
-                    results[page_url] = page_result
-                    
-                except Exception as e:
-                    self.logger.error(f"خطأ في تحليل الصفحة {page_url}: {str(e)}")
+            def log_progress(done, total, page_url):
+                self.logger.info(f"تحليل صفحة {done}: {page_url}")
+            
+            # الصفحات التي لم يتغير محتواها منذ التشغيل السابق تعاد نتائجها دون تحليل
+            steps = ('basic_seo',)
+            analysis_cache = AnalysisCache.from_config(self.config, steps)
             
-            # حساب الإحصائيات
-            total_issues = 0
-            scores = []
+            try:
+                with AnalysisExecutor(config=self.config, steps=steps, progress_callback=log_progress,
+                                      cache=analysis_cache) as executor:
+                    for page_url, page_result in executor.map(crawler.iter_pages(), release_pages=True):
+                        pages_count += 1
+                        # حفظ نتائج الصفحة (الصفحات التي فشل تحليلها لا تضاف)
+                        if 'error' not in page_result:
+                            results[page_url] = page_result
+            finally:
+                if analysis_cache is not None:
+                    analysis_cache.close()
+            
+            if not pages_count:
+                self.logger.error(f"لم يتم العثور على أي صفحات للتحليل من {url}")
+                return None
             
+            # كشف العناوين والأوصاف والمحتوى المكرر على مستوى الموقع
+            duplicate_detector = DuplicateDetector.from_config(self.config)
             for page_url, page_result in results.items():
-                basic_seo = page_result.get('basic_seo', {})
-                page_issues = basic_seo.get('issues_count', 0)
-                total_issues += page_issues
-                scores.append(basic_seo.get('score', 0))
+                duplicate_detector.add(page_url, page_result)
+            duplicate_detector.annotate(results)
+            
+            # PageRank الداخلي وعمق النقرات والصفحات اليتيمة لكل صفحة
+            if link_graph is not None:
+                link_graph.annotate(results)
             
-            average_score = sum(scores) / len(scores) if scores else 0
+            # حساب الإحصائيات من جدول النتائج العمودي
+            results_table = ResultsTable.from_results(results)
+            total_issues = results_table.total('basic_issues')
+            average_score = results_table.mean('basic_score')
             
             # إعداد النتائج النهائية
             final_result = {
                 'task_id': task_id,
                 'site_url': url,
                 'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'pages_count': len(pages),
+                'pages_count': pages_count,
+                'unchanged_pages': len(crawler.unchanged_urls),
+                'reused_results': analysis_cache.hits if analysis_cache is not None else 0,
                 'total_issues': total_issues,
                 'average_score': average_score,
+                'statistics': results_table.summary(),
+                'duplicates': duplicate_detector.report(),
+                'link_graph': link_graph.report() if link_graph is not None else None,
                 'pages': results
             }
             
@@ -397,7 +425,7 @@ class MonitoringSystem:
             # تحديث سجل التنفيذ
             self.update_task_history(task_id, {
                 'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'pages_count': len(pages),
+                'pages_count': pages_count,
                 'total_issues': total_issues,
                 'average_score': average_score,
                 'result_file': result_file
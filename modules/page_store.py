@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة مخزن الصفحات - حفظ صفحات الزحف مضغوطة على القرص بدل الذاكرة
+
+يكتب المخزن محتوى HTML وبقية الحقول الكبيرة (الترويسات، الروابط، الصور...)
+مضغوطة بـ zlib في ملف SQLite، ويعيد للزاحف مقبضًا خفيفًا (StoredPage) يحتفظ
+بالحقول الصغيرة فقط ويقرأ الباقي من القرص عند أول طلب له من أحد المحللات.
+"""
+
+import os
+import zlib
+import pickle
+import sqlite3
+import logging
+import tempfile
+import threading
+import weakref
+from collections.abc import MutableMapping
+
+logger = logging.getLogger('rseo.page_store')
+
+# الحقول التي تبقى في الذاكرة مع المقبض (الباقي يُقرأ من القرص عند الطلب)
+LIGHT_FIELDS = ('url', 'title', 'depth', 'status_code', 'content_type', 'unchanged', 'timestamp')
+
+
+def _remove_store(conn, path, temporary):
+    """إغلاق قاعدة البيانات وحذف الملف المؤقت (يُستدعى عند الإغلاق أو عند جمع المخزن)"""
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+    if temporary:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class StoredPage(MutableMapping):
+    """
+    مقبض صفحة مخزنة: واجهة قاموس بيانات الصفحة مع تحميل الحقول الكبيرة عند الطلب
+    """
+
+    def __init__(self, store, url, light, heavy_keys):
+        """
+        Args:
+            store (PageStore): المخزن الذي يحتوي الصفحة
+            url (str): عنوان الصفحة
+            light (dict): الحقول المحفوظة في الذاكرة
+            heavy_keys (frozenset): أسماء الحقول المحفوظة على القرص
+        """
+        self._store = store
+        self._url = url
+        self._light = light
+        self._heavy_keys = heavy_keys
+        self._heavy = None  # الحقول المحملة من القرص (حتى استدعاء release)
+        self._extra = {}  # الحقول المضافة بعد التخزين (مثل الشجرة المحللة)
+
+    def _load(self):
+        if self._heavy is None:
+            self._heavy = self._store.load(self._url)
+        return self._heavy
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        if key in self._light:
+            return self._light[key]
+        if key in self._heavy_keys:
+            return self._load()[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        # الحذف يحرر النسخة الموجودة في الذاكرة فقط، وتبقى الصفحة على القرص
+        if key in self._extra:
+            del self._extra[key]
+        elif key in self._light:
+            del self._light[key]
+        elif key in self._heavy_keys:
+            self._heavy_keys = self._heavy_keys - {key}
+            if self._heavy is not None:
+                self._heavy.pop(key, None)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._extra or key in self._light or key in self._heavy_keys
+
+    def __iter__(self):
+        yield from self._light
+        yield from (key for key in self._heavy_keys if key not in self._light)
+        yield from (key for key in self._extra if key not in self._light and key not in self._heavy_keys)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        state = 'loaded' if self._heavy is not None else 'on disk'
+        return f"<StoredPage {self._url} ({state})>"
+
+    def release(self):
+        """تحرير الحقول المحملة والشجرة المحللة من الذاكرة (تُقرأ من القرص مجددًا عند الحاجة)"""
+        self._heavy = None
+        self._extra.clear()
+
+
+class PageStore:
+    """
+    مخزن صفحات مضغوط على القرص (SQLite) لنتائج crawl()
+    """
+
+    def __init__(self, path=None, directory=None, compress_level=6):
+        """
+        تهيئة المخزن
+
+        Args:
+            path (str, optional): مسار قاعدة البيانات (يُنشأ ملف مؤقت يُحذف عند الإغلاق إذا لم يُحدد)
+            directory (str, optional): مجلد الملف المؤقت (مجلد النظام المؤقت افتراضيًا)
+            compress_level (int): مستوى ضغط zlib (1 أسرع، 9 أصغر)
+        """
+        self.compress_level = compress_level
+        self.bytes_raw = 0  # حجم البيانات قبل الضغط
+        self.bytes_stored = 0  # حجم البيانات المكتوبة على القرص
+
+        temporary = path is None
+        if temporary:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix='rseo-pages-', suffix='.db', dir=directory)
+            os.close(fd)
+        else:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+        self.path = path
+
+        # اتصال واحد مشترك بين الخيوط (الزاحف غير المتزامن يخزن من خيط حلقة الأحداث)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode = OFF')
+        self._conn.execute('PRAGMA synchronous = OFF')
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            data BLOB
+        )
+        ''')
+        self._conn.commit()
+
+        # حذف الملف المؤقت حتى إذا لم يُستدعَ close
+        self._finalizer = weakref.finalize(self, _remove_store, self._conn, path, temporary)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        إنشاء المخزن من إعدادات التطبيق (القسم crawling.page_store)
+
+        Args:
+            config (dict): إعدادات التطبيق
+
+        Returns:
+            PageStore or None: المخزن، أو None إذا كان معطلًا (تبقى الصفحات في الذاكرة)
+        """
+        store_config = (config or {}).get('crawling', {}).get('page_store', {})
+        if not store_config.get('enabled', False):
+            return None
+        return cls(
+            directory=store_config.get('directory'),
+            compress_level=store_config.get('compress_level', 6)
+        )
+
+    def put(self, url, page_data):
+        """
+        تخزين صفحة
+
+        الشجرة المحللة (parsed) لا تُخزن، وتُبنى من HTML مجددًا عند الحاجة.
+
+        Args:
+            url (str): عنوان الصفحة
+            page_data (dict): بيانات الصفحة
+
+        Returns:
+            StoredPage: مقبض الصفحة
+        """
+        light = {key: page_data[key] for key in LIGHT_FIELDS if key in page_data}
+        heavy = {key: value for key, value in page_data.items()
+                 if key not in light and key != 'parsed'}
+
+        raw = pickle.dumps(heavy, protocol=pickle.HIGHEST_PROTOCOL)
+        data = zlib.compress(raw, self.compress_level)
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO pages (url, data) VALUES (?, ?)', (url, data))
+            self.bytes_raw += len(raw)
+            self.bytes_stored += len(data)
+
+        return StoredPage(self, url, light, frozenset(heavy))
+
+    def load(self, url):
+        """
+        قراءة الحقول المخزنة لصفحة
+
+        Args:
+            url (str): عنوان الصفحة
+
+        Returns:
+            dict: الحقول المخزنة على القرص
+
+        Raises:
+            KeyError: إذا لم تكن الصفحة في المخزن
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM pages WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            raise KeyError(url)
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM pages WHERE url = ?', (url,)).fetchone() is not None
+
+    def close(self):
+        """إغلاق المخزن وحذف ملفه إذا كان مؤقتًا"""
+        with self._lock:
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
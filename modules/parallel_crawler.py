@@ -11,19 +11,169 @@ import os
 import asyncio
 import aiohttp
 import logging
+import threading
 import time
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
-import robotexclusionrulesparser as robots
+from modules.parsed_page import PageScan, HEADING_TAGS
+from modules.site_info import site_info_cache
+from modules.crawl_scheduler import CrawlScheduler, THROTTLE_STATUSES
+from modules.sitemap import SitemapReader, sitemaps_from_robots
+from modules.url_registry import URLRegistry
+from modules.html_charset import is_html, decode_html
 
 # إعداد المسجل
 logger = logging.getLogger(__name__)
 
+DEFAULT_USER_AGENT = 'RSEO-Analyzer/1.0'
+
+# حجم الدفعة المقروءة من الاستجابة (بايت)
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+def create_connector(limit=100, limit_per_host=10, dns_cache_ttl=300, keepalive_timeout=30):
+    """
+    إنشاء موصل TCP مع تجميع الاتصالات وإبقائها مفتوحة وتخزين نتائج DNS مؤقتًا
+    
+    Args:
+        limit (int): أقصى عدد للاتصالات المفتوحة في المجمع
+        limit_per_host (int): أقصى عدد للاتصالات المفتوحة للمضيف الواحد
+        dns_cache_ttl (int): مدة صلاحية نتائج DNS المخزنة (بالثواني)
+        keepalive_timeout (float): مدة إبقاء الاتصال الخامل مفتوحًا لإعادة استخدامه (بالثواني)
+        
+    Returns:
+        aiohttp.TCPConnector: موصل TCP
+    """
+    return aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=dns_cache_ttl,
+        use_dns_cache=dns_cache_ttl > 0,
+        keepalive_timeout=keepalive_timeout
+    )
+
+
+class CrawlSession:
+    """
+    جلسة aiohttp مشتركة تعيش طوال عمر العملية لإعادة استخدامها بين عمليات زحف متعددة
+    
+    تعمل الجلسة على حلقة أحداث خاصة بها في خيط خلفي، لأن جلسات aiohttp مرتبطة
+    بحلقة الأحداث التي أنشئت فيها، بينما تعمل مهام API في خيوط مختلفة.
+    """
+    
+    def __init__(self, limit=100, limit_per_host=10, dns_cache_ttl=300, keepalive_timeout=30,
+                 timeout=30, user_agent=DEFAULT_USER_AGENT):
+        """
+        تهيئة الجلسة المشتركة
+        
+        Args:
+            limit (int): أقصى عدد للاتصالات المفتوحة في المجمع
+            limit_per_host (int): أقصى عدد للاتصالات المفتوحة للمضيف الواحد
+            dns_cache_ttl (int): مدة صلاحية نتائج DNS المخزنة (بالثواني)
+            keepalive_timeout (float): مدة إبقاء الاتصال الخامل مفتوحًا (بالثواني)
+            timeout (int): مهلة الطلب الافتراضية (بالثواني)
+            user_agent (str): نص User-Agent
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.user_agent = user_agent
+        
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config):
+        """
+        إنشاء جلسة مشتركة من إعدادات التطبيق (القسم crawling.connection_pool)
+        
+        Args:
+            config (dict): إعدادات التطبيق
+            
+        Returns:
+            CrawlSession: الجلسة المشتركة
+        """
+        crawling_config = (config or {}).get('crawling', {})
+        pool_config = crawling_config.get('connection_pool', {})
+        return cls(
+            limit=pool_config.get('limit', 100),
+            limit_per_host=pool_config.get('limit_per_host', 10),
+            dns_cache_ttl=pool_config.get('dns_cache_ttl', 300),
+            keepalive_timeout=pool_config.get('keepalive_timeout', 30),
+            timeout=crawling_config.get('timeout_seconds', 30)
+        )
+    
+    @property
+    def loop(self):
+        """حلقة الأحداث الخلفية للجلسة (تُنشأ عند أول استخدام)"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name='rseo-crawl-session', daemon=True)
+                self._thread.start()
+            return self._loop
+    
+    def run(self, coro):
+        """
+        تنفيذ coroutine على حلقة الجلسة وانتظار نتيجتها من خيط آخر
+        
+        Args:
+            coro (coroutine): الـ coroutine المراد تنفيذها
+            
+        Returns:
+            نتيجة الـ coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    async def get_session(self):
+        """
+        الحصول على جلسة aiohttp المشتركة (يجب استدعاؤها من حلقة الجلسة)
+        
+        Returns:
+            aiohttp.ClientSession: الجلسة المشتركة
+        """
+        if asyncio.get_running_loop() is not self._loop:
+            raise RuntimeError("يجب استخدام CrawlSession.run لتنفيذ الزحف على حلقة الجلسة المشتركة")
+        
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=create_connector(self.limit, self.limit_per_host,
+                                           self.dns_cache_ttl, self.keepalive_timeout),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': self.user_agent}
+            )
+        return self._session
+    
+    def close(self):
+        """إغلاق الجلسة وإيقاف حلقة الأحداث الخلفية"""
+        with self._lock:
+            loop = self._loop
+            self._loop = None
+        
+        if loop is None or loop.is_closed():
+            return
+        
+        if self._session is not None and not self._session.closed:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+        self._session = None
+        
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+
+
 class AsyncWebCrawler:
     """فئة للزحف المتوازي لصفحات الويب باستخدام asyncio وaiohttp"""
     
     def __init__(self, start_url, max_pages=100, max_depth=3, delay=0.5,
-                 respect_robots_txt=True, max_concurrent=10, timeout=30, verbose=False):
+                 respect_robots_txt=True, max_concurrent=10, max_per_host=None, timeout=30, max_retries=2,
+                 dns_cache_ttl=300, keepalive_timeout=30, session=None, http_cache=None, scheduler=None,
+                 seed_from_sitemaps=False, checkpoint=None, page_store=None, url_registry=None,
+                 max_body_bytes=10 * 1024 * 1024, verbose=False, link_graph=None):
         """
         تهيئة زاحف الويب المتوازي
         
@@ -31,11 +181,24 @@ class AsyncWebCrawler:
             start_url (str): عنوان URL البداية للزحف
             max_pages (int): أقصى عدد للصفحات المراد زحفها
             max_depth (int): أقصى عمق للزحف
-            delay (float): التأخير بين الطلبات للنطاق نفسه (بالثواني)
+            delay (float): الفاصل بين بدء الطلبات للنطاق نفسه (بالثواني)
             respect_robots_txt (bool): احترام ملف robots.txt
-            max_concurrent (int): أقصى عدد للطلبات المتزامنة
+            max_concurrent (int): أقصى عدد للطلبات المتزامنة (وعدد عمال الزحف)
+            max_per_host (int): أقصى عدد للطلبات المتزامنة للنطاق الواحد (الافتراضي max_concurrent)
             timeout (int): مهلة الطلب (بالثواني)
+            max_retries (int): عدد مرات إعادة طلب الصفحة بعد الرمز 429/503
+            dns_cache_ttl (int): مدة صلاحية نتائج DNS المخزنة (بالثواني)
+            keepalive_timeout (float): مدة إبقاء الاتصالات الخاملة مفتوحة (بالثواني)
+            session (CrawlSession, optional): جلسة مشتركة لإعادة استخدام الاتصالات بين عمليات الزحف
+            http_cache (HTTPCache, optional): ذاكرة HTTP على القرص للطلبات الشرطية عند إعادة الزحف
+            scheduler (CrawlScheduler, optional): مجدول التهذيب المشترك (يُنشأ من delay وmax_per_host إذا لم يُمرر)
+            seed_from_sitemaps (bool): إضافة روابط خرائط الموقع (robots.txt و/sitemap.xml) إلى قائمة الانتظار
+            checkpoint (CrawlCheckpoint, optional): نقطة حفظ دورية لحالة الزحف (أو عملية محفوظة لاستئنافها)
+            page_store (PageStore, optional): مخزن على القرص لصفحات crawl() (تبقى في الذاكرة إذا لم يُمرر)
+            url_registry (URLRegistry, optional): سجل الروابط ونمط مجموعات الروابط المرئية والمزارة
+            max_body_bytes (int): الحد الأقصى لحجم الصفحة (تُتجاهل الصفحات الأكبر دون إكمال تنزيلها)
             verbose (bool): طباعة معلومات تفصيلية أثناء التنفيذ
+            link_graph (LinkGraph, optional): رسم الروابط الداخلية الذي تُسجل فيه روابط كل صفحة وروابط خرائط الموقع
         """
         self.start_url = start_url
         self.base_url = urlparse(start_url).scheme + "://" + urlparse(start_url).netloc
@@ -43,52 +206,151 @@ class AsyncWebCrawler:
         self.max_depth = max_depth
         self.delay = delay
         self.respect_robots_txt = respect_robots_txt
-        self.max_concurrent = max_concurrent
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_host = max_per_host or self.max_concurrent
         self.timeout = timeout
+        self.max_retries = max_retries
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.crawl_session = session
+        self.http_cache = http_cache
+        self.seed_from_sitemaps = seed_from_sitemaps
+        self.session = None  # جلسة aiohttp المستخدمة طوال عملية الزحف
         self.verbose = verbose
+        self.link_graph = link_graph
+        self._links_unfollowed = False  # روابط في صفحات أقصى عمق لم تُضف لقائمة الانتظار
         
-        self.visited_urls = set()
+        # مجموعات الروابط مضغوطة (بصمات أو مرشح Bloom) بدل نصوص الروابط
+        self.url_registry = url_registry or URLRegistry()
+        self.visited_urls = self.url_registry.new_set()
+        self.queued_urls = self.url_registry.new_set()  # الروابط التي سبق رؤيتها (لإزالة التكرار عند الإضافة)
+        self.pending_urls = {}  # الروابط في قائمة الانتظار وعمقها (لنقطة الحفظ)
+        self.retries = {}  # عدد مرات إعادة طلب كل رابط بعد رفض الخادم المؤقت
         self.to_visit = asyncio.Queue()
         self.pages = {}
-        self.robots_parser = None
+        self.page_store = page_store
+        self.max_body_bytes = max_body_bytes
+        self.results = None  # قائمة انتظار الصفحات الجاهزة في وضع التدفق
+        self.robots_matcher = None
         self.semaphore = asyncio.Semaphore(max_concurrent)
-        self.rate_limiters = {}  # تخزين أدوات تحديد معدل الطلبات لكل نطاق
         
+        # نقطة الحفظ: الروابط التي تمت زيارتها منذ آخر حفظ وقائمة الانتظار المستعادة
+        self.checkpoint = checkpoint
+        self._unsaved_visits = []
+        self._resume_queue = None
+        if checkpoint is not None and checkpoint.resumed:
+            done, self._resume_queue = checkpoint.resume_state()
+            self.visited_urls.update(done)
+            self.queued_urls.update(done)
+        elif checkpoint is not None:
+            checkpoint.start(start_url, {'max_pages': max_pages, 'max_depth': max_depth})
+        # معدل الطلبات وعدد الاتصالات لكل نطاق
+        self.scheduler = scheduler or CrawlScheduler(delay=delay, max_per_host=self.max_per_host)
+        
+    async def _open_session(self):
+        """فتح جلسة aiohttp واحدة لكامل عملية الزحف (أو استخدام الجلسة المشتركة)"""
+        if self.crawl_session is not None:
+            return await self.crawl_session.get_session()
+        
+        return aiohttp.ClientSession(
+            connector=create_connector(self.max_concurrent, self.max_per_host,
+                                       self.dns_cache_ttl, self.keepalive_timeout),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': DEFAULT_USER_AGENT}
+        )
+    
+    async def _close_session(self):
+        """إغلاق جلسة الزحف إذا كانت خاصة بهذا الزاحف"""
+        if self.session is not None and self.crawl_session is None:
+            await self.session.close()
+        self.session = None
+    
     async def initialize(self):
         """تهيئة الزاحف المتوازي وتجهيز ملف robots.txt إذا لزم الأمر"""
+        if self.session is None:
+            self.session = await self._open_session()
+        
+        robots_content = ''
         if self.respect_robots_txt:
             try:
                 robots_url = urljoin(self.base_url, '/robots.txt')
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(robots_url, timeout=self.timeout) as response:
-                        if response.status == 200:
-                            robots_content = await response.text()
-                            self.robots_parser = robots.RobotExclusionRulesParser()
-                            self.robots_parser.parse(robots_content)
-                            if self.verbose:
-                                logger.info(f"تم تحميل ملف robots.txt من {robots_url}")
+                async with self.session.get(robots_url) as response:
+                    robots_content = await response.text() if response.status == 200 else ''
+                    # مشاركة الملف مع المحللات والزواحف الأخرى عبر ذاكرة الموقع
+                    site_info = site_info_cache.store_robots(self.base_url, response.status, robots_content)
+                    if response.status == 200:
+                        self.robots_matcher = site_info.robots_matcher()
+                        self.scheduler.set_crawl_delay(self.base_url, self.robots_matcher.crawl_delay)
+                        if self.verbose:
+                            logger.info(f"تم تحميل ملف robots.txt من {robots_url}")
             except Exception as e:
                 logger.warning(f"فشل تحميل ملف robots.txt: {str(e)}")
         
+        if self._resume_queue is not None and (self._resume_queue or self.visited_urls):
+            # استئناف الزحف من قائمة الانتظار المحفوظة
+            for url, depth in self._resume_queue:
+                if self.queued_urls.add(url):
+                    self._enqueue(url, depth)
+            self._resume_queue = None
+            return
+        
         # إضافة URL البداية إلى قائمة الانتظار مع عمق 0
-        await self.to_visit.put((self.start_url, 0))
+        self.queued_urls.add(self.start_url)
+        self._enqueue(self.start_url, 0)
+        
+        if self.seed_from_sitemaps or self.link_graph is not None:
+            await self._seed_from_sitemaps(robots_content)
     
-    async def _can_fetch(self, url):
-        """التحقق مما إذا كان يمكن زحف عنوان URL وفقًا لملف robots.txt"""
-        if not self.respect_robots_txt or not self.robots_parser:
-            return True
+    async def _seed_from_sitemaps(self, robots_content):
+        """
+        إضافة روابط الصفحات من خرائط الموقع إلى قائمة الانتظار (حتى max_pages رابط)
+        
+        مع رسم الروابط تُقرأ الخرائط كاملة وتُسجل جميع روابطها لكشف الصفحات اليتيمة،
+        ولا تُضاف إلى قائمة الانتظار إلا إذا كان seed_from_sitemaps مفعلًا.
+        """
+        reader = SitemapReader(timeout=self.timeout, scheduler=self.scheduler)
+        base_netloc = urlparse(self.base_url).netloc
+        # صفحات الخريطة تعامل كروابط من الصفحة الرئيسية، فتصل الصفحات العميقة دون تتبع الروابط
+        depth = min(1, self.max_depth)
+        seeded = 0
         
+        urls = reader.iter_urls_async(self.session, sitemaps_from_robots(robots_content, self.base_url))
         try:
-            return self.robots_parser.is_allowed("*", url)
-        except Exception as e:
-            logger.error(f"خطأ أثناء التحقق من robots.txt: {str(e)}")
-            return True  # في حالة الشك، نسمح بالزحف
+            async for url in urls:
+                seeding = self.seed_from_sitemaps and len(self.queued_urls) < self.max_pages
+                if not seeding and self.link_graph is None:
+                    break
+                parsed = urlparse(url)
+                if parsed.netloc != base_netloc:
+                    continue
+                cleaned_url = self._clean_url(parsed)
+                if not await self._can_fetch(cleaned_url):
+                    continue
+                if self.link_graph is not None:
+                    self.link_graph.add_sitemap_url(cleaned_url)
+                if seeding and cleaned_url not in self.queued_urls:
+                    self.queued_urls.add(cleaned_url)
+                    self._enqueue(cleaned_url, depth)
+                    seeded += 1
+        finally:
+            await urls.aclose()
+        
+        if self.verbose:
+            logger.info(f"تمت إضافة {seeded} رابط من {reader.sitemaps_read} خريطة موقع")
+    
+    @staticmethod
+    def _clean_url(parsed):
+        """تنظيف URL محلل (إزالة المرساة)"""
+        cleaned_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+        if parsed.query:
+            cleaned_url += f"?{parsed.query}"
+        return cleaned_url
     
-    async def get_domain_semaphore(self, domain):
-        """الحصول على أداة تحديد المعدل الخاصة بالنطاق"""
-        if domain not in self.rate_limiters:
-            self.rate_limiters[domain] = asyncio.Semaphore(1)
-        return self.rate_limiters[domain]
+    async def _can_fetch(self, url):
+        """التحقق مما إذا كان يمكن زحف عنوان URL وفقًا لملف robots.txt"""
+        if not self.respect_robots_txt or not self.robots_matcher:
+            return True
+        return self.robots_matcher.is_allowed(url)
     
     async def fetch_url(self, url, depth):
         """
@@ -101,147 +363,288 @@ class AsyncWebCrawler:
         Returns:
             dict or None: بيانات الصفحة أو None في حالة الفشل
         """
-        domain = urlparse(url).netloc
-        domain_semaphore = await self.get_domain_semaphore(domain)
+        if not await self._can_fetch(url):
+            if self.verbose:
+                logger.info(f"تم حظر الوصول بواسطة robots.txt: {url}")
+            return None
         
-        # استخدام أداة تحديد المعدل للنطاق
-        async with domain_semaphore:
+        # انتظار دور الطلب وفق معدل النطاق وعدد اتصالاته
+        await self.scheduler.acquire_async(url)
+        try:
             # استخدام أداة تحديد العدد الإجمالي للطلبات المتزامنة
             async with self.semaphore:
                 if self.verbose:
                     logger.info(f"جاري جلب: {url} (العمق: {depth})")
                 
-                if not await self._can_fetch(url):
-                    if self.verbose:
-                        logger.info(f"تم حظر الوصول بواسطة robots.txt: {url}")
-                    return None
-                
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(url, timeout=self.timeout, 
-                                              headers={'User-Agent': 'RSEO-Analyzer/1.0'}) as response:
-                            if response.status != 200:
-                                if self.verbose:
-                                    logger.warning(f"رمز الحالة {response.status} لـ {url}")
-                                return None
-                            
-                            content_type = response.headers.get('Content-Type', '')
-                            if 'text/html' not in content_type.lower():
-                                if self.verbose:
-                                    logger.info(f"تخطي نوع المحتوى غير المدعوم: {content_type} لـ {url}")
-                                return None
-                            
-                            html_content = await response.text()
-                            soup = BeautifulSoup(html_content, 'html.parser')
+                    # طلب شرطي إذا كانت الصفحة مخزنة من زحف سابق، ثم طلب عادي إذا لم توجد في الذاكرة
+                    conditional = self.http_cache.conditional_headers(url) if self.http_cache else {}
+                    for headers in (conditional, {}):
+                        started = time.monotonic()
+                        async with self.session.get(url, headers=headers) as response:
+                            response_headers = dict(response.headers)
+                            # تعديل سرعة الزحف حسب زمن الاستجابة ورموز الرفض
+                            self.scheduler.record_response(url, response.status, time.monotonic() - started,
+                                                           response.headers.get('Retry-After'))
                             
-                            # استخراج البيانات الأساسية
-                            page_data = {
-                                'url': url,
-                                'html': html_content,
-                                'title': soup.title.string if soup.title else '',
-                                'status_code': response.status,
-                                'content_type': content_type,
-                                'depth': depth,
-                                'links': set(),
-                                'images': [],
-                                'scripts': [],
-                                'styles': [],
-                                'metadata': {},
-                                'headers': dict(response.headers)
-                            }
-                            
-                            # معالجة العناوين
-                            headings = {'h1': [], 'h2': [], 'h3': [], 'h4': [], 'h5': [], 'h6': []}
-                            for h_level, h_list in headings.items():
-                                for heading in soup.find_all(h_level):
-                                    h_list.append(heading.get_text(strip=True))
-                            page_data['headings'] = headings
-                            
-                            # معالجة البيانات الوصفية
-                            for meta in soup.find_all('meta'):
-                                name = meta.get('name', meta.get('property', ''))
-                                if name:
-                                    page_data['metadata'][name] = meta.get('content', '')
-                            
-                            # معالجة الروابط
-                            if depth < self.max_depth:
-                                for link in soup.find_all('a', href=True):
-                                    href = link.get('href', '').strip()
-                                    if href and not href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
-                                        absolute_url = urljoin(url, href)
-                                        if urlparse(absolute_url).netloc == urlparse(self.base_url).netloc:
-                                            # تنظيف URL (إزالة المرساة، إلخ)
-                                            parsed = urlparse(absolute_url)
-                                            cleaned_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-                                            if parsed.query:
-                                                cleaned_url += f"?{parsed.query}"
-                                            
-                                            page_data['links'].add(cleaned_url)
-                                            if (cleaned_url not in self.visited_urls and 
-                                                len(self.visited_urls) < self.max_pages):
-                                                await self.to_visit.put((cleaned_url, depth + 1))
-                            
-                            # معالجة الصور
-                            for img in soup.find_all('img', src=True):
-                                src = img.get('src', '').strip()
-                                if src:
-                                    img_data = {
-                                        'src': urljoin(url, src),
-                                        'alt': img.get('alt', ''),
-                                        'title': img.get('title', '')
-                                    }
-                                    page_data['images'].append(img_data)
-                            
-                            # معالجة النصوص البرمجية
-                            for script in soup.find_all('script', src=True):
-                                src = script.get('src', '').strip()
-                                if src:
-                                    page_data['scripts'].append(urljoin(url, src))
-                            
-                            # معالجة أوراق الأنماط
-                            for style in soup.find_all('link', rel='stylesheet'):
-                                href = style.get('href', '').strip()
-                                if href:
-                                    page_data['styles'].append(urljoin(url, href))
-                            
-                            return page_data
+                            # الصفحة لم تتغير منذ الزحف السابق: قراءتها من القرص
+                            cached = None
+                            if response.status == 304 and self.http_cache:
+                                cached = self.http_cache.revalidated(url)
+                                if cached is None and headers:
+                                    # الصفحة غير موجودة في الذاكرة: إعادة الطلب بدون ترويسات شرطية
+                                    continue
+                            if cached is not None:
+                                html_content = cached['html']
+                                status_code = response.status
+                                content_type = cached['content_type']
+                                unchanged = True
+                            else:
+                                if response.status in THROTTLE_STATUSES:
+                                    self._retry_later(url, depth)
+                                    return None
+                                
+                                if response.status != 200:
+                                    if self.verbose:
+                                        logger.warning(f"رمز الحالة {response.status} لـ {url}")
+                                    return None
+                                
+                                content_type = response.headers.get('Content-Type', '')
+                                if not is_html(content_type):
+                                    if self.verbose:
+                                        logger.info(f"تخطي نوع المحتوى غير المدعوم: {content_type} لـ {url}")
+                                    return None
+                                
+                                body = await self._read_body(url, response)
+                                if body is None:
+                                    return None
+                                # تحديد الترميز من الترويسة وأول البايتات ثم فك الترميز مرة واحدة
+                                html_content = decode_html(body, content_type)
+                                status_code = response.status
+                                unchanged = False
+                                
+                                if self.http_cache:
+                                    self.http_cache.store(url, response.headers, html_content, content_type)
+                        break
                 except Exception as e:
                     logger.error(f"خطأ في جلب {url}: {str(e)}")
                     return None
-                
-                # تأخير بعد الطلب (احترام تحديد المعدل)
-                await asyncio.sleep(self.delay)
+        finally:
+            self.scheduler.release(url)
+        
+        # تحليل HTML خارج أدوات تحديد المعدل حتى لا يحجز الاتصال أثناء المعالجة
+        page_data = self._build_page_data(url, depth, html_content, status_code, content_type, response_headers)
+        page_data['unchanged'] = unchanged
+        return page_data
     
-    async def crawl_async(self):
-        """تنفيذ الزحف المتوازي للمواقع"""
-        await self.initialize()
+    async def _read_body(self, url, response):
+        """
+        تنزيل محتوى الاستجابة على دفعات مع تطبيق الحد الأقصى للحجم
         
-        start_time = time.time()
+        Returns:
+            bytearray or None: المحتوى، أو None إذا تجاوز الحد الأقصى
+        """
+        if response.content_length is not None and response.content_length > self.max_body_bytes:
+            logger.warning(f"تم تجاهل {url}: حجم الصفحة {response.content_length} بايت يتجاوز الحد الأقصى")
+            return None
         
-        # معالجة قائمة انتظار URL حتى اكتمال العدد المطلوب أو نفاد قائمة الانتظار
-        while len(self.visited_urls) < self.max_pages:
-            try:
-                if self.to_visit.empty():
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(BODY_CHUNK_SIZE):
+            body += chunk
+            if len(body) > self.max_body_bytes:
+                logger.warning(f"تم إيقاف تنزيل {url}: حجم الصفحة يتجاوز {self.max_body_bytes} بايت")
+                return None
+        return body
+    
+    def _enqueue(self, url, depth):
+        """إضافة رابط إلى قائمة الانتظار مع تسجيله في الروابط المعلقة"""
+        self.pending_urls[url] = depth
+        self.to_visit.put_nowait((url, depth))
+    
+    def _retry_later(self, url, depth):
+        """إعادة رابط رفضه الخادم مؤقتًا إلى قائمة الانتظار (ينتظر المجدول مهلة Retry-After)"""
+        attempts = self.retries.get(url, 0)
+        if attempts >= self.max_retries:
+            logger.warning(f"تخطي {url} بعد {attempts} محاولات رفضها الخادم")
+            return
+        
+        self.retries[url] = attempts + 1
+        self.visited_urls.discard(url)
+        self._enqueue(url, depth)
+    
+    def _build_page_data(self, url, depth, html_content, status_code, content_type, response_headers):
+        """
+        استخراج بيانات الصفحة من HTML وإضافة الروابط الجديدة إلى قائمة الانتظار
+        
+        Args:
+            url (str): عنوان URL للصفحة
+            depth (int): عمق الصفحة
+            html_content (str): محتوى HTML
+            status_code (int): رمز حالة الاستجابة
+            content_type (str): نوع المحتوى
+            response_headers (dict): ترويسات الاستجابة
+            
+        Returns:
+            dict: بيانات الصفحة
+        """
+        # استخراج البيانات الأساسية
+        page_data = {
+            'url': url,
+            'html': html_content,
+            'status_code': status_code,
+            'content_type': content_type,
+            'depth': depth,
+            'links': set(),
+            'images': [],
+            'scripts': [],
+            'styles': [],
+            'headers': response_headers
+        }
+        
+        # مسح سريع بشجرة lxml، ويبقى تحليل الصفحة الكامل لمرحلة التحليل
+        page = PageScan(url, html_content)
+        page_data['title'] = page.title
+        page_data['hrefs'] = page.links
+        
+        # معالجة العناوين
+        page_data['headings'] = {level: page.heading_texts(level) for level in HEADING_TAGS}
+        
+        # معالجة البيانات الوصفية
+        page_data['metadata'] = dict(page.meta)
+        
+        # معالجة الروابط (روابط الصفحات في أقصى عمق تُجمع لرسم الروابط فقط)
+        if depth < self.max_depth or self.link_graph is not None:
+            base_netloc = urlparse(self.base_url).netloc
+            new_urls = []
+            for absolute_url in page.links:
+                parsed = urlparse(absolute_url)
+                if parsed.netloc == base_netloc:
+                    # تنظيف URL (إزالة المرساة، إلخ)
+                    cleaned_url = self._clean_url(parsed)
+                    
+                    page_data['links'].add(cleaned_url)
+                    # تسجيل الرابط حتى لو حظره robots.txt، فلا يُفحص مرة أخرى
+                    if depth < self.max_depth and self.queued_urls.add(cleaned_url):
+                        new_urls.append(cleaned_url)
+            
+            if self.link_graph is not None:
+                links = page_data['links']
+                if self.respect_robots_txt and self.robots_matcher:
+                    links = self.robots_matcher.filter(links)
+                self.link_graph.add_page(url, links)
+                if depth >= self.max_depth and not self._links_unfollowed:
+                    self._links_unfollowed = any(link not in self.queued_urls for link in links)
+            
+            if self.respect_robots_txt and self.robots_matcher:
+                new_urls = self.robots_matcher.filter(new_urls)
+            for new_url in new_urls:
+                if len(self.visited_urls) >= self.max_pages:
                     break
-                
-                url, depth = await self.to_visit.get()
-                
-                # تخطي URL التي تمت زيارتها بالفعل
-                if url in self.visited_urls:
+                self._enqueue(new_url, depth + 1)
+        
+        # معالجة الصور
+        for img in page.tags('img'):
+            src = img.get('src', '').strip()
+            if src:
+                img_data = {
+                    'src': urljoin(url, src),
+                    'alt': img.get('alt', ''),
+                    'title': img.get('title', '')
+                }
+                page_data['images'].append(img_data)
+        
+        # معالجة النصوص البرمجية
+        for script in page.tags('script'):
+            src = script.get('src', '').strip()
+            if src:
+                page_data['scripts'].append(urljoin(url, src))
+        
+        # معالجة أوراق الأنماط
+        for style in page.tags('link'):
+            if 'stylesheet' not in style.get('rel', '').split():
+                continue
+            href = style.get('href', '').strip()
+            if href:
+                page_data['styles'].append(urljoin(url, href))
+        
+        return page_data
+    
+    async def _worker(self, worker_id):
+        """
+        عامل زحف يسحب الروابط من قائمة الانتظار ويعالجها حتى إلغائه
+        
+        Args:
+            worker_id (int): رقم العامل (للتسجيل فقط)
+        """
+        while True:
+            url, depth = await self.to_visit.get()
+            self.pending_urls.pop(url, None)
+            try:
+                # حجز الرابط قبل أي انتظار، فلا يتسابق عاملان على الرابط نفسه
+                # ولا يتجاوز عدد الصفحات المحجوزة max_pages
+                if url in self.visited_urls or depth > self.max_depth:
+                    continue
+                if len(self.visited_urls) >= self.max_pages:
                     continue
                 
                 self.visited_urls.add(url)
+                if self.checkpoint is not None:
+                    self._unsaved_visits.append((url, depth))
                 
                 page_data = await self.fetch_url(url, depth)
                 if page_data:
-                    self.pages[url] = page_data
-                
-                self.to_visit.task_done()
+                    if self.results is not None:
+                        # وضع التدفق: تسليم الصفحة للمستهلك (ينتظر العامل إذا امتلأت القائمة)
+                        await self.results.put((url, page_data))
+                    elif self.page_store is not None:
+                        # الاحتفاظ بمقبض خفيف فقط، ويُقرأ المحتوى من القرص عند تحليله
+                        self.pages[url] = self.page_store.put(url, page_data)
+                    else:
+                        self.pages[url] = page_data
                 
-            except asyncio.CancelledError:
-                break
+                if self.checkpoint is not None and self.checkpoint.due():
+                    self.save_checkpoint()
             except Exception as e:
-                logger.error(f"خطأ أثناء الزحف: {str(e)}")
+                logger.error(f"خطأ أثناء الزحف (العامل {worker_id}): {str(e)}")
+            finally:
+                self.to_visit.task_done()
+    
+    def save_checkpoint(self):
+        """حفظ قائمة الانتظار والروابط التي تمت زيارتها والنتائج المعلقة (من حلقة الزحف)"""
+        if self.checkpoint is None:
+            return
+        
+        self.checkpoint.save(list(self.pending_urls.items()), self._unsaved_visits)
+        self._unsaved_visits = []
+    
+    def _finish_link_graph(self):
+        """تعيين اكتمال رسم الروابط بعد انتهاء الزحف (شمل جميع الصفحات التي يصل إليها رابط)"""
+        if self.link_graph is not None:
+            self.link_graph.complete = (self.to_visit.empty() and not self._links_unfollowed
+                                        and len(self.visited_urls) < self.max_pages)
+    
+    async def crawl_async(self):
+        """تنفيذ الزحف المتوازي للمواقع"""
+        start_time = time.time()
+        
+        try:
+            await self.initialize()
+            
+            # تشغيل مجموعة من العمال تستهلك قائمة الانتظار بالتوازي
+            workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_concurrent)]
+            
+            try:
+                # تنتهي الحلقة عندما تفرغ قائمة الانتظار ولا يعالج أي عامل رابطًا
+                # (كل عامل يضيف الروابط الجديدة قبل استدعاء task_done)
+                await self.to_visit.join()
+                self._finish_link_graph()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            self.save_checkpoint()
+            await self._close_session()
         
         end_time = time.time()
         duration = end_time - start_time
@@ -252,13 +655,101 @@ class AsyncWebCrawler:
         
         return self.pages
     
+    async def iter_pages_async(self):
+        """
+        زحف متوازٍ مع إعادة كل صفحة فور جلبها (وضع التدفق)
+        
+        قائمة الصفحات الجاهزة محدودة الحجم، فإذا تأخر المستهلك يتوقف العمال
+        مؤقتًا ويبقى استهلاك الذاكرة ثابتًا. لا يحتفظ الزاحف بالصفحات في self.pages.
+        
+        Yields:
+            tuple: (URL, بيانات الصفحة)
+        """
+        start_time = time.time()
+        pages_count = 0
+        self.results = asyncio.Queue(maxsize=self.max_concurrent * 2)
+        
+        async def signal_done():
+            # يضيف العامل الصفحة إلى قائمة النتائج قبل task_done، لذلك تصل العلامة بعد آخر صفحة
+            await self.to_visit.join()
+            await self.results.put(None)
+        
+        try:
+            await self.initialize()
+            
+            workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_concurrent)]
+            watcher = asyncio.create_task(signal_done())
+            
+            try:
+                while True:
+                    item = await self.results.get()
+                    if item is None:
+                        self._finish_link_graph()
+                        break
+                    pages_count += 1
+                    yield item
+            finally:
+                watcher.cancel()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(watcher, *workers, return_exceptions=True)
+        finally:
+            self.results = None
+            self.save_checkpoint()
+            await self._close_session()
+        
+        if self.verbose:
+            logger.info(f"اكتمل الزحف. تمت زيارة {len(self.visited_urls)} URL، وتحليل {pages_count} صفحة.")
+            logger.info(f"استغرق الزحف {time.time() - start_time:.2f} ثانية.")
+    
+    def iter_pages(self):
+        """
+        واجهة متزامنة لوضع التدفق (مولد عادي يمكن استهلاكه من أي خيط)
+        
+        Yields:
+            tuple: (URL, بيانات الصفحة)
+        """
+        pages = self.iter_pages_async()
+        
+        if self.crawl_session is not None:
+            # التنفيذ على حلقة الجلسة المشتركة لإعادة استخدام اتصالاتها المفتوحة
+            loop = self.crawl_session.loop
+            thread = None
+        else:
+            # حلقة خاصة في خيط خلفي حتى يستمر العمال في الزحف أثناء معالجة المستهلك للصفحات
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='rseo-crawler', daemon=True)
+            thread.start()
+        
+        def run(coro):
+            return asyncio.run_coroutine_threadsafe(coro, loop).result()
+        
+        try:
+            while True:
+                try:
+                    item = run(pages.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield item
+        finally:
+            # إيقاف العمال وإغلاق الجلسة إذا توقف المستهلك قبل نهاية الزحف
+            run(pages.aclose())
+            if thread is not None:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+    
     def crawl(self):
         """
         واجهة متزامنة لبدء الزحف المتوازي
         
         Returns:
-            dict: نتائج الزحف (URL -> بيانات الصفحة)
+            dict: نتائج الزحف (URL -> بيانات الصفحة، أو مقبض StoredPage عند استخدام مخزن الصفحات)
         """
+        if self.crawl_session is not None:
+            # التنفيذ على حلقة الجلسة المشتركة لإعادة استخدام اتصالاتها المفتوحة
+            return self.crawl_session.run(self.crawl_async())
+        
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
@@ -0,0 +1,464 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة الصفحة المحللة - نموذج مستند مشترك يُبنى مرة واحدة لكل صفحة
+
+تحلل هذه الوحدة HTML الصفحة مرة واحدة فقط وتحتفظ بشجرة المستند مع العناصر
+المستخرجة (النص، الروابط، الصور، الترويسات، الوسوم الوصفية، كتل JSON-LD)
+حتى تستخدمها جميع المحللات دون إعادة تحليل HTML نفسه.
+
+يحتاج الزاحف في العملية الرئيسية إلى العنوان والروابط فقط، فيقرؤها بمسح سريع
+(PageScan) بشجرة lxml دون بناء شجرة BeautifulSoup، ويبقى التحليل الكامل
+للعمليات العاملة التي تحلل الصفحة.
+"""
+
+import json
+import logging
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from bs4.element import Tag, NavigableString, CData
+from lxml import etree
+from lxml import html as lxml_html
+
+logger = logging.getLogger('rseo.parsed_page')
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# محركات التحليل المدعومة (اسم الإعداد parsing.backend -> محرك BeautifulSoup)
+PARSER_BACKENDS = {
+    'lxml': 'lxml',
+    'html5': 'html5lib',
+    'html.parser': 'html.parser',
+}
+DEFAULT_PARSER_BACKEND = 'html.parser'
+
+# محركات مرفوضة في الإعدادات مع السبب (المحللات تعتمد على واجهة عناصر BeautifulSoup)
+UNSUPPORTED_BACKENDS = {
+    'selectolax': 'لا يبني شجرة BeautifulSoup، والمحللات تعتمد على واجهة عناصرها (find_all وget وget_text)',
+}
+
+# المحرك المستخدم حاليًا لجميع الصفحات
+_parser_features = PARSER_BACKENDS[DEFAULT_PARSER_BACKEND]
+
+
+def set_parser_backend(backend):
+    """
+    اختيار محرك تحليل HTML لجميع الصفحات
+
+    يُستخدم html.parser إذا كان المحرك غير معروف أو مكتبته غير مثبتة.
+
+    Args:
+        backend (str): اسم المحرك (lxml أو html5 أو html.parser)
+
+    Returns:
+        str: اسم محرك BeautifulSoup المستخدم فعليًا
+
+    Raises:
+        ValueError: إذا كان المحرك من UNSUPPORTED_BACKENDS
+    """
+    global _parser_features
+
+    if backend in UNSUPPORTED_BACKENDS:
+        raise ValueError(f"محرك التحليل {backend} غير مدعوم في parsing.backend: {UNSUPPORTED_BACKENDS[backend]}. "
+                         f"المحركات المدعومة: {', '.join(PARSER_BACKENDS)}")
+
+    features = PARSER_BACKENDS.get(backend)
+    if features is None:
+        logger.warning(f"محرك التحليل غير مدعوم: {backend}، سيتم استخدام html.parser")
+        features = PARSER_BACKENDS[DEFAULT_PARSER_BACKEND]
+    elif builder_registry.lookup(features) is None:
+        logger.warning(f"مكتبة محرك التحليل {features} غير مثبتة، سيتم استخدام html.parser")
+        features = PARSER_BACKENDS[DEFAULT_PARSER_BACKEND]
+
+    _parser_features = features
+    return features
+
+
+def configure_parser(config):
+    """
+    اختيار محرك التحليل من إعدادات التطبيق (parsing.backend)
+
+    Args:
+        config (dict): إعدادات التطبيق
+
+    Returns:
+        str: اسم محرك BeautifulSoup المستخدم فعليًا
+    """
+    backend = (config or {}).get('parsing', {}).get('backend', DEFAULT_PARSER_BACKEND)
+    return set_parser_backend(backend)
+
+
+def make_soup(html):
+    """
+    تحليل HTML بمحرك التحليل المحدد في الإعدادات
+
+    Args:
+        html (str or bytes): محتوى HTML
+
+    Returns:
+        BeautifulSoup: شجرة المستند
+    """
+    return BeautifulSoup(html, _parser_features)
+
+# أنواع النصوص التي يعيدها BeautifulSoup.get_text افتراضيًا
+# (تستبعد التعليقات ومحتوى script وstyle)
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+
+def extract_text(element, exclude=(), separator=' '):
+    """
+    استخراج النص من عنصر مع تجاهل عناصر محددة دون تعديل الشجرة
+
+    بديل لاستدعاء decompose() على العناصر ثم get_text()، لأن الشجرة مشتركة
+    بين جميع المحللات ولا يجوز تعديلها.
+
+    Args:
+        element (Tag): العنصر المراد استخراج نصه
+        exclude (iterable): أسماء الوسوم المستبعدة مع محتواها
+        separator (str): الفاصل بين أجزاء النص
+
+    Returns:
+        str: النص المستخرج
+    """
+    exclude = frozenset(exclude)
+    parts = []
+    stack = [element]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Tag):
+            if node is not element and node.name in exclude:
+                continue
+            stack.extend(reversed(node.contents))
+        elif type(node) in TEXT_STRING_TYPES:
+            parts.append(str(node))
+
+    return separator.join(parts)
+
+
+def is_inside(element, tag_names, stop=None):
+    """
+    التحقق مما إذا كان العنصر داخل أحد الوسوم المحددة
+
+    Args:
+        element (Tag): العنصر المراد فحصه
+        tag_names (iterable): أسماء الوسوم
+        stop (Tag, optional): التوقف عند هذا السلف
+
+    Returns:
+        bool: True إذا كان العنصر (أو أحد أسلافه) من الوسوم المحددة
+    """
+    node = element
+    while node is not None and node is not stop:
+        if node.name in tag_names:
+            return True
+        node = node.parent
+    return False
+
+
+def absolute_links(url, hrefs):
+    """
+    تحويل قيم href إلى روابط مطلقة مع تجاهل الفارغة وmailto وtel وjavascript والمراسي
+
+    Args:
+        url (str): عنوان الصفحة (أساس الروابط النسبية)
+        hrefs (iterable): قيم href بترتيب ظهورها
+
+    Returns:
+        list: الروابط المطلقة
+    """
+    links = []
+    for href in hrefs:
+        href = href.strip()
+        if not href or href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            continue
+        if not href.startswith(('http://', 'https://')):
+            href = urljoin(url, href)
+        links.append(href)
+    return links
+
+
+def page_links(page_data):
+    """
+    الروابط المطلقة في صفحة دون تحليلها من جديد
+
+    تُقرأ من الشجرة المحللة إن وجدت، وإلا من الروابط التي مسحها الزاحف (hrefs)،
+    ولا تُحلل الصفحة إلا إذا لم يتوفر أي منهما.
+
+    Args:
+        page_data (dict or ParsedPage): بيانات الصفحة
+
+    Returns:
+        list: الروابط المطلقة
+    """
+    parsed = page_data.get('parsed')
+    if parsed is None:
+        hrefs = page_data.get('hrefs')
+        if hrefs is not None:
+            return hrefs
+        parsed = ParsedPage.from_page_data(page_data)
+    return parsed.links
+
+
+def _lxml_document(html):
+    """شجرة lxml للمستند (None لمستند فارغ أو غير قابل للتحليل)"""
+    if not html or not html.strip():
+        return None
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # نص يبدأ بتعريف ترميز XML لا يقبله lxml إلا كبايتات
+        return lxml_html.document_fromstring(html.encode('utf-8', 'surrogatepass'),
+                                             parser=lxml_html.HTMLParser(encoding='utf-8'))
+    except etree.ParserError:
+        return None
+
+
+def _element_text(element):
+    """نص العنصر بنفس نتيجة get_text(strip=True) في BeautifulSoup (بدون التعليقات وscript وstyle)"""
+    parts = [element.text or '']
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in ('script', 'style', 'template'):
+            parts.append(_element_text(child))
+        parts.append(child.tail or '')
+    return ''.join(part.strip() for part in parts)
+
+
+class PageScan:
+    """
+    مسح سريع لصفحة بشجرة lxml دون بناء شجرة BeautifulSoup
+
+    يكفي الزاحف لاستخراج العنوان والروابط ووصف الصفحة، بينما تحلل المحللات
+    الصفحة كاملة بـ ParsedPage في مكان واحد فقط (العملية العاملة).
+    """
+
+    def __init__(self, url, html):
+        """
+        Args:
+            url (str): عنوان URL للصفحة
+            html (str): محتوى HTML
+        """
+        self.url = url or ''
+        self.document = _lxml_document(html)
+
+        title = self.tags('title')
+        self.title = title[0].text_content().strip() if title else ''
+        self.links = absolute_links(self.url, (a.get('href') for a in self.tags('a') if a.get('href') is not None))
+
+    def tags(self, name):
+        """
+        العناصر بوسم معين بترتيب ظهورها في المستند
+
+        Args:
+            name (str): اسم الوسم
+
+        Returns:
+            list: قائمة العناصر
+        """
+        return list(self.document.iter(name)) if self.document is not None else []
+
+    def heading_texts(self, level):
+        """نصوص الترويسات لمستوى محدد (مثل ParsedPage.heading_texts)"""
+        return [_element_text(heading) for heading in self.tags(level)]
+
+    @property
+    def meta(self):
+        """الوسوم الوصفية (name أو property -> content)، أول ظهور هو المعتمد"""
+        meta = {}
+        for tag in self.tags('meta'):
+            name = tag.get('name', tag.get('property', ''))
+            if name and name not in meta:
+                meta[name] = tag.get('content', '')
+        return meta
+
+
+class ParsedPage:
+    """
+    صفحة محللة مرة واحدة تتشاركها جميع المحللات
+
+    تتصرف الفئة أيضًا كقاموس بيانات الصفحة (عبر get و[]) حتى يمكن تمريرها
+    مباشرة إلى المحللات التي تتوقع page_data.
+    """
+
+    def __init__(self, url, html, page_data=None):
+        """
+        تحليل الصفحة وفهرسة عناصرها
+
+        Args:
+            url (str): عنوان URL للصفحة
+            html (str): محتوى HTML
+            page_data (dict, optional): بيانات الصفحة الأصلية من الزاحف
+        """
+        self.url = url or ''
+        self.html = html or ''
+        self.page_data = page_data if page_data is not None else {}
+
+        self.soup = make_soup(self.html)
+
+        # جميع العناصر بترتيب ظهورها، وفهرستها حسب اسم الوسم في مرور واحد على الشجرة
+        self.document = self.soup.find_all(True)
+        self.elements = {}
+        for tag in self.document:
+            self.elements.setdefault(tag.name, []).append(tag)
+
+        self.title = self.soup.title.text.strip() if self.soup.title else ''
+
+        self.headings = {level: self.tags(level) for level in HEADING_TAGS}
+        self.images = self.tags('img')
+        self.anchors = [a for a in self.tags('a') if a.has_attr('href')]
+
+        # الوسوم الوصفية (name أو property -> content)، أول ظهور هو المعتمد
+        self.meta = {}
+        for meta in self.tags('meta'):
+            name = meta.get('name', meta.get('property', ''))
+            if name and name not in self.meta:
+                self.meta[name] = meta.get('content', '')
+
+        # كتل JSON-LD مع نتيجة تحليلها
+        self.json_ld = []
+        for script in self.tags('script'):
+            if script.get('type') != 'application/ld+json':
+                continue
+            block = {'raw': script.string, 'data': None, 'valid': False}
+            try:
+                block['data'] = json.loads(script.string)
+                block['valid'] = True
+            except (json.JSONDecodeError, TypeError):
+                pass
+            self.json_ld.append(block)
+
+        self._links = None
+        self._text = None
+        self._text_cache = {}
+
+    @classmethod
+    def from_page_data(cls, page_data):
+        """
+        الحصول على الصفحة المحللة من بيانات الصفحة، مع تحليلها مرة واحدة فقط
+
+        Args:
+            page_data (dict or ParsedPage): بيانات الصفحة
+
+        Returns:
+            ParsedPage: الصفحة المحللة
+        """
+        if isinstance(page_data, cls):
+            return page_data
+
+        parsed = page_data.get('parsed')
+        if parsed is None:
+            parsed = cls(page_data.get('url', ''), page_data.get('html', ''), page_data)
+            page_data['parsed'] = parsed
+        return parsed
+
+    def tags(self, name):
+        """
+        الحصول على جميع العناصر بوسم معين بترتيب ظهورها في المستند
+
+        Args:
+            name (str): اسم الوسم
+
+        Returns:
+            list: قائمة العناصر
+        """
+        return self.elements.get(name, [])
+
+    def first(self, *names, exclude=()):
+        """
+        الحصول على أول عنصر من الوسوم المحددة (حسب ترتيب الأسماء) خارج الوسوم المستبعدة
+
+        Args:
+            *names (str): أسماء الوسوم بالترتيب المفضل
+            exclude (iterable): وسوم يتم تجاهل ما بداخلها
+
+        Returns:
+            Tag or None: العنصر الأول
+        """
+        for name in names:
+            for tag in self.tags(name):
+                if not exclude or not is_inside(tag, exclude):
+                    return tag
+        return None
+
+    @property
+    def links(self):
+        """الروابط المطلقة في الصفحة (بدون الروابط الفارغة وmailto وtel وjavascript والمراسي)"""
+        if self._links is None:
+            self._links = absolute_links(self.url, (a_tag.get('href', '') for a_tag in self.anchors))
+        return self._links
+
+    @property
+    def text(self):
+        """النص المرئي الكامل للصفحة"""
+        if self._text is None:
+            root = self.soup.body or self.soup
+            self._text = ' '.join(extract_text(root, exclude=('script', 'style')).split())
+        return self._text
+
+    def main_text(self, exclude=(), separator=' '):
+        """
+        استخراج نص عنصر مع استبعاد وسوم معينة (مع التخزين المؤقت حسب المعاملات)
+
+        Args:
+            exclude (iterable): أسماء الوسوم المستبعدة
+            separator (str): الفاصل بين أجزاء النص
+
+        Returns:
+            str: النص المستخرج من جسم الصفحة
+        """
+        key = (frozenset(exclude), separator)
+        if key not in self._text_cache:
+            root = self.soup.body or self.soup
+            self._text_cache[key] = extract_text(root, exclude=exclude, separator=separator)
+        return self._text_cache[key]
+
+    def heading_texts(self, level):
+        """
+        نصوص الترويسات لمستوى محدد
+
+        Args:
+            level (str): مستوى الترويسة (h1 - h6)
+
+        Returns:
+            list: نصوص الترويسات
+        """
+        return [heading.get_text(strip=True) for heading in self.headings.get(level, [])]
+
+    def get(self, key, default=None):
+        """
+        واجهة متوافقة مع قاموس بيانات الصفحة
+
+        Args:
+            key (str): المفتاح
+            default: القيمة الافتراضية
+
+        Returns:
+            القيمة المطلوبة
+        """
+        if key == 'url':
+            return self.url
+        if key == 'html':
+            return self.html
+        if key == 'parsed':
+            return self
+        if key == 'title':
+            return self.title
+        if key == 'text':
+            return self.text
+        if key in ('meta', 'metadata'):
+            return self.meta
+        if key in HEADING_TAGS:
+            return self.heading_texts(key)
+        if key == 'headings':
+            return {level: self.heading_texts(level) for level in HEADING_TAGS}
+        return self.page_data.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, KeyError)
+        if value is KeyError:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, KeyError) is not KeyError
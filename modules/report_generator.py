@@ -14,6 +14,8 @@ from datetime import datetime
 from urllib.parse import urlparse
 from fpdf import FPDF
 import matplotlib.pyplot as plt
+import numpy as np
+from modules.results_table import ResultsTable
 
 class ReportGenerator:
     """
@@ -37,18 +39,22 @@ class ReportGenerator:
         self.locale = reports_config.get('locale', 'ar')
         self.include_screenshots = reports_config.get('include_screenshots', True)
     
-    def generate_pdf(self, results, output_path):
+    def generate_pdf(self, results, output_path, table=None):
         """
         توليد تقرير PDF من نتائج التحليل
         
         Args:
             results (dict): نتائج تحليل السيو
             output_path (str): مسار حفظ التقرير
+            table (ResultsTable, optional): جدول النتائج (يُبنى من results إذا لم يُمرر)
             
         Returns:
             str: مسار التقرير المنشأ
         """
         try:
+            if table is None:
+                table = ResultsTable.from_results(results)
+            
             # إنشاء ملف PDF
             pdf = FPDF()
             
@@ -60,13 +66,13 @@ class ReportGenerator:
             self._add_cover_page(pdf, results)
             
             # إضافة ملخص النتائج
-            self._add_summary_page(pdf, results)
+            self._add_summary_page(pdf, results, table)
             
             # إضافة صفحات المشاكل والتوصيات
-            self._add_issues_pages(pdf, results)
+            self._add_issues_pages(pdf, results, table)
             
             # إضافة صفحات تفاصيل الصفحات
-            self._add_pages_details(pdf, results)
+            self._add_pages_details(pdf, results, table)
             
             # حفظ ملف PDF
             pdf.output(output_path)
@@ -123,13 +129,14 @@ class ReportGenerator:
         pdf.cell(0, 60, "", ln=True)
         pdf.multi_cell(0, 10, "يقدم هذا التقرير تحليلًا شاملًا لعناصر تحسين محركات البحث (SEO) في موقعك، مع توصيات لتحسين الأداء والترتيب في نتائج البحث.")
     
-    def _add_summary_page(self, pdf, results):
+    def _add_summary_page(self, pdf, results, table):
         """
         إضافة صفحة ملخص النتائج
         
         Args:
             pdf (FPDF): كائن PDF
             results (dict): نتائج التحليل
+            table (ResultsTable): جدول النتائج
         """
         # إضافة صفحة جديدة
         pdf.add_page()
@@ -139,11 +146,11 @@ class ReportGenerator:
         pdf.cell(0, 20, "ملخص نتائج التحليل", ln=True, align='C')
         
         # حساب الإحصائيات
-        total_pages = len(results)
-        total_issues = sum(len(page.get('basic_seo', {}).get('issues', [])) for page in results.values())
+        total_pages = len(table)
+        total_issues = table.total('basic_issues')
         
         # متوسط النتيجة
-        avg_score = sum(page.get('score', 0) for page in results.values()) / total_pages if total_pages else 0
+        avg_score = table.mean('score')
         
         # المعلومات الرئيسية
         pdf.set_font('Arial', '', 12)
@@ -156,17 +163,10 @@ class ReportGenerator:
         pdf.cell(0, 10, "", ln=True)
         
         # توزيع المشكلات حسب الأهمية
-        high_issues = sum(1 for page in results.values() 
-                        for issue in page.get('basic_seo', {}).get('issues', [])
-                        if issue.get('impact') == 'high')
-        
-        medium_issues = sum(1 for page in results.values() 
-                          for issue in page.get('basic_seo', {}).get('issues', [])
-                          if issue.get('impact') == 'medium')
-        
-        low_issues = sum(1 for page in results.values() 
-                        for issue in page.get('basic_seo', {}).get('issues', [])
-                        if issue.get('impact') == 'low')
+        issues_by_impact = table.issue_histogram()
+        high_issues = issues_by_impact['high']
+        medium_issues = issues_by_impact['medium']
+        low_issues = issues_by_impact['low']
         
         pdf.set_font('Arial', 'B', 14)
         pdf.cell(0, 10, "توزيع المشكلات حسب الأهمية:", ln=True)
@@ -186,10 +186,10 @@ class ReportGenerator:
         
         pdf.set_font('Arial', '', 12)
         
-        # استخراج أهم 5 توصيات (المشكلات عالية الأهمية)
+        # استخراج أهم 5 توصيات (المشكلات عالية الأهمية، من الصفحات التي فيها مشكلات عالية فقط)
         top_issues = []
-        for page_url, page_data in results.items():
-            for issue in page_data.get('basic_seo', {}).get('issues', []):
+        for row in np.flatnonzero(table.columns['issues_high']):
+            for issue in results[table.urls[row]].get('basic_seo', {}).get('issues', []):
                 if issue.get('impact') == 'high':
                     top_issues.append({
                         'message': issue.get('message', ''),
@@ -200,19 +200,20 @@ class ReportGenerator:
         for i, issue in enumerate(top_issues[:5], 1):
             pdf.multi_cell(0, 10, f"{i}. {issue['message']}: {issue['recommendation']}")
     
-    def _add_issues_pages(self, pdf, results):
+    def _add_issues_pages(self, pdf, results, table):
         """
         إضافة صفحات المشاكل والتوصيات
         
         Args:
             pdf (FPDF): كائن PDF
             results (dict): نتائج التحليل
+            table (ResultsTable): جدول النتائج
         """
         # تجميع جميع المشكلات
         all_issues = []
         
-        for page_url, page_data in results.items():
-            for issue in page_data.get('basic_seo', {}).get('issues', []):
+        for page_url in table.urls:
+            for issue in results[page_url].get('basic_seo', {}).get('issues', []):
                 all_issues.append({
                     'url': page_url,
                     'message': issue.get('message', ''),
@@ -279,13 +280,14 @@ class ReportGenerator:
             if pdf.get_y() > 250:
                 pdf.add_page()
     
-    def _add_pages_details(self, pdf, results):
+    def _add_pages_details(self, pdf, results, table):
         """
         إضافة صفحات تفاصيل الصفحات
         
         Args:
             pdf (FPDF): كائن PDF
             results (dict): نتائج التحليل
+            table (ResultsTable): جدول النتائج
         """
         # إضافة صفحة جديدة
         pdf.add_page()
@@ -295,7 +297,8 @@ class ReportGenerator:
         pdf.cell(0, 20, "تفاصيل تحليل الصفحات", ln=True, align='C')
         
         # عرض تفاصيل كل صفحة
-        for page_url, page_data in results.items():
+        for page_url in table.urls:
+            page_data = results[page_url]
             # التحقق من الحاجة لصفحة جديدة
             if pdf.get_y() > 200:
                 pdf.add_page()
@@ -311,7 +314,7 @@ class ReportGenerator:
             pdf.multi_cell(0, 10, f"URL: {display_url}")
             
             # نتيجة السيو
-            score = page_data.get('score', 0)
+            score = round(table.value(page_url, 'score'))
             pdf.set_font('Arial', '', 11)
             pdf.cell(0, 10, f"نتيجة السيو: {score}/100", ln=True)
             
@@ -328,16 +331,16 @@ class ReportGenerator:
                 pdf.multi_cell(0, 10, f"الوصف: {description}")
             
             # عدد المشكلات
-            issues_count = len(page_data.get('basic_seo', {}).get('issues', []))
+            issues_count = table.value(page_url, 'basic_issues')
             pdf.cell(0, 10, f"عدد المشكلات: {issues_count}", ln=True)
             
             # سرعة التحميل
-            loading_time = page_data.get('page_speed', {}).get('loading_time')
+            loading_time = table.value(page_url, 'loading_time')
             if loading_time:
                 pdf.cell(0, 10, f"زمن التحميل: {loading_time:.2f} ثانية", ln=True)
             
             # عدد الكلمات
-            word_count = page_data.get('content', {}).get('word_count', 0)
+            word_count = table.value(page_url, 'word_count')
             pdf.cell(0, 10, f"عدد الكلمات: {word_count}", ln=True)
             
             # إحصائيات الصور
@@ -352,28 +355,32 @@ class ReportGenerator:
             pdf.line(10, pdf.get_y() + 5, 200, pdf.get_y() + 5)
             pdf.cell(0, 10, "", ln=True)
     
-    def generate_html(self, results, output_path):
+    def generate_html(self, results, output_path, table=None):
         """
         توليد تقرير HTML من نتائج التحليل
         
         Args:
             results (dict): نتائج تحليل السيو
             output_path (str): مسار حفظ التقرير
+            table (ResultsTable, optional): جدول النتائج (يُبنى من results إذا لم يُمرر)
             
         Returns:
             str: مسار التقرير المنشأ
         """
         try:
+            if table is None:
+                table = ResultsTable.from_results(results)
+            
             # الحصول على عنوان النطاق
-            first_url = next(iter(results.keys())) if results else ""
+            first_url = table.urls[0] if len(table) else ""
             domain = urlparse(first_url).netloc if first_url else ""
             
             # حساب الإحصائيات
-            total_pages = len(results)
-            total_issues = sum(len(page.get('basic_seo', {}).get('issues', [])) for page in results.values())
+            total_pages = len(table)
+            total_issues = table.total('basic_issues')
             
             # متوسط النتيجة
-            avg_score = sum(page.get('score', 0) for page in results.values()) / total_pages if total_pages else 0
+            avg_score = table.mean('score')
             
             # إنشاء محتوى HTML
             html_content = f"""<!DOCTYPE html>
@@ -492,8 +499,8 @@ class ReportGenerator:
             # تجميع جميع المشكلات
             all_issues = []
             
-            for page_url, page_data in results.items():
-                for issue in page_data.get('basic_seo', {}).get('issues', []):
+            for page_url in table.urls:
+                for issue in results[page_url].get('basic_seo', {}).get('issues', []):
                     all_issues.append({
                         'url': page_url,
                         'message': issue.get('message', ''),
@@ -530,8 +537,9 @@ class ReportGenerator:
 """
             
             # إضافة تفاصيل كل صفحة
-            for page_url, page_data in results.items():
-                score = page_data.get('score', 0)
+            for page_url in table.urls:
+                page_data = results[page_url]
+                score = round(table.value(page_url, 'score'))
                 
                 title_analysis = page_data.get('basic_seo', {}).get('title', {})
                 meta_analysis = page_data.get('basic_seo', {}).get('meta_description', {})
@@ -539,9 +547,11 @@ class ReportGenerator:
                 title = title_analysis.get('content', '') if title_analysis else ''
                 description = meta_analysis.get('content', '') if meta_analysis else ''
                 
-                issues_count = len(page_data.get('basic_seo', {}).get('issues', []))
-                loading_time = page_data.get('page_speed', {}).get('loading_time', 0)
-                word_count = page_data.get('content', {}).get('word_count', 0)
+                issues_count = table.value(page_url, 'basic_issues')
+                loading_time = table.value(page_url, 'loading_time')
+                word_count = table.value(page_url, 'word_count')
+                link_graph = page_data.get('link_graph') or {}
+                click_depth = link_graph.get('click_depth')
                 
                 html_content += f"""
             <div class="page-details">
@@ -555,12 +565,18 @@ class ReportGenerator:
                         <th>عدد المشكلات</th>
                         <th>زمن التحميل</th>
                         <th>عدد الكلمات</th>
+                        <th>عمق النقرات</th>
+                        <th>الروابط الداخلية الواردة</th>
+                        <th>PageRank الداخلي</th>
                     </tr>
                     <tr>
                         <td>{score}/100</td>
                         <td>{issues_count}</td>
                         <td>{loading_time:.2f} ثانية</td>
                         <td>{word_count}</td>
+                        <td>{click_depth if click_depth is not None else '-'}</td>
+                        <td>{link_graph.get('inlinks', '-')}</td>
+                        <td>{link_graph.get('pagerank', '-')}</td>
                     </tr>
                 </table>
                 <p><strong>العنوان:</strong> {title}</p>
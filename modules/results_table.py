@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة جدول النتائج - تمثيل عمودي لنتائج تحليل الموقع وحساب إحصائياته
+
+تُقرأ نتائج الصفحات المتداخلة مرة واحدة بعد التحليل إلى أعمدة NumPy (صفحة ×
+مقياس): النتائج وعدد المشاكل حسب الأهمية وعدد الكلمات وزمن التحميل. بعدها
+تُحسب المتوسطات والمجاميع والنسب المئوية وتوزيع المشاكل على الأعمدة مباشرة،
+فلا يعيد كل مستهلك (واجهة API والمراقبة ومولد التقارير وسطر الأوامر) المرور
+على القواميس المتداخلة لحساب الإحصائيات نفسها.
+"""
+
+import numpy as np
+
+# مستويات أهمية المشاكل والنقاط المخصومة من نتيجة الصفحة لكل مشكلة
+IMPACT_LEVELS = ('high', 'medium', 'low')
+IMPACT_PENALTIES = {'high': 10, 'medium': 5, 'low': 2}
+
+# وزن كل قسم تحليل في النتيجة الإجمالية للصفحة
+SCORE_WEIGHTS = {
+    'basic_seo': 0.4,      # السيو الأساسي
+    'page_speed': 0.2,     # سرعة الصفحة
+    'content': 0.2,        # جودة المحتوى
+    'images': 0.1,         # تحسين الصور
+    'links': 0.1           # جودة الروابط
+}
+
+# مفاتيح النتائج على مستوى الموقع (ليست صفحات)
+SITE_SECTIONS = ('competitors', 'duplicates', 'link_graph')
+
+# النسب المئوية المحسوبة لتوزيع النتائج
+SCORE_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def count_impacts(issues):
+    """
+    عدد المشاكل لكل مستوى أهمية في مرور واحد
+
+    Args:
+        issues (list): المشاكل
+
+    Returns:
+        dict: {مستوى الأهمية: العدد}
+    """
+    counts = dict.fromkeys(IMPACT_LEVELS, 0)
+    for issue in issues:
+        impact = issue.get('impact')
+        if impact in counts:
+            counts[impact] += 1
+    return counts
+
+
+def page_score(issues):
+    """
+    نتيجة سيو الصفحة: 100 نقطة مع خصم نقاط كل مشكلة حسب أهميتها
+
+    Args:
+        issues (list): مشاكل الصفحة
+
+    Returns:
+        int: النتيجة بين 0 و100
+    """
+    counts = count_impacts(issues)
+    score = 100 - sum(IMPACT_PENALTIES[level] * counts[level] for level in IMPACT_LEVELS)
+    return max(0, min(100, score))
+
+
+def _section_scores(page_result):
+    """نتائج أقسام SCORE_WEIGHTS للصفحة (None للقسم غير المتاح)"""
+    scores = []
+    for key in SCORE_WEIGHTS:
+        score = None
+        if key in page_result:
+            if isinstance(page_result[key], dict) and 'score' in page_result[key]:
+                score = page_result[key]['score']
+        elif key == 'basic_seo' and 'score' in page_result:
+            # إذا كانت النتيجة الأساسية موجودة مباشرة
+            score = page_result['score']
+        scores.append(score)
+    return scores
+
+
+def overall_score(page_result):
+    """
+    النتيجة الإجمالية لصفحة: معدل موزون لنتائج الأقسام المتاحة
+
+    Args:
+        page_result (dict): نتائج تحليل الصفحة
+
+    Returns:
+        int: النتيجة بين 0 و100 (0 إذا لم تتوفر أي نتيجة)
+    """
+    overall = 0
+    total_weight = 0
+    for weight, score in zip(SCORE_WEIGHTS.values(), _section_scores(page_result)):
+        if score is not None:
+            overall += score * weight
+            total_weight += weight
+    return round(overall / total_weight) if total_weight > 0 else 0
+
+
+def _number(value):
+    """قيمة رقمية أو 0"""
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+
+
+class ResultsTable:
+    """
+    جدول عمودي لنتائج صفحات عملية تحليل واحدة
+
+    الأعمدة (مصفوفات بطول عدد الصفحات):
+        error: الصفحات التي فشل تحليلها
+        score: النتيجة الإجمالية (المحفوظة في الصفحة، وإلا المعدل الموزون لنتائج الأقسام)
+        basic_score: نتيجة السيو الأساسي
+        issues_high / issues_medium / issues_low: مشاكل السيو الأساسي حسب الأهمية
+        basic_issues: عدد مشاكل السيو الأساسي
+        all_issues: عدد المشاكل في جميع أقسام الصفحة
+        word_count: عدد الكلمات
+        loading_time: زمن التحميل (ثوانٍ)
+    """
+
+    def __init__(self, urls, columns):
+        """
+        Args:
+            urls (list): روابط الصفحات بترتيب الصفوف
+            columns (dict): {اسم العمود: مصفوفة NumPy}
+        """
+        self.urls = urls
+        self.columns = columns
+        self._rows = {url: row for row, url in enumerate(urls)}
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        بناء الجدول من نتائج التحليل (مرور واحد على النتائج)
+
+        Args:
+            results (dict): {الرابط: نتيجة الصفحة} (تُتجاهل مفاتيح SITE_SECTIONS)
+
+        Returns:
+            ResultsTable: الجدول
+        """
+        urls = []
+        errors, stored_scores, section_scores, basic_scores = [], [], [], []
+        impacts, basic_issues, all_issues, word_counts, loading_times = [], [], [], [], []
+
+        for url, page in results.items():
+            if url in SITE_SECTIONS or not isinstance(page, dict):
+                continue
+            urls.append(url)
+            basic_seo = page.get('basic_seo')
+            basic_seo = basic_seo if isinstance(basic_seo, dict) else {}
+            issues = basic_seo.get('issues', [])
+
+            errors.append('error' in page)
+            stored_scores.append(page['score'] if isinstance(page.get('score'), (int, float)) else np.nan)
+            section_scores.append([np.nan if score is None else score for score in _section_scores(page)])
+            basic_scores.append(_number(basic_seo.get('score')))
+            counts = count_impacts(issues)
+            impacts.append([counts[level] for level in IMPACT_LEVELS])
+            basic_issues.append(len(issues))
+            all_issues.append(sum(len(section['issues']) for section in page.values()
+                                  if isinstance(section, dict) and 'issues' in section))
+            word_counts.append(_number((page.get('content') or {}).get('word_count')))
+            loading_times.append(_number((page.get('page_speed') or {}).get('loading_time')))
+
+        # النتيجة الإجمالية للصفحات التي لم تحفظ نتيجتها: معدل موزون للأقسام المتاحة لجميع الصفحات معًا
+        # (الجمع بترتيب الأقسام نفسه في overall_score حتى تتطابق النتائج عند أنصاف الدرجات)
+        scores = np.array(stored_scores, dtype=float)
+        sections = np.array(section_scores, dtype=float).reshape(len(urls), len(SCORE_WEIGHTS))
+        weighted = np.zeros(len(urls))
+        total_weight = np.zeros(len(urls))
+        for position, weight in enumerate(SCORE_WEIGHTS.values()):
+            available = ~np.isnan(sections[:, position])
+            weighted[available] += sections[available, position] * weight
+            total_weight[available] += weight
+        computed = np.round(np.divide(weighted, total_weight, out=np.zeros(len(urls)), where=total_weight > 0))
+        scores = np.where(np.isnan(scores), computed, scores)
+
+        impacts = np.array(impacts, dtype=np.int64).reshape(len(urls), len(IMPACT_LEVELS))
+        columns = {
+            'error': np.array(errors, dtype=bool),
+            'score': scores,
+            'basic_score': np.array(basic_scores, dtype=float),
+            'basic_issues': np.array(basic_issues, dtype=np.int64),
+            'all_issues': np.array(all_issues, dtype=np.int64),
+            'word_count': np.array(word_counts, dtype=np.int64),
+            'loading_time': np.array(loading_times, dtype=float),
+        }
+        for position, level in enumerate(IMPACT_LEVELS):
+            columns[f'issues_{level}'] = impacts[:, position]
+        return cls(urls, columns)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def row(self, url):
+        """
+        رقم صف الصفحة
+
+        Returns:
+            int or None: رقم الصف، أو None إذا لم تكن الصفحة في الجدول
+        """
+        return self._rows.get(url)
+
+    def value(self, url, column):
+        """
+        قيمة عمود لصفحة
+
+        Args:
+            url (str): رابط الصفحة
+            column (str): اسم العمود
+
+        Returns:
+            قيمة بايثون (int أو float أو bool)، أو None إذا لم تكن الصفحة في الجدول
+        """
+        row = self._rows.get(url)
+        return None if row is None else self.columns[column][row].item()
+
+    def _values(self, column, valid_only):
+        values = self.columns[column]
+        return values[~self.columns['error']] if valid_only else values
+
+    def total(self, column, valid_only=False):
+        """
+        مجموع عمود
+
+        Args:
+            column (str): اسم العمود
+            valid_only (bool): استبعاد الصفحات التي فشل تحليلها
+
+        Returns:
+            float or int: المجموع
+        """
+        return self._values(column, valid_only).sum().item()
+
+    def mean(self, column, valid_only=False):
+        """
+        متوسط عمود (0 لجدول فارغ)
+
+        Args:
+            column (str): اسم العمود
+            valid_only (bool): استبعاد الصفحات التي فشل تحليلها
+
+        Returns:
+            float: المتوسط
+        """
+        values = self._values(column, valid_only)
+        return float(values.mean()) if values.size else 0.0
+
+    def percentiles(self, column, q=SCORE_PERCENTILES, valid_only=False):
+        """
+        النسب المئوية لعمود
+
+        Args:
+            column (str): اسم العمود
+            q (tuple): النسب المطلوبة (0-100)
+            valid_only (bool): استبعاد الصفحات التي فشل تحليلها
+
+        Returns:
+            dict: {النسبة: القيمة} (فارغ لجدول فارغ)
+        """
+        values = self._values(column, valid_only)
+        if not values.size:
+            return {}
+        return {p: round(float(value), 1) for p, value in zip(q, np.percentile(values, q))}
+
+    def issue_histogram(self, valid_only=False):
+        """
+        عدد مشاكل السيو الأساسي لكل مستوى أهمية
+
+        Returns:
+            dict: {مستوى الأهمية: العدد}
+        """
+        return {level: self.total(f'issues_{level}', valid_only) for level in IMPACT_LEVELS}
+
+    def score_histogram(self, column='score', valid_only=False):
+        """
+        توزيع النتائج على فئات من 10 نقاط (الفئة الأخيرة تشمل 100)
+
+        Returns:
+            dict: {'0-9': العدد, ..., '90-100': العدد}
+        """
+        values = self._values(column, valid_only)
+        counts = np.bincount(np.clip(values // 10, 0, 9).astype(np.int64), minlength=10)
+        return {f'{start}-{start + 9 if start < 90 else 100}': int(count)
+                for start, count in zip(range(0, 100, 10), counts)}
+
+    def summary(self, valid_only=False):
+        """
+        ملخص إحصائيات الموقع
+
+        Args:
+            valid_only (bool): استبعاد الصفحات التي فشل تحليلها
+
+        Returns:
+            dict: عدد الصفحات والمشاكل ومتوسطات النتائج ونسبها المئوية وتوزيعها
+        """
+        return {
+            'pages': len(self._values('score', valid_only)),
+            'failed_pages': 0 if valid_only else self.total('error'),
+            'total_issues': self.total('all_issues', valid_only),
+            'basic_seo_issues': self.total('basic_issues', valid_only),
+            'issues_by_impact': self.issue_histogram(valid_only),
+            'average_score': round(self.mean('score', valid_only), 1),
+            'average_basic_score': round(self.mean('basic_score', valid_only), 1),
+            'score_percentiles': self.percentiles('score', valid_only=valid_only),
+            'score_distribution': self.score_histogram('score', valid_only),
+        }
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة مطابقة robots.txt - تحويل قواعد robots.txt إلى مطابق مترجم مسبقًا
+
+تدعم الوحدة قواعد Allow وDisallow مع الرموز * و$، وتطبق أسبقية أطول قاعدة
+مطابقة (وعند التساوي تتقدم Allow) كما في RFC 9309. تُحفظ نتيجة كل مسار في
+ذاكرة مؤقتة لأن روابط القائمة والتذييل تتكرر في كل صفحة، ويشترك الزاحفان في
+المطابق نفسه عبر ذاكرة معلومات الموقع.
+"""
+
+import re
+
+# اسم الزاحف في مجموعات User-agent (تُستخدم مجموعة * إذا لم توجد مجموعة خاصة به)
+ROBOTS_USER_AGENT = 'RSEO'
+
+
+class RobotsRule:
+    """
+    قاعدة Allow أو Disallow واحدة
+    """
+
+    __slots__ = ('allow', 'pattern', 'length', '_prefix', '_regex')
+
+    def __init__(self, allow, pattern):
+        """
+        ترجمة القاعدة
+
+        Args:
+            allow (bool): قاعدة Allow (وإلا Disallow)
+            pattern (str): نمط المسار كما ورد في الملف
+        """
+        self.allow = allow
+        self.pattern = pattern
+        self.length = len(pattern)
+
+        anchored = pattern.endswith('$')
+        body = pattern[:-1] if anchored else pattern
+        # الجزء الثابت قبل أول * يُفحص كبادئة قبل التعبير النمطي
+        self._prefix = body.split('*', 1)[0]
+
+        if '*' in body or anchored:
+            # تحويل * إلى .* و$ الأخيرة إلى نهاية المسار
+            regex = '.*'.join(re.escape(part) for part in body.split('*'))
+            self._regex = re.compile(regex + (r'\Z' if anchored else ''), re.DOTALL)
+        else:
+            # القواعد البسيطة (الغالبية) تطابق ببادئة المسار فقط
+            self._regex = None
+
+    def matches(self, path):
+        """التحقق من مطابقة القاعدة للمسار"""
+        if not path.startswith(self._prefix):
+            return False
+        return self._regex is None or self._regex.match(path) is not None
+
+
+class RobotsMatcher:
+    """
+    مطابق robots.txt مترجم لزاحف واحد
+    """
+
+    def __init__(self, robots_txt, user_agent=ROBOTS_USER_AGENT, cache_size=100000):
+        """
+        تحليل الملف وترجمة قواعد المجموعة المطابقة للزاحف
+
+        Args:
+            robots_txt (str): محتوى robots.txt
+            user_agent (str): اسم الزاحف المستخدم لاختيار مجموعة القواعد
+            cache_size (int): أقصى عدد للمسارات المحفوظة نتائجها
+        """
+        self.user_agent = user_agent
+        self.cache_size = cache_size
+        self.crawl_delay = None
+        self.sitemaps = []
+        self._cache = {}
+
+        groups = self._parse(robots_txt or '')
+        agent = user_agent.lower()
+
+        # مجموعة الزاحف نفسه إن وجدت، وإلا مجموعة *
+        specific = [group for agents, group in groups
+                    if any(name != '*' and agent.startswith(name) for name in agents)]
+        selected = specific or [group for agents, group in groups if '*' in agents]
+
+        rules = []
+        for group in selected:
+            rules.extend(group['rules'])
+            if group['crawl_delay'] is not None and self.crawl_delay is None:
+                self.crawl_delay = group['crawl_delay']
+
+        # الترتيب حسب الطول تنازليًا (Allow أولًا عند التساوي): أول قاعدة مطابقة هي الحاسمة
+        self.rules = sorted(rules, key=lambda rule: (-rule.length, not rule.allow))
+
+    def _parse(self, robots_txt):
+        """
+        تقسيم الملف إلى مجموعات
+
+        Returns:
+            list: [(أسماء الزواحف, {'rules': [...], 'crawl_delay': ...})]
+        """
+        groups = []
+        agents = None
+        group = None
+        in_rules = False
+
+        for line in robots_txt.splitlines():
+            line = line.split('#', 1)[0].strip()
+            if ':' not in line:
+                continue
+            field, value = line.split(':', 1)
+            field = field.strip().lower()
+            value = value.strip()
+
+            if field == 'sitemap':
+                if value:
+                    self.sitemaps.append(value)
+            elif field == 'user-agent':
+                # سطور User-agent المتتالية تشترك في مجموعة واحدة
+                if group is None or in_rules:
+                    agents = set()
+                    group = {'rules': [], 'crawl_delay': None}
+                    groups.append((agents, group))
+                    in_rules = False
+                agents.add(value.lower())
+            elif group is None:
+                continue
+            elif field in ('allow', 'disallow'):
+                in_rules = True
+                # Disallow فارغة تعني السماح بكل شيء فلا تضاف كقاعدة
+                if value:
+                    group['rules'].append(RobotsRule(field == 'allow', value))
+            elif field == 'crawl-delay':
+                in_rules = True
+                try:
+                    group['crawl_delay'] = float(value)
+                except ValueError:
+                    pass
+
+        return groups
+
+    @staticmethod
+    def _path(url):
+        """المسار والاستعلام كما تطابقه القواعد (عمليات نصية بدل urlparse لأنها تُستدعى لكل رابط)"""
+        host = url.find('//')
+        start = 0
+        if host != -1:
+            # نهاية المضيف: أول / أو ? أو # بعده
+            start = len(url)
+            for separator in '/?#':
+                index = url.find(separator, host + 2)
+                if index != -1 and index < start:
+                    start = index
+        path = url[start:].split('#', 1)[0]
+        return path if path.startswith('/') else '/' + path
+
+    def is_path_allowed(self, path):
+        """
+        التحقق من السماح بمسار
+
+        Args:
+            path (str): المسار (مع الاستعلام)
+
+        Returns:
+            bool: True إذا كان الزحف مسموحًا
+        """
+        verdict = self._cache.get(path)
+        if verdict is not None:
+            return verdict
+
+        verdict = True
+        if path != '/robots.txt':
+            for rule in self.rules:
+                if rule.matches(path):
+                    verdict = rule.allow
+                    break
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[path] = verdict
+        return verdict
+
+    def is_allowed(self, url):
+        """
+        التحقق من السماح بزحف عنوان URL
+
+        Args:
+            url (str): عنوان URL
+
+        Returns:
+            bool: True إذا كان الزحف مسموحًا
+        """
+        if not self.rules:
+            return True
+        return self.is_path_allowed(self._path(url))
+
+    def filter(self, urls):
+        """
+        تصفية مجموعة روابط دفعة واحدة
+
+        Args:
+            urls (iterable): الروابط
+
+        Returns:
+            list: الروابط المسموح بزحفها بنفس الترتيب
+        """
+        if not self.rules:
+            return list(urls)
+        return [url for url in urls if self.is_path_allowed(self._path(url))]
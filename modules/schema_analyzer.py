@@ -9,9 +9,9 @@ RSEO - محلل Schema Markup
 import json
 import logging
 import re
-from bs4 import BeautifulSoup
 import requests
 from urllib.parse import urlparse
+from modules.parsed_page import ParsedPage
 
 class SchemaAnalyzer:
     """محلل البيانات المنظمة (Schema Markup) في صفحات الويب"""
@@ -81,13 +81,14 @@ class SchemaAnalyzer:
             }
         }
     
-    def analyze(self, url=None, html_content=None):
+    def analyze(self, url=None, html_content=None, parsed_page=None):
         """
         تحليل البيانات المنظمة في صفحة ويب
         
         Args:
             url (str, optional): رابط الصفحة للتحليل. الافتراضي None.
             html_content (str, optional): محتوى HTML للصفحة إذا كان متاحًا. الافتراضي None.
+            parsed_page (ParsedPage, optional): الصفحة المحللة مسبقًا لتجنب إعادة التحليل. الافتراضي None.
             
         Returns:
             dict: نتائج تحليل البيانات المنظمة
@@ -104,21 +105,24 @@ class SchemaAnalyzer:
         
         try:
             # الحصول على محتوى الصفحة إذا لم يتم توفيره
-            if not html_content and url:
-                response = requests.get(url, headers=self.headers, timeout=10)
-                if response.status_code != 200:
-                    results['issues'].append(f"فشل في الحصول على محتوى الصفحة: كود الحالة {response.status_code}")
+            if parsed_page is None:
+                if not html_content and url:
+                    response = requests.get(url, headers=self.headers, timeout=10)
+                    if response.status_code != 200:
+                        results['issues'].append(f"فشل في الحصول على محتوى الصفحة: كود الحالة {response.status_code}")
+                        return results
+                    html_content = response.text
+                
+                if not html_content:
+                    results['issues'].append("لم يتم توفير محتوى HTML أو رابط صالح")
                     return results
-                html_content = response.text
-            
-            if not html_content:
-                results['issues'].append("لم يتم توفير محتوى HTML أو رابط صالح")
-                return results
+                
+                parsed_page = ParsedPage(url, html_content)
             
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = parsed_page.soup
             
-            # البحث عن البيانات المنظمة بتنسيق JSON-LD
-            schema_tags = soup.find_all('script', type='application/ld+json')
+            # كتل JSON-LD المحللة مسبقًا في الصفحة المشتركة
+            schema_blocks = parsed_page.json_ld
             
             # البحث عن البيانات المنظمة بتنسيق Microdata
             schema_microdata = self._extract_microdata(soup)
@@ -130,15 +134,13 @@ class SchemaAnalyzer:
             all_schemas = []
             
             # استخراج JSON-LD
-            for tag in schema_tags:
-                try:
-                    data = json.loads(tag.string)
-                    if isinstance(data, list):
-                        all_schemas.extend(data)
-                    else:
-                        all_schemas.append(data)
-                except json.JSONDecodeError:
+            for block in schema_blocks:
+                if not block['valid']:
                     results['issues'].append("تم العثور على JSON-LD غير صالح")
+                elif isinstance(block['data'], list):
+                    all_schemas.extend(block['data'])
+                else:
+                    all_schemas.append(block['data'])
             
             # إضافة البيانات من Microdata و RDFa
             all_schemas.extend(schema_microdata)
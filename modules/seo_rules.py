@@ -0,0 +1,657 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة قواعد السيو - محرك قواعد يفحص الصفحة في مرور واحد
+
+تعلن كل قاعدة عن الوسوم التي تحتاجها (tags)، ويمر المحرك على عناصر المستند
+مرة واحدة بترتيب ظهورها ويرسل كل عنصر إلى القواعد المشتركة في وسمه فقط، ثم
+تبني كل قاعدة قسمها من النتائج ومشاكلها في finish. إضافة قاعدة مخصصة لا تضيف
+مرورًا جديدًا على الشجرة.
+
+مثال قاعدة مخصصة:
+
+    class IframeRule(Rule):
+        name = 'iframes'
+        tags = ('iframe',)
+
+        def visit(self, state, element):
+            state.setdefault('count', 0)
+            state['count'] += 1
+
+        def finish(self, state, page, url):
+            return {'count': state.get('count', 0), 'issues': []}
+
+    analyzer.add_rule(IframeRule())
+"""
+
+import re
+import hashlib
+import logging
+from urllib.parse import urlparse
+from modules.parsed_page import HEADING_TAGS, extract_text, is_inside
+
+logger = logging.getLogger('rseo.seo_rules')
+
+# القاعدة المشتركة في هذا الوسم تستقبل جميع العناصر
+ALL_TAGS = '*'
+
+# الوسوم المستبعدة من نص المحتوى الرئيسي
+CONTENT_EXCLUDED = ('script', 'style', 'nav', 'footer', 'header')
+
+# طول بصمة SimHash للمحتوى الرئيسي بالبت
+SIMHASH_BITS = 64
+
+
+def make_issue(issue_type, message, impact, recommendation):
+    """
+    مشكلة سيو بالصيغة الموحدة للنتائج
+
+    Args:
+        issue_type (str): 'error' أو 'warning' أو 'info'
+        message (str): وصف المشكلة
+        impact (str): 'high' أو 'medium' أو 'low'
+        recommendation (str): التوصية
+
+    Returns:
+        dict: المشكلة
+    """
+    return {
+        'type': issue_type,
+        'message': message,
+        'impact': impact,
+        'recommendation': recommendation
+    }
+
+
+def simhash(words, shingle_size=3):
+    """
+    بصمة SimHash لقائمة كلمات
+
+    Args:
+        words (list): كلمات النص بالترتيب
+        shingle_size (int): عدد الكلمات في كل مقطع
+
+    Returns:
+        int: البصمة (64 بت، 0 لنص فارغ)
+    """
+    words = [word.lower() for word in words]
+    if len(words) >= shingle_size:
+        features = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    else:
+        features = [' '.join(words)] if words else []
+    if not features:
+        return 0
+
+    # عد البتات لكل موضع دفعة واحدة: كل بصمة كنص ثنائي، ثم عد الأحاد في كل عمود
+    rows = [format(int.from_bytes(hashlib.blake2b(feature.encode('utf-8', 'surrogatepass'), digest_size=8).digest(),
+                                  'little'), f'0{SIMHASH_BITS}b') for feature in features]
+    half = len(rows) / 2
+    value = 0
+    for column in zip(*rows):
+        value = (value << 1) | (column.count('1') > half)
+    return value
+
+
+class Rule:
+    """
+    قاعدة فحص أساسية
+
+    القاعدة نفسها بلا حالة بين الصفحات: حالة كل صفحة تُنشأ في start وتُمرر إلى
+    visit وfinish، فيمكن استخدام القاعدة نفسها لعدة صفحات في الوقت نفسه.
+    """
+
+    # اسم قسم القاعدة في نتائج التحليل
+    name = None
+    # الوسوم التي تستقبلها القاعدة في visit (ALL_TAGS لجميع العناصر)
+    tags = ()
+    # قاعدة على مستوى الموقع لا تقرأ الصفحة (تُعاد مع النتائج المحفوظة للصفحات التي لم تتغير)
+    site_level = False
+
+    def start(self, page, url):
+        """
+        حالة القاعدة لصفحة جديدة
+
+        Returns:
+            dict: الحالة
+        """
+        return {}
+
+    def visit(self, state, element):
+        """استقبال عنصر من الوسوم المشتركة بترتيب ظهوره في المستند"""
+
+    def finish(self, state, page, url):
+        """
+        بناء قسم القاعدة بعد انتهاء المرور
+
+        Returns:
+            dict: نتيجة القاعدة (مع قائمة issues)
+        """
+        raise NotImplementedError
+
+
+class RuleEngine:
+    """
+    محرك تشغيل القواعد على صفحة محللة في مرور واحد
+    """
+
+    def __init__(self, rules=()):
+        """
+        Args:
+            rules (iterable): القواعد بالترتيب الذي تظهر به أقسامها ومشاكلها في النتائج
+        """
+        self.rules = []
+        self._dispatch = {}  # الوسم -> [(رقم القاعدة, القاعدة)]
+        for rule in rules:
+            self.register(rule)
+
+    def register(self, rule):
+        """
+        إضافة قاعدة
+
+        Args:
+            rule (Rule): القاعدة
+
+        Raises:
+            ValueError: إذا لم يكن للقاعدة اسم أو كان اسمها مستخدمًا
+        """
+        if not rule.name:
+            raise ValueError(f"القاعدة {type(rule).__name__} بدون اسم")
+        if any(existing.name == rule.name for existing in self.rules):
+            raise ValueError(f"اسم القاعدة مستخدم مسبقًا: {rule.name}")
+
+        index = len(self.rules)
+        self.rules.append(rule)
+        for tag in rule.tags:
+            self._dispatch.setdefault(tag, []).append((index, rule))
+
+    def run(self, page, url):
+        """
+        تشغيل القواعد على الصفحة
+
+        Args:
+            page (ParsedPage): الصفحة المحللة
+            url (str): عنوان الصفحة
+
+        Returns:
+            list: [(اسم القاعدة, نتيجتها)] بترتيب تسجيل القواعد
+        """
+        states = [rule.start(page, url) for rule in self.rules]
+
+        dispatch = self._dispatch
+        every = dispatch.get(ALL_TAGS, ())
+        if dispatch:
+            for element in page.document:
+                for index, rule in dispatch.get(element.name, ()):
+                    rule.visit(states[index], element)
+                for index, rule in every:
+                    rule.visit(states[index], element)
+
+        return [(rule.name, rule.finish(states[index], page, url)) for index, rule in enumerate(self.rules)]
+
+    def run_site(self, url):
+        """
+        تشغيل القواعد على مستوى الموقع فقط (بدون صفحة محللة)
+
+        Args:
+            url (str): عنوان الصفحة
+
+        Returns:
+            list: [(اسم القاعدة, نتيجتها)] بترتيب تسجيل القواعد
+        """
+        return [(rule.name, rule.finish(rule.start(None, url), None, url))
+                for rule in self.rules if rule.site_level]
+
+
+class TitleRule(Rule):
+    """طول عنوان الصفحة وتكرار كلماته ووجود اسم الموقع فيه"""
+
+    name = 'title'
+    tags = ('title',)
+
+    def __init__(self, min_length=30, max_length=60):
+        self.min_length = min_length
+        self.max_length = max_length
+
+    def visit(self, state, element):
+        state.setdefault('tag', element)
+
+    def finish(self, state, page, url):
+        title_tag = state.get('tag')
+        result = {
+            'exists': title_tag is not None,
+            'issues': []
+        }
+
+        if not title_tag:
+            result['issues'].append(make_issue(
+                'error', 'لا يوجد عنوان للصفحة', 'high',
+                'أضف عنوانًا للصفحة يصف محتواها بشكل دقيق'
+            ))
+            return result
+
+        title_text = title_tag.text.strip()
+        result['content'] = title_text
+        result['length'] = len(title_text)
+
+        # التحقق من طول العنوان
+        if len(title_text) < self.min_length:
+            result['issues'].append(make_issue(
+                'warning', f'عنوان الصفحة قصير جدًا ({len(title_text)} حرف)', 'medium',
+                f'زيادة طول العنوان ليكون بين {self.min_length} و {self.max_length} حرف'
+            ))
+        elif len(title_text) > self.max_length:
+            result['issues'].append(make_issue(
+                'warning', f'عنوان الصفحة طويل جدًا ({len(title_text)} حرف)', 'medium',
+                f'تقليل طول العنوان ليكون بين {self.min_length} و {self.max_length} حرف'
+            ))
+
+        # التحقق من تكرار الكلمات المفتاحية
+        word_count = {}
+        for word in re.findall(r'\w+', title_text.lower()):
+            if len(word) > 2:  # تجاهل الكلمات القصيرة
+                word_count[word] = word_count.get(word, 0) + 1
+
+        repeated_keywords = [word for word, count in word_count.items() if count > 1]
+        if repeated_keywords:
+            result['issues'].append(make_issue(
+                'info', f'تكرار الكلمات في العنوان: {", ".join(repeated_keywords)}', 'low',
+                'تجنب تكرار الكلمات في العنوان لتحسين جاذبيته'
+            ))
+
+        # التحقق من وجود اسم الموقع في العنوان
+        domain = urlparse(url).netloc
+        site_name = domain.split('.')[0] if '.' in domain else domain
+
+        if site_name.lower() not in title_text.lower():
+            result['issues'].append(make_issue(
+                'info', 'لا يوجد اسم الموقع في العنوان', 'low',
+                'ضع في اعتبارك إضافة اسم الموقع في نهاية العنوان (مثال: عنوان الصفحة | اسم الموقع)'
+            ))
+
+        return result
+
+
+class MetaDescriptionRule(Rule):
+    """وجود الوصف التعريفي وطوله ووجود دعوة للعمل فيه"""
+
+    name = 'meta_description'
+    tags = ('meta',)
+
+    # كلمات الدعوة للعمل
+    CALL_TO_ACTIONS = ('اقرأ', 'اكتشف', 'تعلم', 'تصفح', 'اشترك', 'حمل', 'جرب', 'شاهد')
+
+    def __init__(self, min_length=70, max_length=160):
+        self.min_length = min_length
+        self.max_length = max_length
+
+    def visit(self, state, element):
+        if 'tag' not in state and element.get('name') == 'description':
+            state['tag'] = element
+
+    def finish(self, state, page, url):
+        meta_desc = state.get('tag')
+        result = {
+            'exists': meta_desc is not None,
+            'issues': []
+        }
+
+        if not meta_desc or not meta_desc.get('content'):
+            result['issues'].append(make_issue(
+                'error', 'لا يوجد وصف تعريفي للصفحة', 'high',
+                'أضف وصفًا تعريفيًا للصفحة يلخص محتواها بشكل جذاب'
+            ))
+            return result
+
+        description = meta_desc['content'].strip()
+        result['content'] = description
+        result['length'] = len(description)
+
+        # التحقق من طول الوصف
+        if len(description) < self.min_length:
+            result['issues'].append(make_issue(
+                'warning', f'الوصف التعريفي قصير جدًا ({len(description)} حرف)', 'medium',
+                f'زيادة طول الوصف ليكون بين {self.min_length} و {self.max_length} حرف'
+            ))
+        elif len(description) > self.max_length:
+            result['issues'].append(make_issue(
+                'warning', f'الوصف التعريفي طويل جدًا ({len(description)} حرف)', 'medium',
+                f'تقليل طول الوصف ليكون بين {self.min_length} و {self.max_length} حرف'
+            ))
+
+        # التحقق من وجود كلمات دعوة للعمل
+        has_cta = any(cta.lower() in description.lower() for cta in self.CALL_TO_ACTIONS)
+
+        if not has_cta:
+            result['issues'].append(make_issue(
+                'info', 'لا يوجد دعوة للعمل في الوصف', 'low',
+                'أضف كلمات حث على العمل لتحسين نسبة النقر (مثل: اكتشف، تعلم، اقرأ، إلخ)'
+            ))
+
+        return result
+
+
+class HeadingsRule(Rule):
+    """عدد عناوين H1 وتسلسل الترويسات وأطوالها"""
+
+    name = 'headings'
+    tags = HEADING_TAGS
+
+    def start(self, page, url):
+        return {tag: [] for tag in HEADING_TAGS}
+
+    def visit(self, state, element):
+        state[element.name].append(element)
+
+    def finish(self, state, page, url):
+        headings = state
+
+        result = {
+            'counts': {tag: len(elements) for tag, elements in headings.items()},
+            'issues': []
+        }
+
+        # التحقق من وجود H1
+        if not headings['h1']:
+            result['issues'].append(make_issue(
+                'error', 'لا يوجد عنوان رئيسي H1 في الصفحة', 'high',
+                'أضف عنوانًا رئيسيًا H1 يعكس الموضوع الرئيسي للصفحة'
+            ))
+        elif len(headings['h1']) > 1:
+            result['issues'].append(make_issue(
+                'warning', f'يوجد أكثر من عنوان H1 في الصفحة ({len(headings["h1"])})', 'medium',
+                'استخدم عنوانًا رئيسيًا H1 واحدًا فقط لكل صفحة'
+            ))
+
+        # التحقق من تسلسل الترويسات
+        if headings['h1'] and not headings['h2'] and (headings['h3'] or headings['h4'] or headings['h5'] or headings['h6']):
+            result['issues'].append(make_issue(
+                'warning', 'تخطي مستويات الترويسات (الانتقال من H1 إلى H3/H4 مباشرة)', 'medium',
+                'حافظ على تسلسل هرمي صحيح للترويسات: H1 → H2 → H3 → ...'
+            ))
+
+        # جمع محتوى الترويسات للتحليل
+        all_headings_content = []
+        for tag, elements in headings.items():
+            for heading in elements:
+                text = heading.text.strip()
+                if text:
+                    all_headings_content.append({
+                        'tag': tag,
+                        'content': text,
+                        'length': len(text)
+                    })
+
+        result['headings_content'] = all_headings_content
+
+        # التحقق من طول الترويسات
+        for heading in all_headings_content:
+            if heading['length'] < 10:
+                result['issues'].append(make_issue(
+                    'info', f'عنوان {heading["tag"]} قصير جدًا: "{heading["content"]}"', 'low',
+                    'استخدم عناوين أكثر وصفية وتفصيلية'
+                ))
+            elif heading['length'] > 70:
+                result['issues'].append(make_issue(
+                    'info', f'عنوان {heading["tag"]} طويل جدًا: "{heading["content"][:50]}..."', 'low',
+                    'اجعل العناوين قصيرة ومركزة (أقل من 70 حرفًا)'
+                ))
+
+        return result
+
+
+class ContentRule(Rule):
+    """عدد كلمات المحتوى الرئيسي وطول فقراته"""
+
+    name = 'content'
+    tags = ('main', 'article', 'p')
+
+    def __init__(self, min_words=300):
+        self.min_words = min_words
+
+    def start(self, page, url):
+        return {'main': None, 'article': None, 'paragraphs': []}
+
+    def visit(self, state, element):
+        if element.name == 'p':
+            state['paragraphs'].append(element)
+        elif state[element.name] is None and not is_inside(element, CONTENT_EXCLUDED):
+            state[element.name] = element
+
+    @staticmethod
+    def _in_content(paragraph, main_content):
+        """هل الفقرة داخل المحتوى الرئيسي وخارج الوسوم المستبعدة؟"""
+        node = paragraph
+        while node is not None:
+            if node is main_content:
+                return True
+            if node.name in CONTENT_EXCLUDED:
+                return False
+            node = node.parent
+        return False
+
+    def finish(self, state, page, url):
+        # المحتوى الرئيسي: أول main ثم أول article خارج الوسوم المستبعدة، وإلا جسم الصفحة
+        main_content = state['main'] or state['article'] or page.soup.body
+
+        if not main_content:
+            main_content = page.soup
+
+        # استخراج النص المرئي (استبعاد السكريبت والستايل) دون تعديل الشجرة المشتركة
+        text = extract_text(main_content, exclude=CONTENT_EXCLUDED, separator=" ")
+        words = re.findall(r'\w+', text)
+
+        result = {
+            'word_count': len(words),
+            # بصمة المحتوى لكشف الصفحات شبه المكررة على مستوى الموقع (DuplicateDetector)
+            'simhash': format(simhash(words), '016x'),
+            'issues': []
+        }
+
+        # التحقق من عدد الكلمات
+        if len(words) < self.min_words:
+            result['issues'].append(make_issue(
+                'warning', f'محتوى الصفحة قصير جدًا ({len(words)} كلمة)', 'medium',
+                f'أضف المزيد من المحتوى النصي ليصل إلى {self.min_words} كلمة على الأقل'
+            ))
+
+        # التحقق من وجود فقرات طويلة
+        paragraphs = [p for p in state['paragraphs'] if p is not main_content and self._in_content(p, main_content)]
+        long_paragraphs = 0
+
+        for p in paragraphs:
+            p_words = len(re.findall(r'\w+', p.get_text()))
+            if p_words > 100:  # أكثر من 100 كلمة تعتبر فقرة طويلة
+                long_paragraphs += 1
+
+        if long_paragraphs > 0:
+            result['issues'].append(make_issue(
+                'info', f'يوجد {long_paragraphs} فقرة طويلة في الصفحة', 'low',
+                'قسم الفقرات الطويلة إلى فقرات أقصر لتحسين القراءة'
+            ))
+
+        # التحقق من تباعد الفقرات والترويسات
+        if len(paragraphs) < 3 and len(words) > 300:
+            result['issues'].append(make_issue(
+                'info', 'عدد الفقرات قليل بالنسبة لحجم المحتوى', 'low',
+                'قسم المحتوى إلى فقرات أكثر مع استخدام العناوين الفرعية'
+            ))
+
+        return result
+
+
+class ImagesRule(Rule):
+    """النص البديل للصور وأبعاد الصور الكبيرة"""
+
+    name = 'images'
+    tags = ('img',)
+
+    def start(self, page, url):
+        return {
+            'count': 0,
+            'missing_alt': 0,
+            'empty_alt': 0,
+            'large_images': 0,
+            'issues': []
+        }
+
+    def visit(self, state, img):
+        state['count'] += 1
+
+        # تجاهل الصور الصغيرة والأيقونات
+        if img.get('width') and img.get('height'):
+            try:
+                if int(img['width']) < 50 or int(img['height']) < 50:
+                    return
+            except (ValueError, TypeError):
+                pass
+
+        # التحقق من وجود النص البديل
+        if not img.has_attr('alt'):
+            state['missing_alt'] += 1
+        elif img['alt'].strip() == '':
+            state['empty_alt'] += 1
+
+        # التحقق من حجم الصورة (إذا كان متوفرًا في الوسوم)
+        if img.has_attr('src') and (img['src'].endswith('.jpg') or img['src'].endswith('.jpeg') or img['src'].endswith('.png')):
+            if img.has_attr('width') and img.has_attr('height'):
+                try:
+                    width = int(img['width'])
+                    height = int(img['height'])
+                    if width > 1000 or height > 1000:
+                        state['large_images'] += 1
+                except (ValueError, TypeError):
+                    pass
+
+    def finish(self, state, page, url):
+        result = state
+
+        # إضافة المشاكل المكتشفة
+        if result['missing_alt'] > 0:
+            result['issues'].append(make_issue(
+                'error', f'{result["missing_alt"]} صورة بدون نص بديل', 'high',
+                'أضف نصًا بديلًا وصفيًا لجميع الصور المهمة للوصول وتحسين السيو'
+            ))
+
+        if result['empty_alt'] > 0:
+            result['issues'].append(make_issue(
+                'warning', f'{result["empty_alt"]} صورة بنص بديل فارغ', 'medium',
+                'أضف نصًا بديلًا وصفيًا بدلاً من تركه فارغًا'
+            ))
+
+        if result['large_images'] > 0:
+            result['issues'].append(make_issue(
+                'warning', f'{result["large_images"]} صورة كبيرة الحجم', 'medium',
+                'ضغط وتحسين حجم الصور الكبيرة لتحسين سرعة التحميل'
+            ))
+
+        return result
+
+
+class RobotsSitemapRule(Rule):
+    """وجود robots.txt وsitemap.xml (على مستوى الموقع، بدون عناصر من الصفحة)"""
+
+    name = 'robots_sitemap'
+    site_level = True
+
+    def __init__(self, site_cache):
+        self.site_cache = site_cache
+
+    def finish(self, state, page, url):
+        # قراءة الملفات من ذاكرة الموقع، ويتم جلبها فقط إذا لم يجلبها الزاحف أو صفحة سابقة
+        self.site_cache.robots(url)
+        site_info = self.site_cache.sitemap(url)
+
+        result = {
+            'robots_exists': site_info.robots_exists,
+            'sitemap_exists': site_info.sitemap_exists,
+            'sitemap_in_robots': site_info.sitemap_in_robots,
+            'issues': []
+        }
+
+        # إضافة المشاكل المكتشفة
+        if not result['robots_exists']:
+            result['issues'].append(make_issue(
+                'warning', 'لا يوجد ملف robots.txt', 'medium',
+                'إنشاء ملف robots.txt لتوجيه محركات البحث'
+            ))
+
+        if not result['sitemap_exists']:
+            result['issues'].append(make_issue(
+                'warning', 'لا يوجد ملف sitemap.xml', 'medium',
+                'إنشاء خريطة موقع XML لتسهيل فهرسة محركات البحث للموقع'
+            ))
+
+        if result['robots_exists'] and not result['sitemap_in_robots']:
+            result['issues'].append(make_issue(
+                'info', 'ملف robots.txt لا يشير إلى خريطة الموقع', 'low',
+                'أضف إشارة لخريطة الموقع في ملف robots.txt: Sitemap: https://example.com/sitemap.xml'
+            ))
+
+        return result
+
+
+class StructuredDataRule(Rule):
+    """البيانات المنظمة JSON-LD (كتل محللة مسبقًا في الصفحة المشتركة)"""
+
+    name = 'structured_data'
+
+    def finish(self, state, page, url):
+        structured_data_tags = page.json_ld
+
+        result = {
+            'exists': len(structured_data_tags) > 0,
+            'count': len(structured_data_tags),
+            'types': [],
+            'issues': []
+        }
+
+        # التحقق من وجود بيانات منظمة
+        if not structured_data_tags:
+            result['issues'].append(make_issue(
+                'info', 'لا توجد بيانات منظمة (Structured Data)', 'low',
+                'أضف بيانات منظمة باستخدام Schema.org لتحسين ظهور النتائج المميزة'
+            ))
+            return result
+
+        # تحليل أنواع البيانات المنظمة
+        for block in structured_data_tags:
+            data = block['data']
+            if block['valid']:
+                if isinstance(data, dict) and '@type' in data:
+                    result['types'].append(data['@type'])
+                elif isinstance(data, list):
+                    for item in data:
+                        if isinstance(item, dict) and '@type' in item:
+                            result['types'].append(item['@type'])
+            else:
+                result['issues'].append(make_issue(
+                    'error', 'خطأ في تنسيق البيانات المنظمة JSON-LD', 'medium',
+                    'تصحيح بنية JSON في البيانات المنظمة'
+                ))
+
+        return result
+
+
+def default_rules(config, site_cache):
+    """
+    القواعد الأساسية لمحلل السيو بترتيب أقسام النتائج
+
+    Args:
+        config (dict): إعدادات التطبيق (القسم seo_analysis لحدود التقييم)
+        site_cache (SiteInfoCache): ذاكرة معلومات المواقع (robots.txt وsitemap.xml)
+
+    Returns:
+        list: القواعد
+    """
+    seo_config = (config or {}).get('seo_analysis', {})
+    title = seo_config.get('title', {})
+    meta_description = seo_config.get('meta_description', {})
+    return [
+        TitleRule(title.get('min_length', 30), title.get('max_length', 60)),
+        MetaDescriptionRule(meta_description.get('min_length', 70), meta_description.get('max_length', 160)),
+        HeadingsRule(),
+        ContentRule(seo_config.get('content', {}).get('min_words', 300)),
+        ImagesRule(),
+        RobotsSitemapRule(site_cache),
+        StructuredDataRule(),
+    ]
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة معلومات الموقع - تخزين مؤقت لفحوصات robots.txt وsitemap.xml على مستوى الموقع
+
+تُجلب هذه الملفات مرة واحدة لكل موقع (مخطط + مضيف) بدلًا من جلبها مع كل
+صفحة، ويملأ الزاحف الذاكرة المؤقتة بملف robots.txt الذي قام بتحميله أصلًا
+لتقرأه تحليلات الصفحات لاحقًا.
+
+العمليات العاملة في منفذ التحليل لا تشارك ذاكرة العملية الرئيسية، لذلك تجلب
+العملية الرئيسية الملفين وتُرسل معلوماتهما (SiteInfo.to_dict) مع كل صفحة،
+فتملأ بها العملية العاملة ذاكرتها (SiteInfoCache.seed) بدل جلبها من جديد.
+"""
+
+import time
+import logging
+import threading
+import requests
+from urllib.parse import urlparse
+from modules.robots_matcher import RobotsMatcher, ROBOTS_USER_AGENT
+
+logger = logging.getLogger('rseo.site_info')
+
+
+class SiteInfo:
+    """
+    معلومات robots.txt وsitemap.xml لموقع واحد
+    """
+
+    def __init__(self, base_url):
+        """
+        تهيئة معلومات الموقع
+
+        Args:
+            base_url (str): عنوان الموقع الأساسي (المخطط + المضيف)
+        """
+        self.base_url = base_url
+        self.created_at = time.time()
+
+        self.robots_fetched = False
+        self.robots_status = None
+        self.robots_txt = ''
+
+        self.sitemap_fetched = False
+        self.sitemap_status = None
+        
+        self._matchers = {}
+
+    @property
+    def robots_url(self):
+        return f"{self.base_url}/robots.txt"
+
+    @property
+    def sitemap_url(self):
+        return f"{self.base_url}/sitemap.xml"
+
+    @property
+    def robots_exists(self):
+        return self.robots_status == 200
+
+    @property
+    def sitemap_exists(self):
+        return self.sitemap_status == 200
+
+    @property
+    def sitemap_in_robots(self):
+        # التحقق من وجود إشارة لخريطة الموقع في robots.txt
+        return self.robots_exists and 'sitemap:' in self.robots_txt.lower()
+    
+    def robots_matcher(self, user_agent=ROBOTS_USER_AGENT):
+        """
+        مطابق robots.txt المترجم للموقع (يُترجم مرة واحدة لكل زاحف)
+        
+        Args:
+            user_agent (str): اسم الزاحف
+            
+        Returns:
+            RobotsMatcher: المطابق (بدون قواعد إذا لم يوجد الملف)
+        """
+        matcher = self._matchers.get(user_agent)
+        if matcher is None:
+            matcher = RobotsMatcher(self.robots_txt if self.robots_exists else '', user_agent)
+            self._matchers[user_agent] = matcher
+        return matcher
+
+    def to_dict(self):
+        """
+        معلومات الملفين القابلة للإرسال إلى عملية أخرى (SiteInfoCache.seed)
+
+        Returns:
+            dict: عنوان الموقع وحالة robots.txt ومحتواه وحالة sitemap.xml
+        """
+        return {
+            'base_url': self.base_url,
+            'robots_status': self.robots_status,
+            'robots_txt': self.robots_txt,
+            'sitemap_status': self.sitemap_status,
+        }
+
+
+class SiteInfoCache:
+    """
+    ذاكرة مؤقتة آمنة بين الخيوط لمعلومات المواقع مفهرسة بالمخطط والمضيف
+
+    يُجلب كل ملف مرة واحدة فقط لكل موقع حتى مع تحليل الصفحات بالتوازي،
+    وتنتهي صلاحية المدخلات بعد ttl ثانية حتى تلتقط عمليات المراقبة الدورية
+    التغييرات على الموقع.
+    """
+
+    def __init__(self, ttl=3600, timeout=10):
+        """
+        تهيئة الذاكرة المؤقتة
+
+        Args:
+            ttl (int): مدة صلاحية معلومات الموقع بالثواني
+            timeout (int): مهلة طلبات الجلب بالثواني
+        """
+        self.ttl = ttl
+        self.timeout = timeout
+        self._sites = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def site_key(url):
+        """
+        مفتاح الموقع (المخطط + المضيف) لعنوان URL
+
+        Args:
+            url (str): أي عنوان URL من الموقع
+
+        Returns:
+            str: عنوان الموقع الأساسي
+        """
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def get(self, url):
+        """
+        الحصول على معلومات الموقع (دون جلب أي ملف)
+
+        Args:
+            url (str): أي عنوان URL من الموقع
+
+        Returns:
+            tuple: (SiteInfo, Lock) معلومات الموقع وقفل الجلب الخاص به
+        """
+        key = self.site_key(url)
+        with self._lock:
+            info = self._sites.get(key)
+            if info is None or time.time() - info.created_at > self.ttl:
+                info = SiteInfo(key)
+                self._sites[key] = info
+                self._locks.setdefault(key, threading.Lock())
+            return info, self._locks[key]
+
+    def store_robots(self, url, status_code, text):
+        """
+        تخزين ملف robots.txt الذي جلبه الزاحف
+
+        Args:
+            url (str): أي عنوان URL من الموقع
+            status_code (int): رمز حالة الاستجابة (None عند فشل الطلب)
+            text (str): محتوى الملف
+            
+        Returns:
+            SiteInfo: معلومات الموقع
+        """
+        info, lock = self.get(url)
+        with lock:
+            info.robots_status = status_code
+            info.robots_txt = text or ''
+            info.robots_fetched = True
+            info._matchers.clear()
+        return info
+
+    def robots(self, url, session=None):
+        """
+        الحصول على ملف robots.txt للموقع مع جلبه مرة واحدة فقط
+
+        Args:
+            url (str): أي عنوان URL من الموقع
+            session (requests.Session, optional): جلسة الطلبات المستخدمة للجلب
+
+        Returns:
+            SiteInfo: معلومات الموقع
+        """
+        info, lock = self.get(url)
+        with lock:
+            if not info.robots_fetched:
+                try:
+                    response = (session or requests).get(info.robots_url, timeout=self.timeout)
+                    info.robots_status = response.status_code
+                    if response.status_code == 200:
+                        info.robots_txt = response.text
+                except Exception as e:
+                    logger.error(f"خطأ في التحقق من ملف robots.txt: {str(e)}")
+                info.robots_fetched = True
+        return info
+
+    def sitemap(self, url, session=None):
+        """
+        التحقق من وجود ملف sitemap.xml للموقع مرة واحدة فقط
+
+        Args:
+            url (str): أي عنوان URL من الموقع
+            session (requests.Session, optional): جلسة الطلبات المستخدمة للجلب
+
+        Returns:
+            SiteInfo: معلومات الموقع
+        """
+        info, lock = self.get(url)
+        with lock:
+            if not info.sitemap_fetched:
+                try:
+                    # يكفي رمز الحالة، لذلك لا نقوم بتنزيل محتوى الخريطة
+                    response = (session or requests).get(info.sitemap_url, timeout=self.timeout, stream=True)
+                    info.sitemap_status = response.status_code
+                    response.close()
+                except Exception as e:
+                    logger.error(f"خطأ في التحقق من ملف sitemap.xml: {str(e)}")
+                info.sitemap_fetched = True
+        return info
+
+    def seed(self, site):
+        """
+        تخزين معلومات موقع جلبتها عملية أخرى (بدل جلب الملفين من جديد)
+
+        Args:
+            site (dict): معلومات الموقع (SiteInfo.to_dict)
+
+        Returns:
+            SiteInfo: معلومات الموقع
+        """
+        info, lock = self.get(site['base_url'])
+        with lock:
+            if info.robots_status != site['robots_status'] or info.robots_txt != site['robots_txt']:
+                info._matchers.clear()
+            info.robots_status = site['robots_status']
+            info.robots_txt = site['robots_txt'] or ''
+            info.robots_fetched = True
+            info.sitemap_status = site['sitemap_status']
+            info.sitemap_fetched = True
+        return info
+
+    def clear(self):
+        """مسح جميع معلومات المواقع المخزنة"""
+        with self._lock:
+            self._sites.clear()
+
+
+# الذاكرة المؤقتة المشتركة بين الزواحف والمحللات في العملية
+site_info_cache = SiteInfoCache()
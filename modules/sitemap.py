@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة خرائط المواقع - قراءة sitemap.xml وفهارسها بشكل متدفق لتغذية الزاحف
+
+يُحلل المحتوى على دفعات أثناء تنزيله (XMLPullParser) مع فك ضغط ملفات .xml.gz
+تدريجيًا، ويُحرر كل عنصر فور قراءته، فيبقى استهلاك الذاكرة ثابتًا حتى مع
+خرائط بمئات الميجابايت. تُتبع فهارس الخرائط (sitemapindex) تلقائيًا.
+"""
+
+import zlib
+import asyncio
+import logging
+import aiohttp
+import requests
+import xml.etree.ElementTree as ET
+from collections import deque
+from urllib.parse import urljoin
+
+logger = logging.getLogger('rseo.sitemap')
+
+# حجم الدفعة المقروءة من الاستجابة (بايت)
+CHUNK_SIZE = 64 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def sitemaps_from_robots(robots_txt, base_url):
+    """
+    استخراج روابط خرائط الموقع من ملف robots.txt مع إضافة /sitemap.xml
+
+    Args:
+        robots_txt (str): محتوى robots.txt
+        base_url (str): عنوان الموقع الأساسي
+
+    Returns:
+        list: روابط خرائط الموقع بدون تكرار
+    """
+    sitemaps = []
+    for line in (robots_txt or '').splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line.lower().startswith('sitemap:'):
+            sitemap_url = line.split(':', 1)[1].strip()
+            if sitemap_url:
+                sitemaps.append(urljoin(base_url, sitemap_url))
+
+    sitemaps.append(urljoin(base_url, '/sitemap.xml'))
+    return list(dict.fromkeys(sitemaps))
+
+
+def _local_name(tag):
+    """اسم الوسم بدون النطاق (namespace)"""
+    return tag.rsplit('}', 1)[-1]
+
+
+class SitemapParser:
+    """
+    محلل تزايدي لملف خريطة موقع واحد (urlset أو sitemapindex، مضغوط أو لا)
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._decompressor = None
+        self._started = False
+        self._root = None
+
+    def feed(self, chunk):
+        """
+        تمرير دفعة من محتوى الملف
+
+        Args:
+            chunk (bytes): دفعة من المحتوى
+
+        Yields:
+            tuple: المدخلات المكتملة (النوع, الرابط) حيث النوع 'url' أو 'sitemap'
+        """
+        if not self._started:
+            self._started = True
+            # ملفات .xml.gz (بعد فك ترميز النقل الذي تتولاه مكتبة HTTP)
+            if chunk[:2] == GZIP_MAGIC:
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._decompressor is None:
+            self._parser.feed(chunk)
+            yield from self._read_events()
+            return
+
+        # فك الضغط على أجزاء محدودة الحجم، فنسبة ضغط الخرائط قد تتجاوز 50 ضعفًا
+        while chunk:
+            self._parser.feed(self._decompressor.decompress(chunk, CHUNK_SIZE))
+            chunk = self._decompressor.unconsumed_tail
+            yield from self._read_events()
+
+    def close(self):
+        """
+        إنهاء التحليل
+
+        Yields:
+            tuple: المدخلات المتبقية
+        """
+        if self._decompressor is not None:
+            self._parser.feed(self._decompressor.flush())
+        self._parser.close()
+        yield from self._read_events()
+
+    def _read_events(self):
+        """المدخلات المكتملة من أحداث المحلل"""
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = element
+                continue
+
+            kind = _local_name(element.tag)
+            if kind not in ('url', 'sitemap'):
+                continue
+
+            loc = None
+            for child in element:
+                if _local_name(child.tag) == 'loc' and child.text:
+                    loc = child.text.strip()
+                    break
+
+            # تحرير العناصر المقروءة حتى لا تتراكم الشجرة في الذاكرة
+            self._root.clear()
+            if loc:
+                yield kind, loc
+
+
+class SitemapReader:
+    """
+    قارئ خرائط المواقع: يتبع الفهارس ويعيد روابط الصفحات واحدًا تلو الآخر
+    """
+
+    def __init__(self, session=None, timeout=30, max_sitemaps=1000, scheduler=None):
+        """
+        تهيئة القارئ
+
+        Args:
+            session (requests.Session, optional): جلسة الطلبات المستخدمة للجلب
+            timeout (int): مهلة الطلب بالثواني
+            max_sitemaps (int): أقصى عدد لملفات الخرائط المقروءة (حماية من الفهارس الضخمة أو الدائرية)
+            scheduler (CrawlScheduler, optional): مجدول التهذيب لتطبيق معدل الطلبات على المضيف
+        """
+        self.session = session
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps
+        self.scheduler = scheduler
+        self.sitemaps_read = 0
+
+    def iter_urls(self, sitemap_urls):
+        """
+        قراءة روابط الصفحات من خرائط الموقع بشكل متدفق
+
+        يتوقف تنزيل الخريطة الحالية إذا توقف المستهلك عن طلب روابط جديدة.
+
+        Args:
+            sitemap_urls (iterable): روابط خرائط الموقع أو فهارسها
+
+        Yields:
+            str: رابط صفحة
+        """
+        pending = deque(sitemap_urls)
+        seen = set(pending)
+
+        while pending and self.sitemaps_read < self.max_sitemaps:
+            sitemap_url = pending.popleft()
+            self.sitemaps_read += 1
+
+            for kind, loc in self._read_sitemap(sitemap_url):
+                if kind == 'url':
+                    yield loc
+                elif loc not in seen:
+                    # خريطة فرعية من فهرس الخرائط
+                    seen.add(loc)
+                    pending.append(loc)
+
+    async def iter_urls_async(self, session, sitemap_urls):
+        """
+        قراءة روابط الصفحات من خرائط الموقع بشكل متدفق (للزاحف غير المتزامن)
+
+        Args:
+            session (aiohttp.ClientSession): جلسة aiohttp
+            sitemap_urls (iterable): روابط خرائط الموقع أو فهارسها
+
+        Yields:
+            str: رابط صفحة
+        """
+        pending = deque(sitemap_urls)
+        seen = set(pending)
+
+        while pending and self.sitemaps_read < self.max_sitemaps:
+            sitemap_url = pending.popleft()
+            self.sitemaps_read += 1
+
+            async for kind, loc in self._read_sitemap_async(session, sitemap_url):
+                if kind == 'url':
+                    yield loc
+                elif loc not in seen:
+                    seen.add(loc)
+                    pending.append(loc)
+
+    def _read_sitemap(self, sitemap_url):
+        """جلب ملف خريطة واحد وتحليله أثناء التنزيل"""
+        if self.scheduler is not None:
+            self.scheduler.acquire(sitemap_url)
+
+        try:
+            response = (self.session or requests).get(sitemap_url, timeout=self.timeout, stream=True)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"تعذر جلب خريطة الموقع {sitemap_url}: {str(e)}")
+            return
+        finally:
+            if self.scheduler is not None:
+                self.scheduler.release(sitemap_url)
+
+        with response:
+            if response.status_code != 200:
+                logger.info(f"خريطة الموقع غير متاحة {sitemap_url}: {response.status_code}")
+                return
+
+            parser = SitemapParser()
+            try:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    yield from parser.feed(chunk)
+                yield from parser.close()
+            except (ET.ParseError, zlib.error) as e:
+                logger.warning(f"خريطة موقع غير صالحة {sitemap_url}: {str(e)}")
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"انقطع تنزيل خريطة الموقع {sitemap_url}: {str(e)}")
+
+    async def _read_sitemap_async(self, session, sitemap_url):
+        """جلب ملف خريطة واحد عبر aiohttp وتحليله أثناء التنزيل"""
+        if self.scheduler is not None:
+            await self.scheduler.acquire_async(sitemap_url)
+
+        # مهلة لكل قراءة بدل مهلة إجمالية، فالخرائط الكبيرة قد يطول تنزيلها
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        try:
+            response = await session.get(sitemap_url, timeout=timeout)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"تعذر جلب خريطة الموقع {sitemap_url}: {str(e)}")
+            return
+        finally:
+            if self.scheduler is not None:
+                self.scheduler.release(sitemap_url)
+
+        async with response:
+            if response.status != 200:
+                logger.info(f"خريطة الموقع غير متاحة {sitemap_url}: {response.status}")
+                return
+
+            parser = SitemapParser()
+            try:
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    for entry in parser.feed(chunk):
+                        yield entry
+                for entry in parser.close():
+                    yield entry
+            except (ET.ParseError, zlib.error) as e:
+                logger.warning(f"خريطة موقع غير صالحة {sitemap_url}: {str(e)}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"انقطع تنزيل خريطة الموقع {sitemap_url}: {str(e)}")
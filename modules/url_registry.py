@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+وحدة سجل الروابط - تمثيل مضغوط للروابط في عمليات الزحف الكبيرة
+
+مجموعات الروابط المرئية والمزارة لا تحتفظ بنصوص الروابط نفسها، بل ببصمة
+رقمية من 64 بت لكل رابط (الوضع exact)، أو بمرشح Bloom قابل للتوسع (الوضع
+bloom) بنسبة خطأ محددة مقابل ذاكرة أقل بكثير. ويعطي السجل كل رابط معرفًا
+رقميًا متسلسلًا حتى تخزن الهياكل الأخرى (مثل رسم الروابط) أرقامًا بدل النصوص.
+"""
+
+import math
+import hashlib
+
+# أنماط مجموعات الروابط
+MODE_EXACT = 'exact'
+MODE_BLOOM = 'bloom'
+
+_MASK_64 = (1 << 64) - 1
+
+
+def url_fingerprint(url):
+    """
+    بصمة رقمية من 64 بت للرابط (احتمال التصادم مهمل حتى مع ملايين الروابط)
+
+    Args:
+        url (str): الرابط
+
+    Returns:
+        int: البصمة
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+
+
+def _bloom_hashes(url):
+    """قيمتا التجزئة المستخدمتان لاشتقاق مواقع البتات (التجزئة المزدوجة)"""
+    value = int.from_bytes(hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=16).digest(), 'little')
+    # القيمة الثانية فردية حتى تمر المواقع على جميع البتات
+    return value & _MASK_64, (value >> 64) | 1
+
+
+class BloomFilter:
+    """
+    مرشح Bloom بسعة ثابتة
+    """
+
+    def __init__(self, capacity, error_rate):
+        """
+        Args:
+            capacity (int): عدد العناصر المتوقع
+            error_rate (float): نسبة الإيجابيات الكاذبة عند امتلاء المرشح
+        """
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(64, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, hashes):
+        # تصغير القيمتين أولًا حتى تبقى العمليات على أعداد صغيرة (أسرع من أعداد 64 بت)
+        num_bits = self.num_bits
+        position = hashes[0] % num_bits
+        step = hashes[1] % num_bits
+        positions = [position]
+        for _ in range(self.num_hashes - 1):
+            position += step
+            if position >= num_bits:
+                position -= num_bits
+            positions.append(position)
+        return positions
+
+    def contains(self, hashes):
+        """التحقق من وجود عنصر (بقيم تجزئته)"""
+        bits = self.bits
+        for position in self._positions(hashes):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, hashes):
+        """
+        إضافة عنصر (بقيم تجزئته) مع التحقق من وجوده في المرور نفسه
+
+        Returns:
+            bool: True إذا تغير أي بت (العنصر جديد)
+        """
+        bits = self.bits
+        added = False
+        for position in self._positions(hashes):
+            index = position >> 3
+            mask = 1 << (position & 7)
+            if not bits[index] & mask:
+                bits[index] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+
+class ScalableBloomFilter:
+    """
+    مرشح Bloom يتوسع تلقائيًا بإضافة طبقات أكبر مع الحفاظ على نسبة الخطأ الإجمالية
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001, growth=2, tightening=0.5):
+        """
+        Args:
+            capacity (int): سعة الطبقة الأولى
+            error_rate (float): الحد الأعلى لنسبة الإيجابيات الكاذبة الإجمالية
+            growth (int): معامل نمو سعة كل طبقة جديدة
+            tightening (float): معامل تقليص نسبة خطأ كل طبقة جديدة
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError(f"نسبة الخطأ يجب أن تكون بين 0 و1: {error_rate}")
+
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        # مجموع نسب أخطاء الطبقات (متسلسلة هندسية) لا يتجاوز error_rate
+        self.filters = [BloomFilter(capacity, error_rate * (1 - tightening))]
+
+    def __len__(self):
+        return sum(layer.count for layer in self.filters)
+
+    def __contains__(self, url):
+        hashes = _bloom_hashes(url)
+        return any(layer.contains(hashes) for layer in self.filters)
+
+    def add(self, url):
+        """
+        إضافة رابط
+
+        Returns:
+            bool: True إذا كان الرابط جديدًا (False إذا كان موجودًا أو إيجابيًا كاذبًا)
+        """
+        layer = self.filters[-1]
+        if layer.count >= layer.capacity:
+            layer = BloomFilter(layer.capacity * self.growth, layer.error_rate * self.tightening)
+            self.filters.append(layer)
+
+        hashes = _bloom_hashes(url)
+        for full_layer in self.filters[:-1]:
+            if full_layer.contains(hashes):
+                return False
+        return layer.add(hashes)
+
+    @property
+    def size_bytes(self):
+        """حجم البتات في الذاكرة"""
+        return sum(len(layer.bits) for layer in self.filters)
+
+
+class URLSet:
+    """
+    مجموعة روابط مضغوطة (بديل set لنصوص الروابط)
+
+    في الوضع bloom قد تُعتبر روابط جديدة موجودة بنسبة error_rate، فيتخطاها الزاحف.
+    """
+
+    def __init__(self, mode=MODE_EXACT, capacity=100000, error_rate=0.001):
+        """
+        Args:
+            mode (str): 'exact' (بصمات 64 بت) أو 'bloom' (مرشح Bloom قابل للتوسع)
+            capacity (int): السعة الأولية لمرشح Bloom
+            error_rate (float): نسبة الإيجابيات الكاذبة لمرشح Bloom
+        """
+        if mode not in (MODE_EXACT, MODE_BLOOM):
+            raise ValueError(f"نمط مجموعة الروابط غير مدعوم: {mode}")
+
+        self.mode = mode
+        if mode == MODE_EXACT:
+            self._fingerprints = set()
+        else:
+            self._bloom = ScalableBloomFilter(capacity, error_rate)
+            # الروابط المحذوفة من المرشح (إعادة المحاولة بعد 429/503 فقط، فهي قليلة)
+            self._removed = set()
+            self._size = 0
+
+    def __len__(self):
+        if self.mode == MODE_EXACT:
+            return len(self._fingerprints)
+        return self._size
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __contains__(self, url):
+        if self.mode == MODE_EXACT:
+            return url_fingerprint(url) in self._fingerprints
+        return url not in self._removed and url in self._bloom
+
+    def add(self, url):
+        """
+        إضافة رابط
+
+        Returns:
+            bool: True إذا كان الرابط جديدًا
+        """
+        if self.mode == MODE_EXACT:
+            fingerprint = url_fingerprint(url)
+            if fingerprint in self._fingerprints:
+                return False
+            self._fingerprints.add(fingerprint)
+            return True
+
+        if url in self._removed:
+            self._removed.discard(url)
+            self._size += 1
+            return True
+        if self._bloom.add(url):
+            self._size += 1
+            return True
+        return False
+
+    def update(self, urls):
+        """إضافة مجموعة روابط"""
+        for url in urls:
+            self.add(url)
+
+    def discard(self, url):
+        """حذف رابط إذا كان موجودًا"""
+        if self.mode == MODE_EXACT:
+            self._fingerprints.discard(url_fingerprint(url))
+        elif url in self:
+            self._removed.add(url)
+            self._size -= 1
+
+
+class URLRegistry:
+    """
+    سجل روابط عملية زحف واحدة: معرفات رقمية متسلسلة للروابط ومجموعات مضغوطة بنفس الإعدادات
+    """
+
+    def __init__(self, mode=MODE_EXACT, capacity=100000, error_rate=0.001):
+        """
+        Args:
+            mode (str): نمط مجموعات الروابط: 'exact' أو 'bloom'
+            capacity (int): السعة الأولية لمرشحات Bloom
+            error_rate (float): نسبة الإيجابيات الكاذبة لمرشحات Bloom
+        """
+        if mode not in (MODE_EXACT, MODE_BLOOM):
+            raise ValueError(f"نمط مجموعة الروابط غير مدعوم: {mode}")
+
+        self.mode = mode
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._ids = {}  # البصمة -> المعرف
+        self._urls = []  # المعرف -> الرابط (نسخة واحدة من كل نص)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        إنشاء سجل من إعدادات التطبيق (القسم crawling.url_registry)
+
+        Args:
+            config (dict): إعدادات التطبيق
+
+        Returns:
+            URLRegistry: سجل جديد لعملية زحف واحدة
+        """
+        registry_config = (config or {}).get('crawling', {}).get('url_registry', {})
+        return cls(
+            mode=registry_config.get('mode', MODE_EXACT),
+            capacity=registry_config.get('capacity', 100000),
+            error_rate=registry_config.get('error_rate', 0.001)
+        )
+
+    def new_set(self):
+        """
+        مجموعة روابط فارغة بإعدادات السجل
+
+        Returns:
+            URLSet: المجموعة
+        """
+        return URLSet(self.mode, self.capacity, self.error_rate)
+
+    def __len__(self):
+        return len(self._urls)
+
+    def __contains__(self, url):
+        return url_fingerprint(url) in self._ids
+
+    def id(self, url):
+        """
+        معرف الرابط (يُسجل الرابط إذا كان جديدًا)
+
+        Args:
+            url (str): الرابط
+
+        Returns:
+            int: المعرف (من 0 بترتيب التسجيل)
+        """
+        fingerprint = url_fingerprint(url)
+        url_id = self._ids.get(fingerprint)
+        if url_id is None:
+            url_id = len(self._urls)
+            self._ids[fingerprint] = url_id
+            self._urls.append(url)
+        return url_id
+
+    def get(self, url):
+        """
+        معرف رابط مسجل
+
+        Returns:
+            int or None: المعرف، أو None إذا لم يكن الرابط مسجلًا
+        """
+        return self._ids.get(url_fingerprint(url))
+
+    def url(self, url_id):
+        """
+        الرابط المقابل لمعرف
+
+        Args:
+            url_id (int): المعرف
+
+        Returns:
+            str: الرابط
+        """
+        return self._urls[url_id]
@@ -30,10 +30,16 @@ if sys.stdout.encoding != 'utf-8':
 # استيراد الوحدات الداخلية
 from modules.analyzer import SEOAnalyzer
 from modules.crawler import WebCrawler
-from modules.page_speed import PageSpeedAnalyzer
-from modules.content_analyzer import ContentAnalyzer
-from modules.image_optimizer import ImageOptimizer
-from modules.link_checker import LinkChecker
+from modules.http_cache import HTTPCache
+from modules.crawl_scheduler import CrawlScheduler
+from modules.crawl_checkpoint import CrawlCheckpoint, CheckpointNotFound
+from modules.page_store import PageStore
+from modules.parsed_page import configure_parser
+from modules.url_registry import URLRegistry
+from modules.results_table import ResultsTable
+from modules.distributed_crawl import run_worker
+from modules.link_checker import LinkChecker, LinkStatusCache
+from modules.analysis_executor import AnalysisExecutor
 from modules.seo_fixer import SEOFixer
 from modules.report_generator import ReportGenerator
 from modules.wp_integration import WordPressIntegration
@@ -55,6 +61,7 @@ logger = get_logger("rseo")
 # تحميل ملف الإعدادات
 config_loader = ConfigLoader()
 config = config_loader.get_all()
+configure_parser(config)
 
 def print_safe(text):
     """
@@ -103,8 +110,11 @@ def cli():
 @click.option('--password', help='كلمة المرور لـ WordPress')
 @click.option('--auto-fix', is_flag=True, help='إصلاح مشاكل السيو تلقائياً عند اكتشافها')
 @click.option('--output-dir', default='results', help='مسار حفظ نتائج التحليل')
+@click.option('--sitemaps', is_flag=True, help='إضافة صفحات خرائط الموقع (sitemap.xml) إلى الزحف')
+@click.option('--resume', 'resume_id', help='استئناف عملية زحف متوقفة بمعرفها')
 @click.option('--verbose', '-v', is_flag=True, help='طباعة معلومات تفصيلية أثناء التنفيذ')
-def analyze(url, single_page, depth, export, wp_api, username, password, auto_fix, output_dir, verbose):
+def analyze(url, single_page, depth, export, wp_api, username, password, auto_fix, output_dir, sitemaps, resume_id,
+            verbose):
     """تحليل موقع ويب للكشف عن مشاكل السيو وتقديم التوصيات"""
     try:
         start_time = time.time()
@@ -147,29 +157,47 @@ def analyze(url, single_page, depth, export, wp_api, username, password, auto_fi
         delay = config.get('crawling', {}).get('delay_seconds', 1)
         respect_robots = config.get('crawling', {}).get('respect_robots_txt', True)
         
+        # نقطة حفظ دورية لاستئناف الزحف بعد الانقطاع
+        try:
+            checkpoint = CrawlCheckpoint.from_config(config, crawl_id=resume_id)
+        except CheckpointNotFound as e:
+            click.echo(f"{Fore.RED}{str(e)}{Style.RESET_ALL}")
+            return
+        if checkpoint is not None and checkpoint.resumed and checkpoint.start_url != url:
+            click.echo(f"{Fore.RED}عملية الزحف {resume_id} خاصة بالموقع {checkpoint.start_url}{Style.RESET_ALL}")
+            return
+        
         crawler = WebCrawler(
             start_url=url,
             max_pages=max_pages,
             max_depth=depth,
             delay=delay,
             respect_robots_txt=respect_robots,
-            verbose=verbose
+            verbose=verbose,
+            frontier_priority=config.get('crawling', {}).get('frontier_priority'),
+            http_cache=HTTPCache.from_config(config),
+            scheduler=CrawlScheduler.from_config(config),
+            seed_from_sitemaps=sitemaps or config.get('crawling', {}).get('seed_from_sitemaps', False),
+            checkpoint=checkpoint,
+            url_registry=URLRegistry.from_config(config),
+            max_body_bytes=config.get('crawling', {}).get('max_body_bytes', 10 * 1024 * 1024)
         )
-        
-        # بدء الزحف
-        click.echo(f"{Fore.YELLOW}جاري زحف الموقع...{Style.RESET_ALL}")
-        pages = crawler.crawl()
-        
-        if not pages:
-            click.echo(f"{Fore.RED}لم يتم العثور على أي صفحات للتحليل.{Style.RESET_ALL}")
-            return
+        if checkpoint is not None:
+            click.echo(f"{Fore.CYAN}معرف الزحف: {checkpoint.crawl_id} (للاستئناف: --resume {checkpoint.crawl_id}){Style.RESET_ALL}")
         
         # تحليل السيو لكل صفحة
         seo_analyzer = SEOAnalyzer(config=config)
-        page_speed_analyzer = PageSpeedAnalyzer()
-        content_analyzer = ContentAnalyzer()
-        image_optimizer = ImageOptimizer()
-        link_checker = LinkChecker()
+        link_settings = config.get('link_checking', {})
+        link_checker = LinkChecker(
+            max_workers=link_settings.get('max_workers', 5),
+            engine=link_settings.get('engine', 'async'),
+            max_concurrent=link_settings.get('max_concurrent', 100),
+            max_per_host=link_settings.get('max_per_host', 8),
+            cache=LinkStatusCache(
+                max_size=link_settings.get('cache_size', 10000),
+                ttl=link_settings.get('cache_ttl', 3600)
+            )
+        )
         
         # إعداد تكامل ووردبريس إذا تم تحديده
         if wp_api:
@@ -183,54 +211,72 @@ def analyze(url, single_page, depth, export, wp_api, username, password, auto_fi
                 password=password
             )
         
-        # تحليل كل صفحة تم العثور عليها
-        results = {}
-        click.echo(f"{Fore.YELLOW}جاري تحليل {len(pages)} صفحة...{Style.RESET_ALL}")
+        # بدء الزحف والتحليل معًا: تُحلل كل صفحة فور جلبها ثم يُحرر محتواها
+        click.echo(f"{Fore.YELLOW}جاري زحف الموقع وتحليل الصفحات...{Style.RESET_ALL}")
+        # نتائج الصفحات المكتملة قبل الاستئناف
+        results = dict(checkpoint.results) if checkpoint is not None else {}
         
-        for page_url, page_data in tqdm(pages.items(), desc="تحليل الصفحات"):
-            page_result = {}
-            
-            try:
-                # تحليل السيو الأساسي
-                page_result['basic_seo'] = seo_analyzer.analyze_page(page_data)
-                
-                # تحليل سرعة الصفحة
+        # تحليل الصفحات بالتوازي على مجمع عمليات مع استلام النتائج بالترتيب
+        executor = AnalysisExecutor(
+            config=config,
+            steps=('basic_seo', 'page_speed', 'content', 'images', 'links'),
+            link_checker=link_checker
+        )
+        pages = executor.map(crawler.iter_pages(), release_pages=True)
+        
+        try:
+            for page_url, page_result in tqdm(pages, total=max_pages, initial=len(results), desc="تحليل الصفحات"):
                 try:
-                    page_result['page_speed'] = page_speed_analyzer.analyze(page_url)
-                except Exception as e:
-                    logger.warning(f"فشل تحليل سرعة الصفحة {page_url}: {str(e)}")
-                    page_result['page_speed'] = {'score': 0, 'error': str(e)}
-                
-                # تحليل المحتوى
-                page_result['content'] = content_analyzer.analyze(page_data)
-                
-                # تحليل الصور
-                page_result['images'] = image_optimizer.analyze_images(page_data)
-                
-                # تحليل الروابط
-                page_result['links'] = link_checker.check_links(page_data)
-                
-                # حساب النتيجة الإجمالية
-                page_result['score'] = seo_analyzer.calculate_overall_score(page_result)
-                
-                # الحفظ في النتائج
-                results[page_url] = page_result
-                
-                # إصلاح تلقائي إذا تم تفعيله
-                if auto_fix:
-                    seo_fixer = SEOFixer(config=config)
-                    fixes = seo_fixer.fix_issues(page_url, page_result)
-                    page_result['fixes'] = fixes
+                    if 'error' in page_result:
+                        raise RuntimeError(page_result['error'])
+                    
+                    # سرعة الصفحة غير متاحة (مثل فشل طلب API)
+                    page_result.setdefault('page_speed', {'score': 0, 'error': 'فشل تحليل سرعة الصفحة'})
                     
-                    # تطبيق التغييرات على ووردبريس إذا تم تحديده
-                    if wp_api:
-                        wp_integration.apply_fixes(page_url, fixes)
+                    # حساب النتيجة الإجمالية
+                    page_result['score'] = seo_analyzer.calculate_overall_score(page_result)
+                    
+                    # الحفظ في النتائج
+                    results[page_url] = page_result
+                    
+                    # إصلاح تلقائي إذا تم تفعيله
+                    if auto_fix:
+                        seo_fixer = SEOFixer(config=config)
+                        fixes = seo_fixer.fix_issues(page_url, page_result)
+                        page_result['fixes'] = fixes
+                        
+                        # تطبيق التغييرات على ووردبريس إذا تم تحديده
+                        if wp_api:
+                            wp_integration.apply_fixes(page_url, fixes)
+                        
+                    if checkpoint is not None:
+                        checkpoint.add_result(page_url, page_result)
+                
+                except Exception as e:
+                    logger.error(f"فشل تحليل الصفحة {page_url}: {str(e)}")
+                    click.echo(f"{Fore.RED}فشل تحليل الصفحة {page_url}: {str(e)}{Style.RESET_ALL}")
+                    # إضافة معلومات الخطأ للنتائج
+                    results[page_url] = {'error': str(e)}
             
-            except Exception as e:
-                logger.error(f"فشل تحليل الصفحة {page_url}: {str(e)}")
-                click.echo(f"{Fore.RED}فشل تحليل الصفحة {page_url}: {str(e)}{Style.RESET_ALL}")
-                # إضافة معلومات الخطأ للنتائج
-                results[page_url] = {'error': str(e)}
+            # الزحف انتهى دون انقطاع (حالة الزاحف حُفظت عند انتهاء iter_pages)
+            if checkpoint is not None:
+                checkpoint.complete()
+        
+        finally:
+            # حفظ آخر النتائج وحالة الزاحف حتى عند التوقف (مثل Ctrl+C)
+            pages.close()
+            executor.close()
+            link_checker.close()
+            if checkpoint is not None:
+                checkpoint.flush()
+                checkpoint.close()
+        
+        if not results:
+            click.echo(f"{Fore.RED}لم يتم العثور على أي صفحات للتحليل.{Style.RESET_ALL}")
+            return
+        
+        # جدول النتائج العمودي: تُحسب منه إحصائيات التقارير والملخص مرة واحدة
+        results_table = ResultsTable.from_results(results)
         
         # توليد التقرير
         report_generator = ReportGenerator(config=config)
@@ -245,7 +291,7 @@ def analyze(url, single_page, depth, export, wp_api, username, password, auto_fi
             if export == 'pdf' or export == 'all':
                 pdf_path = os.path.join(results_dir, 'seo_report.pdf')
                 try:
-                    report_generator.generate_pdf(results, pdf_path)
+                    report_generator.generate_pdf(results, pdf_path, table=results_table)
                     click.echo(f"{Fore.GREEN}تم إنشاء تقرير PDF: {pdf_path}{Style.RESET_ALL}")
                 except Exception as e:
                     logger.error(f"فشل إنشاء تقرير PDF: {str(e)}")
@@ -254,21 +300,16 @@ def analyze(url, single_page, depth, export, wp_api, username, password, auto_fi
             if export == 'html' or export == 'all':
                 html_path = os.path.join(results_dir, 'seo_report.html')
                 try:
-                    report_generator.generate_html(results, html_path)
+                    report_generator.generate_html(results, html_path, table=results_table)
                     click.echo(f"{Fore.GREEN}تم إنشاء تقرير HTML: {html_path}{Style.RESET_ALL}")
                 except Exception as e:
                     logger.error(f"فشل إنشاء تقرير HTML: {str(e)}")
                     click.echo(f"{Fore.RED}فشل إنشاء تقرير HTML: {str(e)}{Style.RESET_ALL}")
         
-        # عرض ملخص النتائج
-        valid_results = {k: v for k, v in results.items() if 'error' not in v}
-        total_issues = sum(len(page.get('basic_seo', {}).get('issues', [])) for page in valid_results.values())
+        # عرض ملخص النتائج (الصفحات التي فشل تحليلها مستبعدة)
+        total_issues = results_table.total('basic_issues', valid_only=True)
+        avg_score = results_table.mean('score', valid_only=True)
         
-        if valid_results:
-            avg_score = sum(page.get('score', 0) for page in valid_results.values()) / len(valid_results)
-        else:
-            avg_score = 0
-            
         print("\n" + "=" * 60)
         print_safe(f"{Fore.CYAN}✅ اكتمل التحليل!{Style.RESET_ALL}")
         print_safe(f"📊 تم تحليل {len(results)} صفحة")
@@ -353,7 +394,8 @@ def sitemap(url, output, changefreq, priority):
             max_pages=config.get('crawling', {}).get('max_pages', 100),
             max_depth=config.get('crawling', {}).get('max_depth', 3),
             delay=config.get('crawling', {}).get('delay_seconds', 1),
-            respect_robots_txt=config.get('crawling', {}).get('respect_robots_txt', True)
+            respect_robots_txt=config.get('crawling', {}).get('respect_robots_txt', True),
+            page_store=PageStore.from_config(config)
         )
         
         # بدء الزحف
@@ -366,6 +408,8 @@ def sitemap(url, output, changefreq, priority):
         # إنشاء خريطة الموقع
         click.echo(f"{Fore.YELLOW}جاري إنشاء خريطة الموقع...{Style.RESET_ALL}")
         sitemap_path = seo_fixer.generate_sitemap(url, list(pages.keys()), output, changefreq, priority)
+        if crawler.page_store is not None:
+            crawler.page_store.close()
         
         click.echo(f"{Fore.GREEN}✅ تم إنشاء خريطة الموقع: {sitemap_path}{Style.RESET_ALL}")
     
@@ -373,6 +417,23 @@ def sitemap(url, output, changefreq, priority):
         logger.error(f"خطأ غير متوقع أثناء إنشاء خريطة الموقع: {str(e)}")
         click.echo(f"{Fore.RED}خطأ غير متوقع أثناء إنشاء خريطة الموقع: {str(e)}{Style.RESET_ALL}")
 
+@cli.command('crawl-worker')
+@click.option('--db', 'db_path', default=None, help='مسار قاعدة بيانات الزحف الموزع المشتركة (على قرص محلي، لا يدعم أنظمة الملفات الشبكية)')
+@click.option('--crawl-id', required=True, help='معرف عملية الزحف الموزع')
+@click.option('--shard', required=True, type=int, help='رقم جزء قائمة الانتظار الذي يتولاه العامل')
+def crawl_worker(db_path, crawl_id, shard):
+    """تشغيل عامل زحف ينضم إلى عملية زحف موزعة (من عملية أو حاوية على الجهاز نفسه تشترك في مجلد القاعدة المحلي)"""
+    try:
+        db_path = db_path or config.get('crawling', {}).get('distributed', {}).get('db_path',
+                                                                                    'data/distributed_crawl.db')
+        click.echo(f"{Fore.YELLOW}العامل {shard} ينضم إلى الزحف {crawl_id}...{Style.RESET_ALL}")
+        fetched = run_worker(db_path, crawl_id, shard)
+        click.echo(f"{Fore.GREEN}✅ انتهى العامل: تم جلب {fetched} صفحة{Style.RESET_ALL}")
+    
+    except Exception as e:
+        logger.error(f"خطأ غير متوقع في عامل الزحف: {str(e)}")
+        click.echo(f"{Fore.RED}خطأ غير متوقع في عامل الزحف: {str(e)}{Style.RESET_ALL}")
+
 @cli.command()
 def gui():
     """تشغيل واجهة المستخدم الرسومية (Streamlit)"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+اختبارات نقاط حفظ الزحف - الحفظ والاستئناف والإكمال وحذف العمليات القديمة
+"""
+
+import time
+import sqlite3
+
+import pytest
+
+from modules.crawl_checkpoint import CrawlCheckpoint, CheckpointNotFound, STATUS_COMPLETED
+from modules.crawler import WebCrawler
+
+SITE = 'https://example.com'
+
+
+def url(path):
+    return SITE + path
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'checkpoints.db')
+
+
+def interrupted_crawl(db_path):
+    """
+    عملية زحف انقطعت بعد حفظ: / مكتملة، و/a زيرت دون نتيجة، و/b و/c في قائمة الانتظار
+
+    Returns:
+        str: معرف العملية
+    """
+    checkpoint = CrawlCheckpoint(db_path=db_path)
+    checkpoint.start(url('/'), {'max_pages': 10, 'max_depth': 3})
+    checkpoint.add_result(url('/'), {'basic_seo': {'score': 80}})
+    checkpoint.save(frontier=[(url('/b'), 1), (url('/c'), 2)], new_visits=[(url('/'), 0), (url('/a'), 1)])
+    checkpoint.close()
+    return checkpoint.crawl_id
+
+
+def row_counts(db_path, crawl_id):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {table: conn.execute(f'SELECT COUNT(*) FROM {table} WHERE crawl_id = ?', (crawl_id,)).fetchone()[0]
+                for table in ('crawls', 'frontier', 'visited', 'results')}
+    finally:
+        conn.close()
+
+
+def test_resume_round_trip(db_path):
+    crawl_id = interrupted_crawl(db_path)
+
+    checkpoint = CrawlCheckpoint(crawl_id=crawl_id, db_path=db_path, resume=True)
+    assert checkpoint.start_url == url('/')
+    assert checkpoint.options == {'max_pages': 10, 'max_depth': 3}
+    assert checkpoint.results == {url('/'): {'basic_seo': {'score': 80}}}
+
+    done, queued = checkpoint.resume_state()
+    assert done == {url('/'): 0}
+    # الصفحة المزارة دون نتيجة تعود إلى قائمة الانتظار قبل الروابط المحفوظة
+    assert queued == [(url('/a'), 1), (url('/b'), 1), (url('/c'), 2)]
+    checkpoint.close()
+
+
+def test_crawler_restores_checkpoint(db_path):
+    crawl_id = interrupted_crawl(db_path)
+    checkpoint = CrawlCheckpoint(crawl_id=crawl_id, db_path=db_path, resume=True)
+
+    crawler = WebCrawler(url('/'), respect_robots_txt=False, user_agent='test', checkpoint=checkpoint)
+    assert crawler.resumed_pages == 1
+    assert url('/') in crawler.visited_urls
+    # الصفحة المكتملة لا تعود إلى قائمة الانتظار إذا اكتُشف رابطها من جديد
+    assert not crawler.frontier.add(url('/'), 1)
+    assert [crawler.frontier.pop() for _ in range(len(crawler.frontier))] == [
+        (url('/a'), 1), (url('/b'), 1), (url('/c'), 2)]
+    checkpoint.close()
+
+
+def test_resume_before_first_save_starts_over(db_path):
+    checkpoint = CrawlCheckpoint(db_path=db_path)
+    checkpoint.start(url('/'))
+    checkpoint.close()
+
+    resumed = CrawlCheckpoint(crawl_id=checkpoint.crawl_id, db_path=db_path, resume=True)
+    crawler = WebCrawler(url('/'), respect_robots_txt=False, user_agent='test', checkpoint=resumed)
+    assert crawler.frontier.pop() == (url('/'), 0)
+    resumed.close()
+
+
+def test_unknown_crawl_id_raises(db_path):
+    with pytest.raises(CheckpointNotFound):
+        CrawlCheckpoint(crawl_id='missing', db_path=db_path, resume=True)
+
+
+def test_complete_keeps_results_only(db_path):
+    crawl_id = interrupted_crawl(db_path)
+    checkpoint = CrawlCheckpoint(crawl_id=crawl_id, db_path=db_path, resume=True)
+    checkpoint.add_result(url('/a'), {'basic_seo': {'score': 70}})
+    checkpoint.complete()
+    # الكتابة بعد الإكمال (حفظ آخر النتائج في finally) لا تعيد حالة الزاحف
+    checkpoint.flush()
+    checkpoint.close()
+
+    assert row_counts(db_path, crawl_id) == {'crawls': 1, 'frontier': 0, 'visited': 0, 'results': 2}
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT status FROM crawls WHERE crawl_id = ?', (crawl_id,)).fetchone()[0] == STATUS_COMPLETED
+    conn.close()
+
+
+def test_prune_removes_old_crawls(db_path):
+    old_id = interrupted_crawl(db_path)
+    recent_id = interrupted_crawl(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('UPDATE crawls SET updated_at = ? WHERE crawl_id = ?', (time.time() - 8 * 86400, old_id))
+    conn.commit()
+    conn.close()
+
+    # بدون حد للعمر لا يُحذف شيء
+    CrawlCheckpoint(db_path=db_path, max_age_days=0).close()
+    assert row_counts(db_path, old_id)['crawls'] == 1
+
+    CrawlCheckpoint(db_path=db_path, max_age_days=7).close()
+    assert row_counts(db_path, old_id) == {'crawls': 0, 'frontier': 0, 'visited': 0, 'results': 0}
+    assert row_counts(db_path, recent_id) == {'crawls': 1, 'frontier': 2, 'visited': 2, 'results': 1}
+
+
+def test_prune_keeps_crawl_being_resumed(db_path):
+    crawl_id = interrupted_crawl(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('UPDATE crawls SET updated_at = ? WHERE crawl_id = ?', (time.time() - 8 * 86400, crawl_id))
+    conn.commit()
+    conn.close()
+
+    checkpoint = CrawlCheckpoint(crawl_id=crawl_id, db_path=db_path, resume=True, max_age_days=7)
+    assert url('/') in checkpoint.results
+    checkpoint.close()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+اختبارات مجدول الزحف - دلو الرموز وحد الاتصالات وRetry-After والتحكم التكيفي وCrawl-delay
+"""
+
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from modules.crawl_scheduler import CrawlScheduler, parse_retry_after, MAX_BACKOFF_DELAY
+
+URL = 'https://example.com/page'
+
+
+class FakeClock:
+    """ساعة يدوية تحل محل time.monotonic (تبدأ من قيمة كبيرة مثل الساعة الحقيقية)"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def scheduler(clock, **kwargs):
+    settings = {'delay': 0, 'max_per_host': 2}
+    settings.update(kwargs)
+    return CrawlScheduler(clock=clock, **settings)
+
+
+def limits(state):
+    return state.max_connections, state.delay
+
+
+def test_parse_retry_after_seconds_and_invalid_values():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(' 7 ') == 7.0
+    assert parse_retry_after('-5') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after(None) is None
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime(2015, 10, 21, 7, 28, tzinfo=timezone.utc).timestamp()
+    value = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert parse_retry_after(value, now=retry_at - 90) == pytest.approx(90)
+    # التاريخ الماضي لا يعني انتظارًا
+    assert parse_retry_after(value, now=retry_at + 90) == 0.0
+
+
+def test_token_bucket_burst_then_refill(clock):
+    crawl_scheduler = scheduler(clock, delay=2, burst=2, max_per_host=10)
+    crawl_scheduler.acquire(URL)
+    crawl_scheduler.acquire(URL)
+    state = crawl_scheduler.host_state(URL)
+
+    assert state.try_acquire(clock()) == (False, pytest.approx(2.0))
+    clock.advance(1)
+    assert state.try_acquire(clock()) == (False, pytest.approx(1.0))
+    clock.advance(1)
+    assert state.try_acquire(clock()) == (True, 0.0)
+    # الرموز لا تتراكم فوق حجم الدفعة مهما طال التوقف
+    clock.advance(100)
+    assert [state.try_acquire(clock())[0] for _ in range(3)] == [True, True, False]
+
+
+def test_max_per_host_blocks_until_release(clock):
+    crawl_scheduler = scheduler(clock, max_per_host=2)
+    crawl_scheduler.acquire(URL)
+    crawl_scheduler.acquire(URL)
+    state = crawl_scheduler.host_state(URL)
+    assert state.try_acquire(clock()) == (False, None)
+
+    waiting = threading.Thread(target=crawl_scheduler.acquire, args=(URL,), daemon=True)
+    waiting.start()
+    waiting.join(0.1)
+    assert waiting.is_alive()
+
+    crawl_scheduler.release(URL)
+    waiting.join(1)
+    assert not waiting.is_alive()
+    assert state.active == 2
+
+
+def test_hosts_are_limited_separately(clock):
+    crawl_scheduler = scheduler(clock, max_per_host=1)
+    crawl_scheduler.acquire(URL)
+    crawl_scheduler.acquire('https://other.example.com/')
+    assert crawl_scheduler.host_state(URL).try_acquire(clock()) == (False, None)
+
+
+def test_retry_after_blocks_host_until_expiry(clock):
+    crawl_scheduler = scheduler(clock)
+    state = crawl_scheduler.host_state(URL)
+    crawl_scheduler.record_response(URL, 429, retry_after='30')
+
+    assert state.try_acquire(clock()) == (False, pytest.approx(30))
+    clock.advance(29.5)
+    assert state.try_acquire(clock()) == (False, pytest.approx(0.5))
+    clock.advance(0.5)
+    assert state.try_acquire(clock()) == (True, 0.0)
+    # خارج الوضع التكيفي لا يتغير عدد الاتصالات ولا الفاصل
+    assert limits(state) == (2, 0)
+
+
+def test_retry_after_ignored_without_throttle_status(clock):
+    crawl_scheduler = scheduler(clock)
+    crawl_scheduler.record_response(URL, 200, retry_after='30')
+    assert crawl_scheduler.host_state(URL).try_acquire(clock()) == (True, 0.0)
+
+
+def test_retry_after_is_capped(clock):
+    crawl_scheduler = scheduler(clock, max_retry_after=10)
+    crawl_scheduler.record_response(URL, 503, retry_after=3600)
+    assert crawl_scheduler.host_state(URL).try_acquire(clock()) == (False, pytest.approx(10))
+
+
+def test_throttling_halves_connections_and_doubles_delay(clock):
+    crawl_scheduler = scheduler(clock, delay=0.2, max_per_host=8, adaptive=True)
+    state = crawl_scheduler.host_state(URL)
+
+    crawl_scheduler.record_response(URL, 503)
+    assert limits(state) == (4, 0.5)
+    # الاستجابات التي كانت قيد التنفيذ وقت التخفيض لا تخفض مرة ثانية
+    crawl_scheduler.record_response(URL, 503)
+    assert limits(state) == (4, 0.5)
+
+    observed = []
+    for status in (503, 429, 503):
+        clock.advance(1)
+        crawl_scheduler.record_response(URL, status)
+        observed.append(limits(state))
+    assert observed == [(2, 1.0), (1, 2.0), (1, 4.0)]
+
+    for _ in range(10):
+        clock.advance(1)
+        crawl_scheduler.record_response(URL, 429)
+    assert limits(state) == (1, MAX_BACKOFF_DELAY)
+
+
+def test_additive_increase_up_to_ceiling(clock):
+    crawl_scheduler = scheduler(clock, max_per_host=2, adaptive=True, max_connections_ceiling=4)
+    state = crawl_scheduler.host_state(URL)
+
+    observed = []
+    for _ in range(12):
+        crawl_scheduler.record_response(URL, 200, ttfb=0.1)
+        observed.append(state.max_connections)
+    # زيادة اتصال واحد بعد كل جولة طلبات بالعدد الحالي
+    assert observed == [2, 3, 3, 3, 4, 4, 4, 4, 4, 4, 4, 4]
+
+
+def test_delay_recovers_before_connections_grow(clock):
+    crawl_scheduler = scheduler(clock, delay=0.2, max_per_host=8, adaptive=True)
+    state = crawl_scheduler.host_state(URL)
+    for _ in range(3):
+        crawl_scheduler.record_response(URL, 503)
+        clock.advance(1)
+    assert limits(state) == (1, 2.0)
+
+    observed = []
+    for _ in range(3):
+        crawl_scheduler.record_response(URL, 200, ttfb=0.1)
+        observed.append(limits(state))
+    assert observed == [(1, 1.0), (1, 0.2), (2, 0.2)]
+
+
+def test_latency_rise_halves_connections(clock):
+    crawl_scheduler = scheduler(clock, max_per_host=4, adaptive=True)
+    state = crawl_scheduler.host_state(URL)
+    for _ in range(3):
+        crawl_scheduler.record_response(URL, 200, ttfb=0.1)
+    assert limits(state) == (4, 0)
+
+    crawl_scheduler.record_response(URL, 200, ttfb=1.0)
+    # ارتفاع زمن الاستجابة يخفض الاتصالات فقط، والفاصل يتغير عند الرفض الصريح
+    assert limits(state) == (2, 0)
+
+
+def test_non_adaptive_ignores_throttling(clock):
+    crawl_scheduler = scheduler(clock, delay=0.2, max_per_host=8)
+    crawl_scheduler.record_response(URL, 503)
+    assert limits(crawl_scheduler.host_state(URL)) == (8, 0.2)
+
+
+def test_set_crawl_delay_only_raises_delay(clock):
+    crawl_scheduler = scheduler(clock, delay=1, burst=3, max_crawl_delay=10)
+    state = crawl_scheduler.host_state(URL)
+
+    crawl_scheduler.set_crawl_delay(URL, 5)
+    assert (state.delay, state.min_delay, state.burst) == (5, 5, 1)
+    assert state.try_acquire(clock()) == (True, 0.0)
+    assert state.try_acquire(clock()) == (False, pytest.approx(5))
+
+    crawl_scheduler.set_crawl_delay(URL, 2)
+    assert state.delay == 5
+    crawl_scheduler.set_crawl_delay(URL, 3600)
+    assert (state.delay, state.min_delay) == (10, 10)
+
+
+def test_set_crawl_delay_ignored_when_disabled_or_empty(clock):
+    crawl_scheduler = scheduler(clock, delay=1, burst=3, respect_crawl_delay=False)
+    crawl_scheduler.set_crawl_delay(URL, 5)
+    state = crawl_scheduler.host_state(URL)
+    assert (state.delay, state.burst) == (1, 3)
+
+    crawl_scheduler = scheduler(clock, delay=1)
+    for value in (None, 0):
+        crawl_scheduler.set_crawl_delay(URL, value)
+    assert crawl_scheduler.host_state(URL).delay == 1
+
+
+def test_from_config_applies_host_overrides(clock):
+    config = {'crawling': {'delay_seconds': 0.5, 'politeness': {
+        'max_per_host': 3, 'hosts': {'slow.example.com': {'delay': 4, 'max_connections': 1}}}}}
+    crawl_scheduler = CrawlScheduler.from_config(config, max_per_host=None, clock=clock)
+
+    assert limits(crawl_scheduler.host_state(URL)) == (3, 0.5)
+    assert limits(crawl_scheduler.host_state('https://slow.example.com/')) == (1, 4)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+اختبارات كشف المحتوى شبه المكرر - صحة المجموعات وزمن النطاقات المشتركة بين صفحات كثيرة
+
+اختبار الزمن اختياري لأنه يعتمد على سرعة الجهاز، ويُشغل بالمتغير RSEO_BENCHMARKS=1:
+    RSEO_BENCHMARKS=1 python -m pytest tests/test_duplicate_detector.py
+"""
+
+import os
+import time
+import random
+
+import pytest
+
+from modules.duplicate_detector import DuplicateDetector, hamming_distance
+
+
+def page(simhash):
+    """نتيجة تحليل صفحة بالحد الأدنى الذي يقرؤه الكاشف"""
+    return {'basic_seo': {'content': {'simhash': f'{simhash:016x}', 'word_count': 500}}}
+
+
+def near_duplicates(simhashes, max_distance=4):
+    detector = DuplicateDetector(max_distance=max_distance)
+    for index, simhash in enumerate(simhashes):
+        detector.add(f'https://example.com/{index}', page(simhash))
+    return [group['urls'] for group in detector.report()['near_duplicates']]
+
+
+def all_pairs_clusters(simhashes, max_distance=4):
+    """المجموعات المتوقعة بمقارنة جميع الأزواج (للتحقق من نتائج النطاقات)"""
+    parent = list(range(len(simhashes)))
+
+    def find(node):
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    for node, value in enumerate(simhashes):
+        for other in range(node):
+            if hamming_distance(value, simhashes[other]) <= max_distance:
+                parent[find(node)] = find(other)
+
+    clusters = {}
+    for node in range(len(simhashes)):
+        clusters.setdefault(find(node), []).append(node)
+    return [[f'https://example.com/{node}' for node in nodes]
+            for nodes in sorted((nodes for nodes in clusters.values() if len(nodes) > 1),
+                                key=lambda nodes: (-len(nodes), nodes[0]))]
+
+
+def template_pages(count, seed=7):
+    """
+    بصمات صفحات قالب واحد: تشترك جميعها في النطاق الأول (10 بتات عند max_distance=6)،
+    وتختلف كل صفحة عن بصمة القالب في 3 بتات فلا تختلف أي صفحتين في أكثر من 6 بتات
+    """
+    rng = random.Random(seed)
+    base = rng.getrandbits(64)
+    simhashes = set()
+    while len(simhashes) < count:
+        value = base
+        for bit in rng.sample(range(10, 64), 3):
+            value ^= 1 << bit
+        simhashes.add(value)
+    return sorted(simhashes)
+
+
+def test_clusters_pages_within_max_distance():
+    base = 0x0123456789abcdef
+    groups = near_duplicates([base, base ^ 0b111, base ^ (0xffff << 40), base ^ (0xffff << 40) ^ 1])
+    assert groups == [['https://example.com/0', 'https://example.com/1'],
+                      ['https://example.com/2', 'https://example.com/3']]
+
+
+def test_chained_pages_form_one_cluster():
+    # 0 و2 يختلفان في 6 بتات لكن تربطهما الصفحة 1
+    base = 0x0f0f0f0f0f0f0f0f
+    groups = near_duplicates([base, base ^ 0b111, base ^ 0b111111])
+    assert groups == [['https://example.com/0', 'https://example.com/1', 'https://example.com/2']]
+
+
+def test_matches_all_pairs_comparison():
+    rng = random.Random(3)
+    bases = [rng.getrandbits(64) for _ in range(20)]
+    simhashes = list({base ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64))
+                      for base in bases for _ in range(15)})
+    assert near_duplicates(simhashes) == all_pairs_clusters(simhashes)
+
+
+def test_template_pages_form_one_cluster():
+    simhashes = template_pages(300)
+    groups = near_duplicates(simhashes, max_distance=6)
+    assert groups == all_pairs_clusters(simhashes, max_distance=6)
+    assert len(groups) == 1 and len(groups[0]) == len(simhashes)
+
+
+@pytest.mark.skipif(not os.environ.get('RSEO_BENCHMARKS'), reason='اختبار الزمن يُشغل بالمتغير RSEO_BENCHMARKS=1')
+def test_shared_bucket_benchmark():
+    simhashes = template_pages(10000)
+
+    started = time.perf_counter()
+    groups = near_duplicates(simhashes, max_distance=6)
+    elapsed = time.perf_counter() - started
+
+    assert len(groups) == 1 and len(groups[0]) == len(simhashes)
+    # المرور على جميع أعضاء النطاق المشترك لكل صفحة (5×10^7 خطوة في كل نطاق) يستغرق دقائق
+    assert elapsed < 10
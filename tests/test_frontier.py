@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+اختبارات حدود الزحف - ترتيب السحب في الأنماط الثلاثة وإزالة التكرار وإعادة الروابط
+"""
+
+import pytest
+
+from modules.frontier import CrawlFrontier, PRIORITY_FIFO, PRIORITY_DEPTH, PRIORITY_INLINKS
+
+
+def drain(frontier):
+    """سحب جميع الروابط مع التحقق من تطابق الحجم مع عدد المدخلات القابلة للسحب"""
+    popped = []
+    while frontier:
+        popped.append(frontier.pop())
+    assert len(frontier) == 0
+    with pytest.raises(IndexError):
+        frontier.pop()
+    return popped
+
+
+def test_fifo_pops_in_discovery_order():
+    frontier = CrawlFrontier(PRIORITY_FIFO)
+    frontier.add('/c', 2)
+    frontier.add('/a', 0)
+    frontier.add_many(['/b', '/a', '/d'], 1)
+    assert drain(frontier) == [('/c', 2), ('/a', 0), ('/b', 1), ('/d', 1)]
+
+
+def test_depth_pops_shallowest_first_then_discovery_order():
+    frontier = CrawlFrontier(PRIORITY_DEPTH)
+    for url, depth in (('/x', 2), ('/y', 0), ('/z', 1), ('/w', 0)):
+        frontier.add(url, depth)
+    assert drain(frontier) == [('/y', 0), ('/w', 0), ('/z', 1), ('/x', 2)]
+
+
+def test_inlinks_pops_most_linked_first():
+    frontier = CrawlFrontier(PRIORITY_INLINKS)
+    frontier.add('/a', 1)
+    frontier.add_many(['/b', '/c'], 2)
+    for _ in range(3):
+        frontier.add('/c', 1)
+    frontier.add('/b', 3)
+
+    assert len(frontier) == 3
+    assert frontier.inlinks == {'/a': 1, '/b': 2, '/c': 4}
+    # أقل عمق اكتُشف به الرابط، وتُتجاهل مدخلات الكومة القديمة
+    assert drain(frontier) == [('/c', 1), ('/b', 2), ('/a', 1)]
+    assert frontier.inlinks == {}
+
+
+def test_inlinks_reorders_only_when_count_doubles():
+    frontier = CrawlFrontier(PRIORITY_INLINKS)
+    frontier.add_many(['/b', '/c'], 1)
+    frontier.add('/b', 1)
+    frontier.add('/c', 1)
+    frontier.add('/c', 1)
+    # /c لديه 3 روابط لكن آخر مدخل له في الكومة بالعدد 2 مثل /b الذي اكتُشف قبله
+    assert [url for url, _ in drain(frontier)] == ['/b', '/c']
+
+
+def test_seen_urls_are_not_added_again():
+    frontier = CrawlFrontier()
+    frontier.mark_seen('/blocked')
+    assert not frontier.add('/blocked', 0)
+    assert frontier.add('/page', 0)
+    frontier.pop()
+    assert not frontier.add('/page', 1)
+    assert '/page' in frontier and not frontier
+
+
+@pytest.mark.parametrize('priority', [PRIORITY_FIFO, PRIORITY_DEPTH, PRIORITY_INLINKS])
+def test_requeue_visited_url(priority):
+    frontier = CrawlFrontier(priority)
+    frontier.add('/page', 1)
+    assert frontier.pop() == ('/page', 1)
+
+    assert frontier.requeue('/page', 1)
+    assert len(frontier) == 1
+    assert drain(frontier) == [('/page', 1)]
+
+
+def test_requeue_pending_url_in_inlinks_mode():
+    frontier = CrawlFrontier(PRIORITY_INLINKS)
+    frontier.add('/page', 2)
+    frontier.add('/other', 1)
+
+    assert not frontier.requeue('/page', 1)
+    assert len(frontier) == 2
+    assert sorted(frontier.pending()) == [('/other', 1), ('/page', 1)]
+    assert sorted(drain(frontier)) == [('/other', 1), ('/page', 1)]
+
+
+def test_pending_lists_queued_urls():
+    for priority in (PRIORITY_FIFO, PRIORITY_DEPTH, PRIORITY_INLINKS):
+        frontier = CrawlFrontier(priority)
+        frontier.add_many(['/a', '/b', '/c'], 1)
+        frontier.pop()
+        assert len(frontier.pending()) == 2
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        CrawlFrontier('random')
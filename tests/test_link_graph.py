@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+اختبارات رسم الروابط الداخلية - PageRank وعمق النقرات والصفحات اليتيمة والمسدودة
+"""
+
+import pytest
+
+from modules.link_graph import LinkGraph
+
+SITE = 'https://example.com'
+
+# روابط كل صفحة مزحوفة: /e غير مزحوفة، /f لا يصل إليها رابط، /g بلا روابط،
+# ومنها رابط إلى الصفحة نفسها ورابط مكرر
+LINKS = {
+    '/': ['/a', '/b', '/g', '/'],
+    '/a': ['/b', '/c', '/b'],
+    '/b': ['/'],
+    '/c': ['/d'],
+    '/d': ['/e'],
+    '/f': ['/'],
+    '/g': [],
+}
+SITEMAP = ['/b', '/e', '/s1']
+
+
+def url(path):
+    return SITE + path
+
+
+def build(complete=False):
+    graph = LinkGraph(url('/'), max_click_depth=2)
+    for path, links in LINKS.items():
+        graph.add_page(url(path), [url(link) for link in links])
+    for path in SITEMAP:
+        graph.add_sitemap_url(url(path))
+    graph.complete = complete
+    return graph
+
+
+def reference_pagerank(damping=0.85, iterations=200):
+    """PageRank بتكرار مباشر على قوائم الروابط (للتحقق من نتائج CSR)"""
+    pages = list(LINKS)
+    links = {page: {link for link in LINKS[page] if link in LINKS and link != page} for page in pages}
+    rank = {page: 1 / len(pages) for page in pages}
+    for _ in range(iterations):
+        dangling = sum(rank[page] for page in pages if not links[page])
+        updated = {page: (1 - damping) / len(pages) + damping * dangling / len(pages) for page in pages}
+        for page in pages:
+            for link in links[page]:
+                updated[link] += damping * rank[page] / len(links[page])
+        rank = updated
+    return rank
+
+
+def test_pagerank_matches_reference():
+    metrics = build().page_metrics()
+    expected = reference_pagerank()
+    for path, value in expected.items():
+        assert metrics[url(path)]['pagerank'] == pytest.approx(value, abs=1e-5)
+    assert sum(page['pagerank'] for page in metrics.values()) == pytest.approx(1, abs=1e-4)
+
+
+def test_top_pages_order():
+    top = [page['url'] for page in build().report(top=3)['top_pages']]
+    assert top == [url('/'), url('/b'), url('/d')]
+
+
+def test_click_depth():
+    graph = build()
+    metrics = graph.page_metrics()
+    assert {path: metrics[url(path)]['click_depth'] for path in LINKS} == {
+        '/': 0, '/a': 1, '/b': 1, '/g': 1, '/c': 2, '/d': 3, '/f': None}
+
+    report = graph.report()
+    assert report['click_depth_distribution'] == {0: 1, 1: 3, 2: 1, 3: 1}
+    assert report['deep_pages'] == [url('/d')]
+    assert report['unreachable_pages'] == [url('/f')]
+
+
+def test_links_counts_ignore_self_and_duplicate_links():
+    graph = build()
+    metrics = graph.page_metrics()
+    assert metrics[url('/')]['outlinks'] == 3
+    assert metrics[url('/')]['inlinks'] == 2
+    assert metrics[url('/a')]['outlinks'] == 2
+    # الروابط إلى صفحات غير مزحوفة تُحسب في outlinks
+    assert metrics[url('/d')]['outlinks'] == 1
+    assert graph.report()['links_count'] == 9
+
+
+def test_dead_ends():
+    graph = build()
+    assert graph.report()['dead_end_pages'] == [url('/g')]
+    assert [path for path in LINKS if graph.page_metrics()[url(path)]['dead_end']] == ['/g']
+
+
+def test_orphans_include_unlinked_sitemap_urls_when_complete():
+    graph = build(complete=True)
+    # /b و/e في خريطة الموقع لكن يصل إليهما رابط، والصفحة الرئيسية لا تُعد يتيمة
+    assert graph.report()['orphan_pages'] == [url('/f'), url('/s1')]
+    assert [path for path in LINKS if graph.page_metrics()[url(path)]['orphan']] == ['/f']
+
+
+def test_sitemap_orphans_skipped_when_crawl_incomplete():
+    graph = build(complete=False)
+    assert graph.report()['complete'] is False
+    assert graph.report()['orphan_pages'] == [url('/f')]
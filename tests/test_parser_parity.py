@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+اختبارات تطابق محركات التحليل - تغيير parsing.backend لا يغير نتائج المحللات
+
+تُحلل كل صفحة من tests/fixtures بكل محرك، وتُقارن نتائج المحللات الست التي
+تقرأ الصفحة المحللة بنتائجها مع html.parser. لا تُرسل أي طلبات شبكة: حالة
+robots.txt وsitemap.xml وحالات الروابط وأحجام الصور ثابتة.
+"""
+
+import os
+import glob
+import pytest
+import requests
+from io import BytesIO
+from PIL import Image
+from bs4.builder import builder_registry
+
+from modules.parsed_page import (PARSER_BACKENDS, DEFAULT_PARSER_BACKEND, ParsedPage,
+                                 configure_parser, set_parser_backend)
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', '*.html')))
+PAGE_URL = 'https://example.com/guide/seo'
+
+
+def _seo_analyzer(page):
+    from modules.analyzer import SEOAnalyzer
+    from modules.site_info import SiteInfoCache
+
+    site_cache = SiteInfoCache()
+    site_cache.store_robots(PAGE_URL, 200, 'User-agent: *\nSitemap: https://example.com/sitemap.xml')
+    info, _ = site_cache.get(PAGE_URL)
+    info.sitemap_status = 200
+    info.sitemap_fetched = True
+    return SEOAnalyzer(site_cache=site_cache).analyze_page(page)
+
+
+def _content_analyzer(page):
+    pytest.importorskip('spacy')
+    from modules.content_analyzer import ContentAnalyzer
+    return ContentAnalyzer().analyze(page)
+
+
+def _link_checker(page):
+    from modules.link_checker import LinkChecker
+
+    with LinkChecker(engine='threads') as checker:
+        checker._check_link_status = lambda url: {'status': 'ok', 'status_code': 200}
+        return checker.check_links(page)
+
+
+def _image_optimizer(page):
+    from modules.image_optimizer import ImageOptimizer
+
+    def offline(src, **kwargs):
+        # صورة PNG ثابتة بأبعاد تعتمد على الرابط بدل تحميل الصورة
+        image = BytesIO()
+        Image.new('RGB', (60 + len(src) % 7 * 40, 80)).save(image, 'PNG')
+        response = requests.Response()
+        response.status_code = 200
+        response._content = image.getvalue()
+        return response
+
+    optimizer = ImageOptimizer()
+    optimizer.session.get = offline
+    return optimizer.analyze_images(page)
+
+
+def _eeat_analyzer(page):
+    from modules.eeat_analyzer import EEATAnalyzer
+    return EEATAnalyzer().analyze(PAGE_URL, parsed_page=page)
+
+
+def _schema_analyzer(page):
+    from modules.schema_analyzer import SchemaAnalyzer
+    return SchemaAnalyzer().analyze(PAGE_URL, parsed_page=page)
+
+
+ANALYZERS = {
+    'analyzer': _seo_analyzer,
+    'content_analyzer': _content_analyzer,
+    'link_checker': _link_checker,
+    'image_optimizer': _image_optimizer,
+    'eeat_analyzer': _eeat_analyzer,
+    'schema_analyzer': _schema_analyzer,
+}
+
+
+@pytest.fixture(autouse=True)
+def default_backend():
+    """إعادة المحرك الافتراضي بعد كل اختبار (المحرك متغير على مستوى الوحدة)"""
+    yield
+    set_parser_backend(DEFAULT_PARSER_BACKEND)
+
+
+def analyze(analyzer, backend, fixture):
+    """نتيجة محلل لصفحة الاختبار بمحرك تحليل محدد"""
+    if builder_registry.lookup(PARSER_BACKENDS[backend]) is None:
+        pytest.skip(f"مكتبة محرك التحليل {PARSER_BACKENDS[backend]} غير مثبتة")
+    assert set_parser_backend(backend) == PARSER_BACKENDS[backend]
+
+    with open(fixture, encoding='utf-8') as f:
+        page = ParsedPage(PAGE_URL, f.read(), {'url': PAGE_URL})
+    return ANALYZERS[analyzer](page)
+
+
+@pytest.mark.parametrize('analyzer', ANALYZERS)
+@pytest.mark.parametrize('fixture', FIXTURES, ids=os.path.basename)
+@pytest.mark.parametrize('backend', [backend for backend in PARSER_BACKENDS if backend != DEFAULT_PARSER_BACKEND])
+def test_backend_matches_html_parser(backend, fixture, analyzer):
+    expected = analyze(analyzer, DEFAULT_PARSER_BACKEND, fixture)
+    assert analyze(analyzer, backend, fixture) == expected
+
+
+def test_fixtures_exercise_analyzers():
+    # نتائج غير فارغة، حتى لا يتطابق محركان لأن الصفحة لم تُقرأ أصلًا
+    result = analyze('analyzer', DEFAULT_PARSER_BACKEND, FIXTURES[0])
+    assert result['status'] == 'success'
+    assert result['headings']['counts']['h1'] == 1
+    assert result['structured_data']['count'] == 3
+    assert analyze('link_checker', DEFAULT_PARSER_BACKEND, FIXTURES[0])['total_links'] > 0
+    assert analyze('image_optimizer', DEFAULT_PARSER_BACKEND, FIXTURES[0])['total_images'] == 4
+
+
+def test_unsupported_backend_is_rejected():
+    with pytest.raises(ValueError, match='selectolax'):
+        configure_parser({'parsing': {'backend': 'selectolax'}})
+
+
+def test_unknown_backend_falls_back_to_html_parser():
+    assert set_parser_backend('no-such-parser') == PARSER_BACKENDS[DEFAULT_PARSER_BACKEND]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+اختبارات مطابقة robots.txt - أسبقية القواعد والرموز واختيار مجموعة الزاحف
+"""
+
+from modules.robots_matcher import RobotsMatcher
+
+SITE = 'https://example.com'
+
+
+def matcher(*lines, user_agent='RSEO'):
+    return RobotsMatcher('\n'.join(lines), user_agent)
+
+
+def test_allow_wins_tie_with_disallow():
+    robots = matcher('User-agent: *', 'Disallow: /page', 'Allow: /page')
+    assert robots.is_allowed(f'{SITE}/page')
+    assert robots.is_allowed(f'{SITE}/page/child')
+
+
+def test_longest_match_wins():
+    robots = matcher('User-agent: *', 'Disallow: /folder', 'Allow: /folder/public')
+    assert robots.is_allowed(f'{SITE}/folder/public/page')
+    assert not robots.is_allowed(f'{SITE}/folder/private')
+    assert robots.is_allowed(f'{SITE}/other')
+
+
+def test_dollar_anchors_end_of_path():
+    robots = matcher('User-agent: *', 'Disallow: /p$')
+    assert not robots.is_allowed(f'{SITE}/p')
+    assert robots.is_allowed(f'{SITE}/pa')
+    assert robots.is_allowed(f'{SITE}/p?sort=asc')
+
+
+def test_wildcard_extension_with_query_string():
+    robots = matcher('User-agent: *', 'Disallow: /*.gif$')
+    assert not robots.is_allowed(f'{SITE}/images/logo.gif')
+    # الاستعلام جزء من المسار المطابق، فلا ينتهي المسار بـ .gif
+    assert robots.is_allowed(f'{SITE}/images/logo.gif?v=2')
+    assert robots.is_allowed(f'{SITE}/images/logo.gifs')
+
+
+def test_falls_back_to_star_group():
+    robots = matcher('User-agent: Googlebot', 'Disallow: /google-only',
+                     '', 'User-agent: *', 'Disallow: /private', 'Crawl-delay: 2')
+    assert robots.is_allowed(f'{SITE}/google-only')
+    assert not robots.is_allowed(f'{SITE}/private')
+    assert robots.crawl_delay == 2
+
+
+def test_specific_group_replaces_star_group():
+    robots = matcher('User-agent: *', 'Disallow: /',
+                     '', 'User-agent: Googlebot', 'User-agent: RSEO', 'Disallow: /admin', 'Crawl-delay: 5')
+    assert robots.is_allowed(f'{SITE}/blog')
+    assert not robots.is_allowed(f'{SITE}/admin/users')
+    assert robots.crawl_delay == 5
+
+
+def test_robots_txt_and_empty_disallow_are_allowed():
+    assert matcher('User-agent: *', 'Disallow: /').is_allowed(f'{SITE}/robots.txt')
+    robots = matcher('User-agent: *', 'Disallow:')
+    assert robots.rules == []
+    assert robots.is_allowed(f'{SITE}/anything')
+
+
+def test_filter_keeps_input_order():
+    robots = matcher('User-agent: *', 'Disallow: /tmp', 'Disallow: /*?session=')
+    urls = [f'{SITE}/z', f'{SITE}/tmp/a', f'{SITE}/b?session=1', f'{SITE}/a', f'{SITE}/m#top']
+    assert robots.filter(urls) == [f'{SITE}/z', f'{SITE}/a', f'{SITE}/m#top']